@@ -0,0 +1,301 @@
+"""
+Local stand-in for a ScientISST device, to run the benchmarks without hardware
+
+It connects to a `ScientISST` object listening in `COM_MODE_TCP_SERVER` mode, answers the version, API, sampling rate, start and stop commands, and streams synthetic frames in the `SCIENTISST`, `SCIENTISST_V2`, `BITALINO` or `JSON` API at the requested rate. Like the device, it only buffers `max_backlog` frames when the host does not read them in time, and drops the older ones, which shows as a sequence gap.
+
+usage: python benchmarks/device_standin.py port [--host 127.0.0.1]
+"""
+
+import sys
+import json
+import math
+import time
+import select
+import socket
+import struct
+import argparse
+
+CRC4_TABLE = [0, 3, 6, 5, 12, 15, 10, 9, 11, 8, 13, 14, 7, 4, 1, 2]
+AX_CHANNELS = (7, 8)
+API_MODE_BITALINO = 1
+API_MODE_SCIENTISST = 2
+API_MODE_JSON = 3
+API_MODE_SCIENTISST_V2 = 14
+VERSION = b"ScientISST-standin-1.0"
+BITALINO_HEADER = b"BITalino"
+BITALINO_CHANNEL_BITS = (10, 10, 10, 10, 6, 6)
+# adc_num, atten, bit_width, coeff_a, coeff_b, vref
+ADC_CHARS = struct.pack("<6I", 1, 3, 3, 53500, 142, 1100)
+# frames of the SCIENTISST API repeat with its 12-bit sequence number
+SEQ_CYCLE = 1 << 12
+MAX_BACKLOG_IN_SECONDS = 0.25
+
+
+def _crc4(nibbles):
+    crc = 0
+    for nibble in nibbles:
+        crc = CRC4_TABLE[crc] ^ nibble
+    return CRC4_TABLE[crc]
+
+
+def _nibbles(data):
+    for byte in data:
+        yield byte >> 4
+        yield byte & 0x0F
+
+
+def _bitalino_crc4(packet):
+    # bit by bit, as in the BITalino API, rather than with the table of the other APIs
+    crc = 0
+    for byte in packet:
+        for bit in range(7, -1, -1):
+            crc <<= 1
+            if crc & 0x10:
+                crc ^= 0x03
+            crc ^= (byte >> bit) & 0x01
+    return crc & 0x0F
+
+
+def _encode_bitalino(channels, values, digital, seq):
+    # read as a little-endian integer, the packet holds from its most significant bits: seq, CRC, digital inputs, then the channels
+    bits = ((seq & 0x0F) << 4) << 4
+    num_bits = 12
+    for i in range(4):
+        bits |= (1 if digital[i] else 0) << (3 - i)
+    for index in range(len(channels)):
+        width = BITALINO_CHANNEL_BITS[index]
+        bits = bits << width | (values[index] & ((1 << width) - 1))
+        num_bits += width
+    num_bytes = (num_bits + 7) // 8
+    packet = bytearray((bits << (num_bytes * 8 - num_bits)).to_bytes(num_bytes, "little"))
+    packet[-1] |= _bitalino_crc4(packet)
+    return bytes(packet)
+
+
+def encode_packet(api, channels, values, digital, seq):
+    """
+    Returns:
+        packet (bytes): Packet of one frame, as sent by the device.
+    """
+    if api == API_MODE_BITALINO:
+        return _encode_bitalino(channels, values, digital, seq)
+
+    # channels are packed from the last to the first
+    bits = 0
+    num_bits = 0
+    for index in range(len(channels) - 1, -1, -1):
+        if channels[index] in AX_CHANNELS:
+            bits |= (values[index] & 0xFFFFFF) << num_bits
+            num_bits += 24
+        else:
+            bits |= (values[index] & 0xFFF) << num_bits
+            num_bits += 12
+    num_bytes = num_bits // 8
+    io = 0
+    for i in range(4):
+        if digital[i]:
+            io |= 0x80 >> i
+    # the 4 bits left of an odd number of AI channels go in the IO byte
+    io |= (bits >> (num_bytes * 8)) & 0x0F
+    data = (bits & ((1 << (num_bytes * 8)) - 1)).to_bytes(num_bytes, "little")
+
+    if api == API_MODE_SCIENTISST_V2:
+        trailer = struct.pack("<I", seq >> 4)
+        packet = bytearray(data) + bytes([io, (seq & 0x0F) << 4]) + trailer
+        crc = _crc4(list(_nibbles(packet[:-5])) + [packet[-5] >> 4] + list(_nibbles(trailer)))
+        packet[-5] |= crc
+    else:
+        packet = bytearray(data) + bytes([io, (seq & 0x0F) << 4, (seq >> 4) & 0xFF])
+        crc = _crc4(list(_nibbles(packet[:-2])) + [packet[-2] >> 4] + list(_nibbles(packet[-1:])))
+        packet[-2] |= crc
+    return bytes(packet)
+
+
+def encode_json(channels, values, digital, seq):
+    """
+    Returns:
+        message (bytes): JSON message of one frame.
+    """
+    frame = {"AI{}".format(ch) if ch not in AX_CHANNELS else "AX{}".format(ch - 6): value
+             for ch, value in zip(channels, values)}
+    frame.update(zip(("I1", "I2", "O1", "O2"), digital))
+    frame["seq"] = seq
+    return json.dumps(frame, separators=(",", ":")).encode()
+
+
+def synthetic_frame(channels, n, sample_rate):
+    """
+    Returns:
+        values (list): Raw values of frame `n`, a 10 Hz sine on AI channels and a ramp on AX channels.
+        digital (list): Digital states of frame `n`.
+    """
+    values = [
+        (n * 1000 + index) & 0xFFFFFF
+        if ch in AX_CHANNELS
+        else int(2048 + 1000 * math.sin(2 * math.pi * 10 * n / sample_rate + index))
+        for index, ch in enumerate(channels)
+    ]
+    return values, [(n >> 3) & 1, 0, (n >> 5) & 1, 1]
+
+
+class DeviceStandIn:
+    def __init__(self, port, host="127.0.0.1", max_backlog_in_seconds=MAX_BACKLOG_IN_SECONDS):
+        self.port = port
+        self.host = host
+        self.max_backlog_in_seconds = max_backlog_in_seconds
+        self.api = API_MODE_SCIENTISST
+        self.sample_rate = 1000
+        self.channels = []
+        # frames dropped because the host did not read them in time
+        self.dropped = 0
+
+    def run(self, connect_timeout=10):
+        deadline = time.perf_counter() + connect_timeout
+        while True:
+            try:
+                sock = socket.create_connection((self.host, self.port))
+                break
+            except OSError:
+                if time.perf_counter() > deadline:
+                    raise
+                time.sleep(0.05)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setblocking(False)
+
+        commands = b""
+        pending = bytearray()
+        running = False
+        while True:
+            readable, writable, _ = select.select(
+                [sock], [sock] if pending else [], [], 0.001)
+            if readable:
+                try:
+                    data = sock.recv(4096)
+                except ConnectionError:
+                    break
+                if not data:
+                    break
+                commands += data
+                while len(commands) >= 4:
+                    command, commands = commands[:4], commands[4:]
+                    reply = self.__command(command)
+                    if reply is not None:
+                        running = reply
+                        pending.clear()
+                        sent = 0
+                        start = time.perf_counter()
+                        if running:
+                            self.__prepare()
+                    elif command[0] == 0x07:
+                        header = BITALINO_HEADER if self.api == API_MODE_BITALINO else b""
+                        pending += header + VERSION + b"\x00" + ADC_CHARS
+
+            if running:
+                # frames sampled but not sent yet, generated or not
+                new = int((time.perf_counter() - start) * self.sample_rate) - sent
+                overflow = new + int(len(pending) / self.__packet_size) - max(
+                    int(self.max_backlog_in_seconds * self.sample_rate), 1)
+                if overflow > 0:
+                    # the device buffer is full: these frames are lost
+                    dropped = min(overflow, new)
+                    self.dropped += dropped
+                    sent += dropped
+                    new -= dropped
+                if new > 0 and len(pending) < 1 << 16:
+                    pending += self.__packets(sent, new)
+                    sent += new
+
+            if pending and (writable or not readable):
+                try:
+                    size = sock.send(pending)
+                except BlockingIOError:
+                    size = 0
+                except ConnectionError:
+                    break
+                del pending[:size]
+        sock.close()
+
+    def __command(self, command):
+        """
+        Applies a configuration command
+
+        Returns:
+            running (bool): Whether the acquisition runs, for start and stop commands, else None.
+        """
+        code = command[0]
+        if code == 0x43:
+            self.sample_rate = int.from_bytes(command[1:], "little")
+        elif code in (0x01, 0x02):
+            mask = int.from_bytes(command[1:], "little")
+            self.channels = [ch for ch in range(1, 9) if mask & (1 << (ch - 1))]
+            return True
+        elif code == 0x00:
+            return False
+        elif code & 0x0F == 0b11 and code >> 4 in (1, 2, 3, 14):
+            self.api = code >> 4
+        return None
+
+    def __prepare(self):
+        channels = self.channels
+        if self.api == API_MODE_SCIENTISST_V2:
+            self.__packet_size = len(
+                encode_packet(self.api, channels, [0] * len(channels), [0] * 4, 0))
+            return
+
+        # the frames repeat with the sequence number: encode them once
+        cycle = []
+        for n in range(SEQ_CYCLE):
+            values, digital = synthetic_frame(channels, n, self.sample_rate)
+            if self.api == API_MODE_BITALINO:
+                # the 12-bit values without their lowest bits
+                values = [value >> (12 - bits) for value, bits in zip(values, BITALINO_CHANNEL_BITS)]
+            if self.api == API_MODE_JSON:
+                cycle.append(encode_json(channels, values, digital, n))
+            else:
+                cycle.append(encode_packet(self.api, channels, values, digital, n))
+        self.__offsets = [0]
+        for packet in cycle:
+            self.__offsets.append(self.__offsets[-1] + len(packet))
+        self.__cycle = b"".join(cycle)
+        self.__packet_size = len(self.__cycle) / SEQ_CYCLE
+
+    def __packets(self, first, count):
+        if self.api != API_MODE_SCIENTISST_V2:
+            offsets = self.__offsets
+            start = first % SEQ_CYCLE
+            data = bytearray()
+            while count:
+                chunk = min(count, SEQ_CYCLE - start)
+                data += self.__cycle[offsets[start]: offsets[start + chunk]]
+                count -= chunk
+                start = 0
+            return data
+        return b"".join(
+            encode_packet(
+                self.api,
+                self.channels,
+                *synthetic_frame(self.channels, n, self.sample_rate),
+                # the 36-bit timestamp (us) of SCIENTISST_V2 frames
+                (n * 1000000 // self.sample_rate) & 0xFFFFFFFFF,
+            )
+            for n in range(first, first + count)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("port", type=int, help="port of the ScientISST object, as given to sense.py -m tcp")
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    device = DeviceStandIn(args.port, args.host)
+    try:
+        device.run()
+    except KeyboardInterrupt:
+        pass
+    if device.dropped:
+        sys.stderr.write("{} frames dropped\n".format(device.dropped))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Sustained high-rate acquisition against a local device stand-in
+
+For each combination of sampling rate and number of channels, acquires from `device_standin.py` (run in another process, so that it does not take CPU time from the acquisition) and checks that no frame is lost: the sequence numbers must be consecutive, and the host must not fall behind the device. It reports the CPU time used by the acquisition process, and the headroom left on its core. The `BITALINO` API carries up to 6 channels, e.g. `--api BITALINO --channels 1,2,4,6`.
+
+usage: python benchmarks/high_rate.py [--rates 1000,4000,8000,16000] [--channels 1,2,4,8] [--duration 5] [--api SCIENTISST|SCIENTISST_V2|BITALINO|JSON] [--read-into]
+"""
+
+import io
+import os
+import sys
+import time
+import socket
+import argparse
+import contextlib
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scientisst import ScientISST
+from scientisst.constants import *
+from device_standin import DeviceStandIn
+
+# the host may lag by one read and the frames in flight, but must not fall further behind
+MAX_LAG_IN_SECONDS = 0.5
+
+
+def _run_standin(port, dropped):
+    device = DeviceStandIn(port)
+    device.run()
+    dropped.value = device.dropped
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _count_lost(seqs, api, sample_rate):
+    import numpy as np
+
+    seqs = np.array(seqs, dtype=np.int64)
+    if api == API_MODE_SCIENTISST_V2:
+        periods = np.round(np.diff(np.unwrap(seqs, period=1 << 36)) * sample_rate / 1e6)
+    elif api == API_MODE_BITALINO:
+        periods = np.diff(seqs) % (1 << 4)
+    else:
+        periods = np.diff(seqs) % (1 << 12)
+    return int(np.sum(np.abs(periods - 1)))
+
+
+def run(sample_rate, channels, duration, api, read_into):
+    """
+    Returns:
+        result (dict): Frames received and lost, lag and CPU usage of one acquisition.
+    """
+    import numpy as np
+
+    port = _free_port()
+    dropped = multiprocessing.Value("l", 0)
+    standin = multiprocessing.Process(target=_run_standin, args=(port, dropped))
+    standin.start()
+    # keep the connection messages out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        device = ScientISST(
+            str(port), com_mode=COM_MODE_TCP_SERVER, api=api, calibration_cache=False)
+
+    seqs = []
+    frames = 0
+    try:
+        device.start(sample_rate, channels)
+        if read_into:
+            num_frames = max(sample_rate // 5, 1)
+            raw = np.empty((num_frames, len(channels)), dtype=np.int64)
+            mv = np.empty((num_frames, len(channels)), dtype=np.float64)
+            meta = np.empty((num_frames, 5), dtype=np.int64)
+
+        # the first read absorbs the start-up delay of the stream
+        if read_into:
+            device.read_into(raw, mv, meta)
+        else:
+            device.read()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            if read_into:
+                frames += device.read_into(raw, mv, meta)
+                seqs.extend(meta[:, 0].tolist())
+            else:
+                block = device.read()
+                frames += len(block)
+                seqs.extend(f.seq for f in block)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        device.stop()
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            device.disconnect()
+        standin.join(5)
+        if standin.is_alive():
+            standin.terminate()
+
+    lag = elapsed - frames / sample_rate
+    return {
+        "frames": frames,
+        "lost": _count_lost(seqs, api, sample_rate) + dropped.value,
+        "lag": lag,
+        "cpu": cpu / elapsed,
+        "ok": not dropped.value and lag < MAX_LAG_IN_SECONDS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rates", default="1000,4000,8000,16000", help="sampling rates (Hz)")
+    parser.add_argument("--channels", default="1,2,4,8", help="numbers of channels")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of each acquisition")
+    parser.add_argument("--api", choices=["SCIENTISST", "SCIENTISST_V2", "BITALINO", "JSON"], default="SCIENTISST")
+    parser.add_argument(
+        "--read-into", action="store_true", help="read into preallocated arrays instead of Frame objects")
+    args = parser.parse_args()
+    api = API_MODE_DICT[args.api]
+
+    sys.stdout.write(
+        "{:>8} {:>4} {:>9} {:>6} {:>9} {:>6} {:>9}\n".format(
+            "Rate", "Chs", "Frames", "Lost", "Lag", "CPU", "Headroom"))
+    failed = False
+    for sample_rate in map(int, args.rates.split(",")):
+        for num_chs in map(int, args.channels.split(",")):
+            result = run(sample_rate, list(range(1, num_chs + 1)), args.duration, api, args.read_into)
+            ok = result["ok"] and not result["lost"]
+            failed |= not ok
+            sys.stdout.write(
+                "{:>8} {:>4} {:>9} {:>6} {:>7.0f}ms {:>5.0f}% {:>8.0f}% {}\n".format(
+                    sample_rate,
+                    num_chs,
+                    result["frames"],
+                    result["lost"],
+                    result["lag"] * 1e3,
+                    result["cpu"] * 100,
+                    (1 - result["cpu"]) * 100,
+                    "ok" if ok else "FAILED",
+                )
+            )
+            sys.stdout.flush()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
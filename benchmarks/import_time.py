@@ -0,0 +1,87 @@
+"""
+Import time of sense.py and the scientisst package
+
+Runs `python -X importtime` in a fresh interpreter and fails (exit code 1) if an import exceeds its time budget or loads one of the heavy modules that must only be loaded on first use.
+
+usage: python benchmarks/import_time.py [--budget-scale 1.0] [--repeat 5]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module imported -> budget (ms) on a desktop CPU, scale it for slower hosts
+IMPORT_TIME_BUDGETS = {
+    "scientisst": 60,
+    "sense": 80,
+}
+# modules that only specific options need
+LAZY_MODULES = [
+    "numpy",
+    "serial",
+    "asyncio",
+    "multiprocessing",
+    "pylsl",
+    "pydbus",
+    "scipy",
+    "concurrent.futures",
+]
+
+
+def measure(module):
+    """
+    Returns:
+        total (float): Cumulative import time (ms) of `module`.
+        imported (dict): Cumulative import time (ms) of each imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module)],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(cumulative) / 1000
+    return imported[module], imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "--budget-scale", type=float, default=1.0,
+        help="multiply the budgets, e.g. 5 on a small ARM board")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="keep the fastest of this many runs")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+        budget *= args.budget_scale
+        runs = [measure(module) for _ in range(args.repeat)]
+        total, imported = min(runs, key=lambda run: run[0])
+
+        status = "ok" if total <= budget else "OVER BUDGET"
+        sys.stdout.write(
+            "import {}: {:.1f} ms (budget {:.0f} ms) {}\n".format(module, total, budget, status))
+        slowest = sorted(imported.items(), key=lambda item: -item[1])[1:6]
+        for name, cumulative in slowest:
+            sys.stdout.write("    {:<40} {:.1f} ms\n".format(name, cumulative))
+
+        eager = [name for name in LAZY_MODULES if name in imported]
+        if eager:
+            sys.stdout.write("    imported eagerly: {}\n".format(", ".join(eager)))
+        failed = failed or total > budget or bool(eager)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Decoding throughput of the JSON API, compared to the binary SCIENTISST API
+
+Encodes the same synthetic frames as JSON messages and as SCIENTISST packets, then decodes them into arrays and `Frame` objects, as `read()` does: the JSON stream with `JsonStreamDecoder`, fed in chunks of the size of a TCP segment, and the packets with `PacketDecoder`. For the end-to-end rates against a device stand-in, see `high_rate.py --api JSON`.
+
+usage: python benchmarks/json_stream.py [--frames 50000] [--channels 1,2,4,8] [--chunk 1460]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from scientisst.constants import *
+from scientisst.esp_adc.esp_adc import EspAdcCalChars
+from scientisst.json_stream import JsonStreamDecoder
+from scientisst.packet_decoder import PacketDecoder
+from device_standin import ADC_CHARS, encode_json, encode_packet, synthetic_frame
+
+REPEAT = 3
+
+
+def _best(function):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--channels", default="1,2,4,8", help="numbers of channels")
+    parser.add_argument("--chunk", type=int, default=1460, help="bytes fed to the JSON decoder at a time")
+    args = parser.parse_args()
+    adc_chars = EspAdcCalChars(ADC_CHARS)
+
+    sys.stdout.write(
+        "{:>4} {:>6} {:>12} {:>10} {:>12} {:>10}\n".format(
+            "Chs", "API", "Frames/s", "MB/s", "Frames/s", "MB/s"))
+    sys.stdout.write("{:>11} {:>23} {:>23}\n".format("", "to arrays", "to Frames"))
+    for num_chs in map(int, args.channels.split(",")):
+        channels = list(range(1, num_chs + 1))
+        frames = [synthetic_frame(channels, n, 1000) for n in range(args.frames)]
+        json_data = b"".join(
+            encode_json(channels, values, digital, n & 0xFFF)
+            for n, (values, digital) in enumerate(frames))
+        binary_data = b"".join(
+            encode_packet(API_MODE_SCIENTISST, channels, values, digital, n & 0xFFF)
+            for n, (values, digital) in enumerate(frames))
+        raw = np.empty((args.frames, num_chs), dtype=np.int64)
+        mv = np.empty((args.frames, num_chs), dtype=np.float64)
+        meta = np.empty((args.frames, 5), dtype=np.int64)
+
+        def decode_json(to_frames):
+            decoder = JsonStreamDecoder(channels, adc_chars)
+            for i in range(0, len(json_data), args.chunk):
+                decoder.feed(json_data[i: i + args.chunk])
+            decoder.decode(raw, meta)
+            decoder.convert(raw, mv)
+            if to_frames:
+                decoder.frames(raw, meta, mv)
+
+        def decode_binary(to_frames):
+            decoder = PacketDecoder(API_MODE_SCIENTISST, channels, adc_chars)
+            packets = np.frombuffer(binary_data, dtype=np.uint8).reshape(-1, decoder.packet_size)
+            decoder.check_crc(packets)
+            decoder.decode(packets, raw, meta)
+            decoder.convert(raw, mv)
+            if to_frames:
+                decoder.frames(raw, meta, mv)
+
+        for api, decode, data in (
+            ("BINARY", decode_binary, binary_data),
+            ("JSON", decode_json, json_data),
+        ):
+            arrays = _best(lambda: decode(False))
+            objects = _best(lambda: decode(True))
+            sys.stdout.write(
+                "{:>4} {:>6} {:>12.0f} {:>10.1f} {:>12.0f} {:>10.1f}\n".format(
+                    num_chs,
+                    api,
+                    args.frames / arrays,
+                    len(data) / arrays / 1e6,
+                    args.frames / objects,
+                    len(data) / objects / 1e6,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
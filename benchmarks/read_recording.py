@@ -0,0 +1,88 @@
+"""
+Loading time of a text recording, by number of processes
+
+Writes a synthetic recording in the `sense.py` format, then loads it with `np.loadtxt` on one core and with `read_recording()` on a growing number of processes. On a host with enough cores and the file in the page cache, the loading time drops close to linearly with the processes, until reading the file becomes the limit.
+
+usage: python benchmarks/read_recording.py [--frames 2000000] [--channels 6] [--jobs 1,2,4,8] [--path recording.tsv]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from scientisst.recording_reader import read_recording
+from sense_src.file_writer import get_metadata
+
+# frames generated and written at once
+WRITE_BLOCK = 100000
+
+
+def write_recording(path, num_frames, num_channels):
+    channels = list(range(1, num_channels + 1))
+    metadata = get_metadata(
+        "00:00:00:00:00:00", 1000, channels, True, 2, "1.0", "SCIENTISST"
+    )
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        f.write("#{}\n".format(metadata))
+        f.write("{}\n".format("\t".join(metadata["Header"])))
+        for start in range(0, num_frames, WRITE_BLOCK):
+            n = min(WRITE_BLOCK, num_frames - start)
+            block = np.empty((n, 5 + 2 * num_channels), dtype=np.int64)
+            block[:, 0] = np.arange(start, start + n) & 0xFFF
+            block[:, 1:5] = rng.integers(0, 2, (n, 4))
+            block[:, 5::2] = rng.integers(0, 4096, (n, num_channels))
+            block[:, 6::2] = rng.integers(0, 3300, (n, num_channels))
+            np.savetxt(f, block, fmt="%d", delimiter="\t")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--frames", type=int, default=2000000)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--jobs", default="1,2,4,8", help="numbers of processes")
+    parser.add_argument(
+        "--path", default=None, help="recording to load instead of a synthetic one"
+    )
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "recording.tsv")
+        write_recording(path, args.frames, args.channels)
+    size = os.path.getsize(path)
+
+    try:
+        start = time.perf_counter()
+        frames = np.loadtxt(path, skiprows=2, ndmin=2)
+        baseline = time.perf_counter() - start
+        sys.stdout.write(
+            "{:.1f} MB, {} frames\n{:>10} {:>9.2f}s {:>8.1f} MB/s\n".format(
+                size / 1e6, len(frames), "np.loadtxt", baseline, size / baseline / 1e6
+            )
+        )
+        del frames
+
+        for jobs in map(int, args.jobs.split(",")):
+            start = time.perf_counter()
+            _, frames = read_recording(path, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            sys.stdout.write(
+                "{:>7} jobs {:>6.2f}s {:>8.1f} MB/s {:>5.1f}x\n".format(
+                    jobs, elapsed, size / elapsed / 1e6, baseline / elapsed
+                )
+            )
+            del frames
+    finally:
+        if args.path is None:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cost of keeping the last seconds of an acquisition in a custom script
+
+Compares, for each block of frames passed to `on_read()`, the usual list of `Frame` objects (append, trim by slicing, then build the analysis window) with a `RollingWindow`, for growing amounts of data kept. The list costs grow with the data kept, the `RollingWindow` ones do not.
+
+usage: python benchmarks/rolling_window.py [--rate 1000] [--channels 6] [--block 200] [--keep 10,60,300] [--window 1]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from scientisst.frame import Frame
+from scientisst.rolling_window import RollingWindow
+
+BLOCKS = 200
+
+
+def _blocks(num_chs, block_size):
+    blocks = []
+    for b in range(BLOCKS):
+        block = []
+        for i in range(block_size):
+            f = Frame(num_chs)
+            f.seq = (b * block_size + i) & 0xFFF
+            f.a = [2048 + ch for ch in range(num_chs)]
+            f.mv = [1500 + ch for ch in range(num_chs)]
+            block.append(f)
+        blocks.append(block)
+    return blocks
+
+
+def list_of_frames(blocks, keep, window):
+    kept = []
+    for i, frames in enumerate(blocks):
+        if i == len(blocks) - BLOCKS:
+            start = time.perf_counter()
+        kept += frames
+        kept = kept[-keep:]
+        analysed = np.array([f.mv for f in kept[-window:]]).T
+    return (time.perf_counter() - start) / BLOCKS
+
+
+def rolling_window(blocks, keep, window):
+    rolling = RollingWindow(keep, len(blocks[0][0].mv))
+    for i, frames in enumerate(blocks):
+        if i == len(blocks) - BLOCKS:
+            start = time.perf_counter()
+        rolling.append([f.mv for f in frames])
+        for analysed in rolling.windows(window, len(frames)):
+            pass
+    return (time.perf_counter() - start) / BLOCKS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rate", type=int, default=1000, help="sampling rate (Hz)")
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--block", type=int, default=200, help="frames per on_read()")
+    parser.add_argument("--keep", default="10,60,300", help="seconds kept")
+    parser.add_argument("--window", type=float, default=1, help="seconds of the analysis window")
+    args = parser.parse_args()
+
+    blocks = _blocks(args.channels, args.block)
+    window = int(args.window * args.rate)
+    sys.stdout.write("{:>8} {:>14} {:>16}\n".format("Kept", "List of Frames", "RollingWindow"))
+    for seconds in map(float, args.keep.split(",")):
+        keep = int(seconds * args.rate)
+        # fill the list and the window first: only the last BLOCKS blocks are measured
+        filled = [blocks[0]] * (keep // args.block + 1) + blocks
+        sys.stdout.write(
+            "{:>7.0f}s {:>12.3f}ms {:>14.3f}ms\n".format(
+                seconds,
+                list_of_frames(filled, keep, window) * 1e3,
+                rolling_window(filled, keep, window) * 1e3,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
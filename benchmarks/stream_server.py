@@ -0,0 +1,123 @@
+"""
+Aggregate throughput of the sense.py --serve fan-out server
+
+Publishes synthetic frames to StreamServer at a fixed rate while a separate process reads them with many clients, then reports the frames and bytes delivered per second.
+
+usage: python benchmarks/stream_server.py [--clients 50] [--processes 4] [--rate 16000] [--duration 5] [--unix]
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scientisst.constants import *
+from scientisst.frame import Frame
+from scientisst.stream_client import parse_stream_address, STREAM_LENGTH
+from sense_src.file_writer import get_metadata
+from sense_src.stream_server import StreamServer
+
+CHANNELS = [1, 2, 3, 4, 5, 6, 7, 8]
+BLOCK_FRAMES = 100
+
+
+async def _client(address, totals):
+    family, address = parse_stream_address(address)
+    if family == socket.AF_UNIX:
+        reader, _ = await asyncio.open_unix_connection(address)
+    else:
+        reader, _ = await asyncio.open_connection(*address)
+    # skip the metadata handshake
+    (length,) = STREAM_LENGTH.unpack(await reader.readexactly(STREAM_LENGTH.size))
+    await reader.readexactly(length)
+    try:
+        while True:
+            (length,) = STREAM_LENGTH.unpack(await reader.readexactly(STREAM_LENGTH.size))
+            body = await reader.readexactly(length)
+            totals["bytes"] += STREAM_LENGTH.size + length
+            totals["frames"] += STREAM_LENGTH.unpack_from(body)[0]
+    except asyncio.IncompleteReadError:
+        pass
+
+
+def _run_clients(address, num_clients, results):
+    async def main():
+        totals = {"bytes": 0, "frames": 0}
+        start = time.perf_counter()
+        await asyncio.gather(*[_client(address, totals) for _ in range(num_clients)])
+        totals["time"] = time.perf_counter() - start
+        return totals
+
+    results.put(asyncio.run(main()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=4, help="processes running the clients")
+    parser.add_argument("--rate", type=int, default=16000, help="frames per second")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--unix", action="store_true", help="use a Unix domain socket")
+    args = parser.parse_args()
+
+    metadata = get_metadata("benchmark", args.rate, CHANNELS, True, "benchmark", "", "SCIENTISST")
+    address = "unix:/tmp/scientisst-benchmark.sock" if args.unix else "127.0.0.1:0"
+    server = StreamServer(address, metadata)
+    server.start()
+
+    results = multiprocessing.Queue()
+    processes = []
+    for i in range(args.processes):
+        num_clients = args.clients // args.processes + (i < args.clients % args.processes)
+        processes.append(multiprocessing.Process(
+            target=_run_clients, args=(server.address, num_clients, results)))
+        processes[-1].start()
+    while server.clients < args.clients:
+        if not all(process.is_alive() for process in processes):
+            sys.exit("A clients process exited")
+        time.sleep(0.01)
+
+    frames = []
+    for i in range(BLOCK_FRAMES):
+        f = Frame(len(CHANNELS))
+        f.seq = i
+        f.a = list(range(2048, 2048 + len(CHANNELS)))
+        f.mv = [1650.123] * len(CHANNELS)
+        frames.append(f)
+
+    interval = BLOCK_FRAMES / args.rate
+    start = time.perf_counter()
+    sent = 0
+    busy = 0
+    while time.perf_counter() - start < args.duration:
+        t = time.perf_counter()
+        server.put(frames)
+        busy += time.perf_counter() - t
+        sent += 1
+        delay = start + sent * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+
+    server.stop()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    delivered_frames = sum(t["frames"] / t["time"] for t in totals)
+    delivered_bytes = sum(t["bytes"] / t["time"] for t in totals)
+
+    sys.stdout.write("Clients:            {}\n".format(args.clients))
+    sys.stdout.write("Published:          {:.0f} frames/s\n".format(sent * BLOCK_FRAMES / elapsed))
+    sys.stdout.write("Delivered:          {:.0f} frames/s ({:.1f} MB/s)\n".format(
+        delivered_frames, delivered_bytes / 1e6))
+    sys.stdout.write("Dropped clients:    {}\n".format(server.dropped_clients))
+    sys.stdout.write("Time in put():      {:.1f}% of the run\n".format(100 * busy / elapsed))
+
+
+if __name__ == "__main__":
+    main()
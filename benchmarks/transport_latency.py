@@ -0,0 +1,69 @@
+"""
+Latency and jitter of a communication mode, measured with a real device
+
+Acquires in the SCIENTISST_V2 API, whose frames carry the device timestamp (us) of their sampling instant, and timestamps each frame as soon as `read_available()` returns it. The latency of a frame is its arrival time minus its sampling instant, relative to the fastest frame of the run (the device and host clocks are not synchronized), so it shows the delays added by the link: TCP retransmissions stall every later frame (head-of-line blocking), while lost UDP datagrams show as lost frames.
+
+usage: python benchmarks/transport_latency.py address [-m tcp|udp|...] [-f 1000] [-c 1,2] [--duration 30]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scientisst import ScientISST
+from scientisst.constants import *
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("address", help="device address, as for sense.py")
+    parser.add_argument("-m", "--mode", choices=COM_MODE_LIST, default=COM_MODE_TCP_SERVER)
+    parser.add_argument("-f", "--frequency", dest="fs", type=int, default=1000)
+    parser.add_argument("-c", "--channels", type=str, default="1,2")
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+    channels = [int(ch) for ch in args.channels.split(",")]
+
+    import numpy as np
+
+    device = ScientISST(args.address, com_mode=args.mode, api=API_MODE_SCIENTISST_V2)
+    timestamps = []
+    arrivals = []
+    try:
+        device.start(args.fs, channels)
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            frames = device.read_available(timeout=0.1, convert=False)
+            now = time.perf_counter()
+            for frame in frames:
+                timestamps.append(frame.seq)
+                arrivals.append(now)
+        device.stop()
+    finally:
+        device.disconnect()
+
+    if not timestamps:
+        sys.exit("No frames received")
+    # the 36-bit timestamp wraps around every ~19 hours
+    timestamps = np.unwrap(np.array(timestamps, dtype=np.int64), period=1 << 36)
+    latency = np.array(arrivals) - timestamps / 1e6
+    latency = (latency - latency.min()) * 1e3
+    periods = np.round(np.diff(timestamps) * args.fs / 1e6)
+    lost = int(np.sum(np.maximum(periods - 1, 0)))
+
+    sys.stdout.write("Mode:               {}\n".format(args.mode))
+    sys.stdout.write("Frames:             {} ({} lost)\n".format(len(timestamps), lost))
+    for p in PERCENTILES:
+        sys.stdout.write(
+            "{:<20}{:.2f} ms\n".format("Latency p{}:".format(p), np.percentile(latency, p)))
+    sys.stdout.write("Latency max:        {:.2f} ms\n".format(latency.max()))
+    sys.stdout.write("Jitter (std):       {:.2f} ms\n".format(latency.std()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,30 @@
 from scientisst.scientisst import *
 
 __version__ = "1.2.0"
+
+# loaded on first use, as they import NumPy, multiprocessing, asyncio or concurrent.futures
+_LAZY_MODULES = {
+    "scientisst.conversion": ["ax_to_mv", "raw_to_mv"],
+    "scientisst.calibration_cache": ["CalibrationCache"],
+    "scientisst.discovery": ["DiscoveryCache", "discover_devices", "probe_device"],
+    "scientisst.edge_detector": ["EdgeDetector"],
+    "scientisst.json_stream": ["JsonStreamDecoder"],
+    "scientisst.packet_decoder": ["PacketDecoder", "decode_packets"],
+    "scientisst.recording_reader": ["iter_recording", "read_metadata", "read_recording"],
+    "scientisst.rolling_window": ["RollingWindow"],
+    "scientisst.shared_ring": ["SharedRingWriter", "SharedRingReader"],
+    "scientisst.stream_client": ["StreamClient"],
+}
+_LAZY_ATTRIBUTES = {
+    name: module for module, names in _LAZY_MODULES.items() for name in names
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module 'scientisst' has no attribute '{}'".format(name))
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
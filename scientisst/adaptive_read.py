@@ -0,0 +1,81 @@
+ADAPTIVE_READ_SMOOTHING = 0.2
+
+
+class AdaptiveReadSize:
+    """
+    Chooses the number of frames of each `read()` at runtime
+
+    The batch is sized to hold `latency` seconds of data at the observed arrival rate. If the host cannot process `throughput` frames per second with that batch size, the batch grows (above the latency target if needed) to amortize the per-read overhead, and shrinks back once the host has twice the needed throughput.
+
+    Attributes:
+        latency (float): Target maximum duration (s) of the data returned by each read.
+
+        throughput (float): Frames per second the host must be able to process.
+
+        frames (int): Number of frames of the next read.
+
+        arrival_rate (float): Estimated frames per second arriving from the device.
+
+        capacity (float): Estimated frames per second the host can process.
+    """
+
+    def __init__(self, sample_rate, latency, throughput=None, max_frames=None):
+        """
+        Args:
+            sample_rate (int): Acquisition sampling rate in Hz.
+            latency (float): Target maximum duration (s) of the data returned by each read.
+            throughput (float, optional): Frames per second the host must be able to process. Default is `sample_rate`.
+            max_frames (int, optional): Upper bound of the number of frames per read. Default is one second of data.
+        """
+        self.latency = latency
+        self.throughput = throughput if throughput else sample_rate
+        self.max_frames = max(max_frames if max_frames else sample_rate, 1)
+        self.arrival_rate = sample_rate
+        self.capacity = float("inf")
+        self.frames = self.__target()
+
+    def update(self, frames, wait_time, interval):
+        """
+        Updates the estimates with the last read and returns the number of frames of the next one
+
+        Args:
+            frames (int): Number of frames returned by the last read.
+            wait_time (float): Time (s) the last read spent waiting for the device.
+            interval (float): Time (s) since the previous read returned, including the caller's processing.
+
+        Returns:
+            frames (int): Number of frames of the next read.
+        """
+        if interval <= 0:
+            return self.frames
+
+        busy_time = interval - wait_time
+        if busy_time > 0:
+            capacity = frames / busy_time
+            if self.capacity == float("inf"):
+                self.capacity = capacity
+            else:
+                self.capacity += ADAPTIVE_READ_SMOOTHING * (capacity - self.capacity)
+
+        # Only a read that had to wait for data measures the device rate,
+        # otherwise it is draining data that was already buffered
+        if wait_time > 0.1 * interval:
+            self.arrival_rate += ADAPTIVE_READ_SMOOTHING * (
+                frames / interval - self.arrival_rate
+            )
+
+        target = self.__target()
+        if self.capacity < self.throughput:
+            # the host is falling behind: fewer, larger reads
+            self.frames = min(self.frames * 2, self.max_frames)
+        elif self.frames > target:
+            # shrink back towards the latency target only with enough headroom
+            if self.capacity > 2 * self.throughput:
+                self.frames = max(self.frames // 2, target)
+        else:
+            self.frames = target
+
+        return self.frames
+
+    def __target(self):
+        return min(max(int(self.arrival_rate * self.latency), 1), self.max_frames)
@@ -0,0 +1,80 @@
+import os
+import re
+import sys
+import json
+import time
+from scientisst.esp_adc.esp_adc import EspAdcCalChars
+
+
+class CalibrationCache:
+    """
+    ADC characteristics and conversion table of each device, kept in a JSON file per device
+
+    An entry is only used for the same device address, firmware version and ADC characteristics, so a firmware update or a different board behind the same address never reuses a stale table.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str, optional): Directory of the cache files. Default is `scientisst/calibration` in the user cache directory (`$XDG_CACHE_HOME`, or `~/.cache`).
+        """
+        if path is None:
+            path = os.path.join(get_cache_dir(), "calibration")
+        self.path = path
+
+    def get(self, address, firmware, adc_chars):
+        """
+        Args:
+            address (str): Device address.
+            firmware (str): Firmware version reported by the device.
+            adc_chars (EspAdcCalChars): ADC characteristics reported by the device.
+
+        Returns:
+            adc_chars (EspAdcCalChars): The cached characteristics, with their conversion table, or None if there is no matching entry.
+        """
+        try:
+            with open(self.__file(address)) as f:
+                entry = json.load(f)
+            if entry["firmware"] != firmware or entry["adc_chars"] != adc_chars.to_map():
+                return None
+            cached = EspAdcCalChars.from_map(entry["adc_chars"])
+            cached.set_raw_to_voltage_list(entry["voltages"])
+            return cached
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, address, firmware, adc_chars):
+        """
+        Stores `adc_chars` and its conversion table, built if needed
+        """
+        entry = {
+            "address": str(address),
+            "firmware": firmware,
+            "adc_chars": adc_chars.to_map(),
+            "voltages": adc_chars.raw_to_voltage_list(),
+            "time": time.time(),
+        }
+        path = self.__file(address)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            temp_path = "{}.{}".format(path, os.getpid())
+            with open(temp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            # the cache only saves time: never fail because of it
+            sys.stderr.write("Could not write {}: {}\n".format(path, e))
+
+    def __file(self, address):
+        return os.path.join(self.path, re.sub(r"[^0-9A-Za-z.-]", "_", str(address)) + ".json")
+
+
+def get_cache_dir():
+    """
+    Returns:
+        path (str): Directory of the ScientISST caches, `scientisst` in `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+    return os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "scientisst",
+    )
@@ -1,4 +1,14 @@
 TIMEOUT_IN_SECONDS = 5
+# Wait before sending a configuration command
+COMMAND_DELAY_IN_SECONDS = 0.25
+# Time without incoming bytes after which the receive buffer is considered clear
+CLEAR_QUIET_IN_SECONDS = 0.1
+# Reconnection attempts after losing the connection, with an exponential backoff
+RECONNECT_TRIES = 10
+RECONNECT_BACKOFF_IN_SECONDS = 0.1
+RECONNECT_MAX_BACKOFF_IN_SECONDS = 5
+# Maximum wait for the device on each reconnection attempt
+RECONNECT_TIMEOUT_IN_SECONDS = 10
 
 # API_MODE
 API_MODE_BITALINO = 1
@@ -13,14 +23,19 @@ API_MODE_DICT = {
     "JSON": API_MODE_JSON,
     "SCIENTISST_V2": API_MODE_SCIENTISST_V2,
 }
+# Bits of the raw value of each channel in API_MODE_BITALINO, in acquisition order
+BITALINO_CHANNEL_BITS = (10, 10, 10, 10, 6, 6)
 
 # COM_MODE
 COM_MODE_BT = "bt_classic"
 COM_MODE_TCP_SERVER = "tcp"
 COM_MODE_TCP_AP = "tcp_ap"
 COM_MODE_SERIAL = "serial"
+COM_MODE_UDP = "udp"
 COM_MODE_LIST = [COM_MODE_BT, COM_MODE_TCP_SERVER,
-                 COM_MODE_TCP_AP, COM_MODE_SERIAL]
+                 COM_MODE_TCP_AP, COM_MODE_SERIAL, COM_MODE_UDP]
+# Hostname of the device when it runs its own access point (mDNS)
+TCP_AP_HOSTNAME = "scientisst.local"
 
 # CHANNELS
 AI1 = 1
@@ -33,3 +48,8 @@ AX1 = 7
 AX2 = 8
 
 MAX_BUFFER_SIZE = 4096
+# Above this sampling rate (Hz), read() decodes whole blocks of frames with NumPy
+HIGH_RATE_SAMPLE_RATE = 1000
+# The sampling rate is sent in the 3 bytes after the command
+MAX_SAMPLE_RATE = (1 << 24) - 1
+UDP_MAX_DATAGRAM_SIZE = 65507
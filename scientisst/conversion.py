@@ -0,0 +1,59 @@
+import numpy as np
+from scientisst.constants import AX1, AX2
+
+# raw AX1/AX2 value to mV
+AX_MV_FACTOR = 3.3 * 2
+AX_MV_DIVISOR = pow(2, 24) - 1
+
+
+def ax_to_mv(raw, out=None):
+    """
+    Converts raw AX1/AX2 (24-bit) values to mV, as `ScientISST.read()` does
+
+    Args:
+        raw (np.array): Raw values.
+        out (np.array, optional): float64 array of the same shape receiving the values in mV, e.g. a column of a preallocated block.
+
+    Returns:
+        mv (np.array): Values in mV, rounded to 3 decimal places.
+    """
+    # in the order of the operations of ScientISST.read(), so the values are the same
+    if out is None:
+        return np.round(np.asarray(raw) * AX_MV_FACTOR / AX_MV_DIVISOR * 1000, 3)
+    np.multiply(raw, AX_MV_FACTOR, out=out)
+    np.divide(out, AX_MV_DIVISOR, out=out)
+    np.multiply(out, 1000, out=out)
+    return np.round(out, 3, out=out)
+
+
+def raw_to_mv(raw, channels, adc_chars=None, resolutions=None):
+    """
+    Converts raw channel values to mV, as `ScientISST.read()` does, for a whole block at once
+
+    Args:
+        raw (np.array): Raw values, one row per frame and one column per channel.
+        channels (list): Channel of each column.
+        adc_chars (EspAdcCalChars, optional): ADC characteristics of the device. Only needed for AI channels.
+        resolutions (list, optional): Bits of the raw value of each column, for AI channels sent with less than the 12 bits of the ADC (`API_MODE_BITALINO`). Default is 12.
+
+    Returns:
+        mv (np.array): Values in mV, with the same shape as `raw`.
+
+    Raises:
+        ValueError: If there are AI channels and no ADC characteristics.
+    """
+    raw = np.asarray(raw)
+    mv = np.empty(raw.shape, dtype=np.float64)
+    for index, ch in enumerate(channels):
+        if ch == AX1 or ch == AX2:
+            mv[:, index] = ax_to_mv(raw[:, index])
+        elif adc_chars is None:
+            raise ValueError(
+                "ADC characteristics are needed to convert AI{} to mV".format(ch))
+        elif resolutions and resolutions[index] < 12:
+            # the ADC value without its lowest bits
+            mv[:, index] = adc_chars.raw_to_voltage(
+                raw[:, index].astype(np.int64) << (12 - resolutions[index]))
+        else:
+            mv[:, index] = adc_chars.raw_to_voltage(raw[:, index])
+    return mv
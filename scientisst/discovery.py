@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from scientisst.constants import *
+from scientisst.exceptions import *
+from scientisst.esp_adc.esp_adc import EspAdcCalChars
+from scientisst.transport import *
+from scientisst.calibration_cache import get_cache_dir
+
+# seconds a discovered device or resolved hostname is trusted without probing it again
+DISCOVERY_CACHE_TTL = 24 * 3600
+DISCOVERY_TIMEOUT = 3
+DISCOVERY_MAX_WORKERS = 32
+# size of the ADC characteristics that follow the null terminator of the firmware version string
+VERSION_ADC_CHARS_SIZE = 24
+
+
+class DiscoveredDevice:
+    """
+    Device confirmed by its answer to the version command
+
+    Attributes:
+        address (str): Address to connect to, as given to `ScientISST`.
+
+        com_mode (str): Communication mode of the address.
+
+        firmware (str): Firmware version string.
+
+        adc_chars (EspAdcCalChars): ADC characteristics of the device.
+
+        time (float): When the device answered (s since the epoch).
+
+        name (str): Bluetooth name of the paired device, or description of the serial port, if known.
+    """
+
+    def __init__(self, address, com_mode, firmware, adc_chars, time, name=None):
+        self.address = address
+        self.com_mode = com_mode
+        self.firmware = firmware
+        self.adc_chars = adc_chars
+        self.time = time
+        self.name = name
+
+    def __repr__(self):
+        return "DiscoveredDevice({!r}, {!r}, firmware={!r})".format(
+            self.address, self.com_mode, self.firmware
+        )
+
+    def to_map(self):
+        return {
+            "address": self.address,
+            "com_mode": self.com_mode,
+            "firmware": self.firmware,
+            "adc_chars": self.adc_chars.to_map(),
+            "time": self.time,
+            "name": self.name,
+        }
+
+    def from_map(device):
+        return DiscoveredDevice(
+            device["address"],
+            device["com_mode"],
+            device["firmware"],
+            EspAdcCalChars.from_map(device["adc_chars"]),
+            device["time"],
+            # caches written before the names were kept have none
+            device.get("name"),
+        )
+
+
+class DiscoveryCache:
+    """
+    Discovered devices and resolved hostnames, kept in a JSON file
+
+    Entries older than `ttl` are ignored, so that they are probed or resolved again. The file is replaced atomically, so concurrent processes never read a partial file.
+    """
+
+    def __init__(self, path=None, ttl=DISCOVERY_CACHE_TTL):
+        """
+        Args:
+            path (str, optional): Cache file. Default is `scientisst/discovery.json` in the user cache directory (`$XDG_CACHE_HOME`, or `~/.cache`).
+            ttl (float, optional): Seconds an entry stays valid.
+        """
+        if path is None:
+            path = os.path.join(get_cache_dir(), "discovery.json")
+        self.path = path
+        self.ttl = ttl
+
+    def devices(self, com_mode=None):
+        """
+        Returns:
+            devices (list): The valid `DiscoveredDevice`s, optionally only those of `com_mode`.
+        """
+        devices = []
+        for device in self.__load()["devices"].values():
+            if self.__valid(device) and com_mode in (None, device["com_mode"]):
+                devices.append(DiscoveredDevice.from_map(device))
+        return devices
+
+    def get_device(self, address):
+        device = self.__load()["devices"].get(address)
+        if device and self.__valid(device):
+            return DiscoveredDevice.from_map(device)
+        return None
+
+    def put_devices(self, devices):
+        cache = self.__load()
+        for device in devices:
+            cache["devices"][device.address] = device.to_map()
+        self.__save(cache)
+
+    def get_host(self, hostname):
+        """
+        Returns:
+            ip (str): Cached IP address of `hostname`, or None.
+        """
+        host = self.__load()["hosts"].get(hostname)
+        if host and self.__valid(host):
+            return host["ip"]
+        return None
+
+    def put_host(self, hostname, ip):
+        cache = self.__load()
+        cache["hosts"][hostname] = {"ip": ip, "time": time.time()}
+        self.__save(cache)
+
+    def forget_host(self, hostname):
+        cache = self.__load()
+        if cache["hosts"].pop(hostname, None):
+            self.__save(cache)
+
+    def __valid(self, entry):
+        return 0 <= time.time() - entry["time"] < self.ttl
+
+    def __load(self):
+        try:
+            with open(self.path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache.setdefault("devices", {})
+        cache.setdefault("hosts", {})
+        return cache
+
+    def __save(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = "{}.{}".format(self.path, os.getpid())
+            with open(temp_path, "w") as f:
+                json.dump(cache, f, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            # the cache only saves time: never fail because of it
+            sys.stderr.write("Could not write {}: {}\n".format(self.path, e))
+
+
+def probe_device(address, com_mode, timeout=DISCOVERY_TIMEOUT, serial_speed=115200):
+    """
+    Connects to `address` and checks that a device answers the version command
+
+    Args:
+        address (str): Address of the device: Bluetooth MAC address (Linux), serial port, or `host:port` of a device running its own access point (`COM_MODE_TCP_AP`).
+        com_mode (str): Communication mode: `COM_MODE_BT`, `COM_MODE_SERIAL` or `COM_MODE_TCP_AP`.
+        timeout (float, optional): Maximum time (s) to connect and to wait for the answer.
+
+    Returns:
+        device (DiscoveredDevice): The device, or None if it did not answer in time.
+    """
+    deadline = time.perf_counter() + timeout
+    try:
+        if com_mode == COM_MODE_BT and sys.platform == "linux":
+            transport = RfcommTransport(address, timeout)
+        elif com_mode in (COM_MODE_BT, COM_MODE_SERIAL):
+            transport = SerialTransport(address, serial_speed)
+        elif com_mode == COM_MODE_TCP_AP:
+            host, _, port = address.rpartition(":")
+            transport = TcpApTransport(int(port), host or TCP_AP_HOSTNAME, timeout)
+        else:
+            raise InvalidParameterError()
+    except (OSError, ValueError):
+        # also serial.SerialException, which is an OSError
+        return None
+
+    try:
+        transport.send(b"\x07\x00\x00\x00")
+        result = bytearray()
+        buffer = bytearray(1024)
+        while True:
+            index = result.find(b"\x00")
+            if index >= 0 and len(result) >= index + 1 + VERSION_ADC_CHARS_SIZE:
+                break
+            size = transport.recv_into(buffer, deadline - time.perf_counter())
+            if not size:
+                return None
+            result += buffer[:size]
+    except (OSError, ContactingDeviceError):
+        return None
+    finally:
+        transport.close()
+
+    firmware = result[:index].decode("utf-8", "replace")
+    adc_chars = EspAdcCalChars(bytes(result[index + 1:]))
+    return DiscoveredDevice(address, com_mode, firmware, adc_chars, time.time())
+
+
+def discover_devices(
+    candidates=None,
+    timeout=DISCOVERY_TIMEOUT,
+    cache=None,
+    max_workers=DISCOVERY_MAX_WORKERS,
+):
+    """
+    Probes all the candidate addresses concurrently, and caches the devices that answer
+
+    Args:
+        candidates (list, optional): `(address, com_mode)` or `(address, com_mode, name)` tuples to probe. Default is `get_candidates()`.
+        timeout (float, optional): Maximum time (s) to wait for each candidate. All the candidates are probed at once, so this is also about the total time.
+        cache (DiscoveryCache, optional): Cache to store the devices into. Default is the user cache; False not to cache them.
+
+    Returns:
+        devices (list): The `DiscoveredDevice`s that answered, in the order of `candidates`.
+    """
+    if candidates is None:
+        candidates = get_candidates()
+    if not candidates:
+        return []
+
+    with ThreadPoolExecutor(min(max_workers, len(candidates))) as executor:
+        futures = [
+            executor.submit(probe_device, candidate[0], candidate[1], timeout)
+            for candidate in candidates
+        ]
+        devices = [future.result() for future in futures]
+    for device, candidate in zip(devices, candidates):
+        if device and len(candidate) > 2:
+            device.name = candidate[2]
+    devices = [device for device in devices if device]
+
+    if cache is None:
+        cache = DiscoveryCache()
+    if cache and devices:
+        cache.put_devices(devices)
+    return devices
+
+
+def get_candidates():
+    """
+    Addresses that may be ScientISST devices: the paired devices named ScientISST (BlueZ) on Linux, or the serial ports named ScientISST on other platforms
+
+    Returns:
+        candidates (list): `(address, com_mode, name)` tuples, where `name` is the Bluetooth name of the paired device or the description of the serial port (None if it has none).
+    """
+    if sys.platform == "linux":
+        try:
+            import pydbus
+        except ImportError:
+            return []
+
+        candidates = []
+        bus = pydbus.SystemBus()
+        mngd_objs = bus.get("org.bluez", "/").GetManagedObjects()
+        for path in mngd_objs:
+            addr = mngd_objs[path].get("org.bluez.Device1", {}).get("Address")
+            name = mngd_objs[path].get("org.bluez.Device1", {}).get("Name")
+            if name and "scientisst" in name.lower() and (addr, COM_MODE_BT, name) not in candidates:
+                candidates.append((addr, COM_MODE_BT, name))
+        return candidates
+    else:
+        try:
+            import serial.tools.list_ports
+        except ImportError:
+            return []
+
+        return [
+            (port, COM_MODE_BT, desc if desc != "n/a" else None)
+            for port, desc, hwid in sorted(serial.tools.list_ports.comports())
+            if "scientisst" in port.lower()
+        ]
+
+
+def resolve_host(hostname, cache=None):
+    """
+    Resolves `hostname`, e.g. the mDNS name of the device, once per cache TTL
+
+    Returns:
+        ip (str): IP address of `hostname`.
+
+    Raises:
+        OSError: If `hostname` cannot be resolved.
+    """
+    if cache is None:
+        cache = DiscoveryCache()
+    ip = cache.get_host(hostname)
+    if ip is None:
+        ip = socket.getaddrinfo(hostname, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+        cache.put_host(hostname, ip)
+    return ip
@@ -0,0 +1,104 @@
+from itertools import chain
+import numpy as np
+
+# labels of the digital channels, in the order of Frame.digital
+DIGITAL_LABELS = ("I1", "I2", "O1", "O2")
+EDGE_RISING = 1
+EDGE_FALLING = -1
+
+# columns of the events returned by EdgeDetector
+EVENT_SAMPLE = 0
+EVENT_TIMESTAMP = 1
+EVENT_CHANNEL = 2
+EVENT_POLARITY = 3
+
+
+class EdgeDetector:
+    """
+    Finds the rising and falling edges of the digital channels (I1, I2, O1, O2) in whole blocks of frames
+
+    Each block is compared with the last state of the previous one, so edges between two blocks are found too. The first frame ever given sets the initial state: it never holds an edge.
+
+    Events are rows of an int64 array, in time order (and channel order at the same sample):
+
+    - `EVENT_SAMPLE`: index of the frame, counted from the first frame given to the detector.
+    - `EVENT_TIMESTAMP`: sequence number of the frame, or its timestamp in us in `API_MODE_SCIENTISST_V2`.
+    - `EVENT_CHANNEL`: index of the digital channel in `DIGITAL_LABELS`.
+    - `EVENT_POLARITY`: `EDGE_RISING` or `EDGE_FALLING`.
+
+    Attributes:
+        samples (int): Number of frames given to the detector, including those lost in gaps.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.__last = None
+
+    def detect(self, meta):
+        """
+        Finds the edges of a block of frames
+
+        Args:
+            meta (np.array): Sequence numbers and digital states, one row per frame, as the first 5 columns of `Frame.to_matrix()`, or the `meta_out` of `ScientISST.read_into()`.
+
+        Returns:
+            events (np.array): int64 array of shape (events, 4).
+        """
+        meta = np.asarray(meta)
+        if not len(meta):
+            return np.empty((0, 4), dtype=np.int64)
+        digital = meta[:, 1:5]
+        if self.__last is None:
+            self.__last = digital[0]
+        changes = np.diff(digital, axis=0, prepend=self.__last[np.newaxis])
+        frames, channels = np.nonzero(changes)
+
+        events = np.empty((len(frames), 4), dtype=np.int64)
+        events[:, EVENT_SAMPLE] = frames
+        events[:, EVENT_SAMPLE] += self.samples
+        events[:, EVENT_TIMESTAMP] = meta[frames, 0]
+        events[:, EVENT_CHANNEL] = channels
+        events[:, EVENT_POLARITY] = np.sign(changes[frames, channels])
+
+        self.__last = digital[-1].copy()
+        self.samples += len(meta)
+        return events
+
+    def detect_frames(self, frames):
+        """
+        Finds the edges of a list of [`Frame`][scientisst.frame.Frame] objects, as returned by `read()`
+
+        Returns:
+            events (np.array): int64 array of shape (events, 4).
+        """
+        meta = np.empty((len(frames), 5), dtype=np.int64)
+        meta[:, 0] = [frame.seq for frame in frames]
+        # much faster than an array of one list per frame
+        meta[:, 1:].flat = np.fromiter(
+            chain.from_iterable([frame.digital for frame in frames]),
+            dtype=np.int64,
+            count=4 * len(frames),
+        )
+        return self.detect(meta)
+
+    def gap(self, num_frames):
+        """
+        Counts frames lost between two blocks, e.g. while reconnecting, in the sample indexes. An edge during the gap is found on the first frame after it.
+        """
+        self.samples += num_frames
+
+
+def format_events(events):
+    """
+    Returns:
+        lines (list): A tab separated line per event: sample index, timestamp, channel label and "rising" or "falling".
+    """
+    return [
+        "{}\t{}\t{}\t{}".format(
+            sample,
+            timestamp,
+            DIGITAL_LABELS[channel],
+            "rising" if polarity == EDGE_RISING else "falling",
+        )
+        for sample, timestamp, channel, polarity in events.tolist()
+    ]
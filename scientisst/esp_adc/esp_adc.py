@@ -1,9 +1,13 @@
 from scientisst.esp_adc.constants import *
 from scientisst.esp_adc.lut_adc import *
 
+ESP_ADC_CAL_FIELDS = ["adc_num", "atten", "bit_width", "coeff_a", "coeff_b", "vref"]
+
 
 class EspAdcCalChars:
     def __init__(self, buffer):
+        self.__voltages = None
+        self.__table = None
         self.adc_num = int.from_bytes(buffer[0:4], "little")
         self.atten = int.from_bytes(buffer[4:8], "little")
         self.bit_width = int.from_bytes(buffer[8:12], "little")
@@ -26,6 +30,66 @@ class EspAdcCalChars:
             self.low_curve = 0
             self.high_curve = 0
 
+    def to_map(self):
+        return {field: getattr(self, field) for field in ESP_ADC_CAL_FIELDS}
+
+    def to_bytes(self):
+        """
+        The 24-byte characteristics, as sent by the device and accepted by the constructor
+        """
+        return b"".join(
+            getattr(self, field).to_bytes(4, "little") for field in ESP_ADC_CAL_FIELDS
+        )
+
+    def from_map(characteristics):
+        """
+        Builds the characteristics from the `to_map()` dictionary, e.g. as stored in the metadata of a recording
+        """
+        return EspAdcCalChars(
+            b"".join(
+                int(characteristics[field]).to_bytes(4, "little")
+                for field in ESP_ADC_CAL_FIELDS
+            )
+        )
+
+    def raw_to_voltage_list(self):
+        """
+        Voltage of every 12-bit ADC reading, as given by `esp_adc_cal_raw_to_voltage()`, in a list. Built on the first call.
+        """
+        if self.__voltages is None:
+            self.__voltages = [
+                self.esp_adc_cal_raw_to_voltage(r) for r in range(ADC_12_BIT_RES)
+            ]
+        return self.__voltages
+
+    def set_raw_to_voltage_list(self, voltages):
+        """
+        Sets the `raw_to_voltage_list()` computed earlier for the same characteristics, e.g. loaded from a cache
+        """
+        if len(voltages) != ADC_12_BIT_RES:
+            raise ValueError("expected {} voltages".format(ADC_12_BIT_RES))
+        self.__voltages = [int(v) for v in voltages]
+        self.__table = None
+
+    def raw_to_voltage_table(self):
+        """
+        `raw_to_voltage_list()` as a NumPy array. Built on the first call.
+        """
+        if self.__table is None:
+            import numpy as np
+
+            self.__table = np.array(self.raw_to_voltage_list(), dtype=np.int64)
+        return self.__table
+
+    def raw_to_voltage(self, adc_readings):
+        """
+        Vectorized `esp_adc_cal_raw_to_voltage()`, for an array of 12-bit ADC readings
+        """
+        import numpy as np
+
+        readings = np.clip(np.asarray(adc_readings, dtype=np.int64), 0, ADC_12_BIT_RES - 1)
+        return self.raw_to_voltage_table()[readings]
+
     def esp_adc_cal_raw_to_voltage(self, adc_reading):
         adc_reading = adc_reading << (ADC_WIDTH_BIT_12 - self.bit_width)
         if adc_reading > ADC_12_BIT_RES - 1:
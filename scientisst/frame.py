@@ -30,6 +30,7 @@ class Frame:
     seq = -1
 
     def __init__(self, num_channels):
+        self.digital = [0] * 4
         self.a = [0] * num_channels
         self.mv = [-1] * num_channels
 
@@ -0,0 +1,189 @@
+import re
+import sys
+import json
+from scientisst.constants import *
+from scientisst.packet_decoder import BlockDecoder
+
+# keys of the values of each channel, the digital states and the sequence number in a JSON frame
+JSON_CHANNEL_KEYS = {
+    AI1: "AI1",
+    AI2: "AI2",
+    AI3: "AI3",
+    AI4: "AI4",
+    AI5: "AI5",
+    AI6: "AI6",
+    AX1: "AX1",
+    AX2: "AX2",
+}
+JSON_DIGITAL_KEYS = ("I1", "I2", "O1", "O2")
+JSON_SEQ_KEY = "seq"
+
+_MESSAGE_START = re.compile(rb"[{\[]")
+# bytes that do not change the nesting depth: anything but brackets, and whole strings.
+# Nothing follows the repetition and a string matches in a single way, so a string cut by the end of a chunk does not make the matcher backtrack.
+_FLAT = re.compile(rb'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*')
+# the start of a message, up to its first bracket after the opening one
+_FLAT_MESSAGE = re.compile(rb'[\s,]*(\{)(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*')
+_SPACE = re.compile(rb"[\s,]*")
+
+
+class JsonStreamDecoder(BlockDecoder):
+    """
+    Splits the byte stream of `API_MODE_JSON` into messages, and decodes their frames into arrays
+
+    The stream is fed in chunks of any size, e.g. as received from the socket. Each byte is scanned once: the scan stops at the end of a chunk and resumes there with the next one, keeping the nesting depth of the current message, so messages split across chunks are not scanned again (only a string cut by the end of a chunk is). Each complete message is then parsed with `json.loads`.
+
+    A message is a frame, an object such as `{"AI1": 2048, "AX1": 8388608, "I1": 0, "seq": 5}`, or a list of frames. Values may also be numeric strings. Without a `seq` key, frames are numbered by their count, modulo 4096 as in `API_MODE_SCIENTISST`.
+
+    Attributes:
+        message_size (int): Typical size (bytes) of a message with one frame, to size the reads.
+    """
+
+    def __init__(self, channels, adc_chars=None):
+        """
+        Args:
+            channels (list): Acquired channels, in acquisition order.
+            adc_chars (EspAdcCalChars, optional): ADC characteristics of the device, to convert AI channels to mV.
+        """
+        super().__init__(channels, adc_chars)
+        self.__keys = [JSON_CHANNEL_KEYS[ch] for ch in self.channels]
+        example = {key: "4095" for key in self.__keys + list(JSON_DIGITAL_KEYS)}
+        example[JSON_SEQ_KEY] = 4095
+        self.message_size = len(json.dumps(example))
+
+        self.__buffer = bytearray()
+        self.__pos = 0
+        self.__start = None
+        self.__depth = 0
+        self.__rows = []
+        self.__meta = []
+        self.__count = 0
+
+    @property
+    def pending(self):
+        """
+        Number of decoded frames not taken by `decode()` yet
+        """
+        return len(self.__rows)
+
+    def feed(self, data):
+        """
+        Scans a chunk of the stream, and decodes its complete messages
+
+        Invalid messages, and bytes between messages that cannot start one, are skipped with an error message.
+
+        Args:
+            data (bytes): Next bytes of the stream.
+
+        Returns:
+            pending (int): Number of decoded frames not taken by `decode()` yet.
+        """
+        buffer = self.__buffer
+        buffer += data
+        pos = self.__pos
+        start = self.__start
+        depth = self.__depth
+        end = len(buffer)
+        messages = []
+        while pos < end:
+            if start is None:
+                match = _FLAT_MESSAGE.match(buffer, pos)
+                if match and match.end() < end and buffer[match.end()] == 0x7D:
+                    # the common case: a whole message without nested brackets
+                    messages.append(buffer[match.start(1): match.end() + 1])
+                    pos = match.end() + 1
+                    continue
+                pos = _SPACE.match(buffer, pos).end()
+                if pos == end:
+                    break
+                match = _MESSAGE_START.search(buffer, pos)
+                if not match:
+                    if pos < end:
+                        sys.stderr.write("Error decoding JSON\n")
+                    pos = end
+                    break
+                if match.start() != pos:
+                    sys.stderr.write("Error decoding JSON\n")
+                start = match.start()
+                pos = start + 1
+                depth = 1
+                continue
+
+            pos = _FLAT.match(buffer, pos).end()
+            if pos == end or buffer[pos] == 0x22:
+                # the message, or a string in it, continues in the next chunk
+                break
+            if buffer[pos] in b"{[":
+                depth += 1
+            else:
+                depth -= 1
+            pos += 1
+            if not depth:
+                messages.append(buffer[start:pos])
+                start = None
+        self.__messages(messages)
+
+        # drop the bytes of the complete messages
+        cut = pos if start is None else start
+        del buffer[:cut]
+        self.__pos = pos - cut
+        self.__start = None if start is None else 0
+        self.__depth = depth
+        return len(self.__rows)
+
+    def decode(self, raw_out, meta_out=None):
+        """
+        Takes the oldest `len(raw_out)` decoded frames
+
+        Args:
+            raw_out (np.array): Integer array of shape (frames, channels) receiving the raw value of each channel.
+            meta_out (np.array, optional): Integer array of shape (frames, 5) receiving the sequence number and the 4 digital states, as the first 5 columns of `Frame.to_matrix()`.
+
+        Raises:
+            ValueError: If fewer frames are pending.
+        """
+        n = len(raw_out)
+        if n > len(self.__rows):
+            raise ValueError("only {} frames are pending".format(len(self.__rows)))
+        if not n:
+            return
+        raw_out[:] = self.__rows[:n]
+        if meta_out is not None:
+            meta_out[:] = self.__meta[:n]
+        del self.__rows[:n]
+        del self.__meta[:n]
+
+    def __messages(self, messages):
+        if not messages:
+            return
+        try:
+            # one parser call for all the messages of the chunk
+            parsed = json.loads(b"[" + b",".join(messages) + b"]")
+        except ValueError:
+            parsed = []
+            for message in messages:
+                try:
+                    parsed.append(json.loads(message))
+                except ValueError:
+                    sys.stderr.write("Error decoding JSON\n")
+
+        keys = self.__keys
+        rows = self.__rows
+        metas = self.__meta
+        for message in parsed:
+            for frame in message if isinstance(message, list) else (message,):
+                try:
+                    row = [int(frame[key]) for key in keys]
+                    meta = [
+                        int(frame[JSON_SEQ_KEY])
+                        if JSON_SEQ_KEY in frame
+                        else self.__count & 0xFFF
+                    ]
+                    for key in JSON_DIGITAL_KEYS:
+                        meta.append(1 if int(frame.get(key, 0)) else 0)
+                except (KeyError, ValueError, TypeError, AttributeError):
+                    sys.stderr.write("Error decoding JSON\n")
+                    continue
+                rows.append(row)
+                metas.append(meta)
+                self.__count += 1
@@ -0,0 +1,232 @@
+import time
+from threading import Thread, Event
+from scientisst.exceptions import InvalidParameterError
+
+OUTPUT_DAC = "dac"
+OUTPUT_TRIGGER = "trigger"
+
+# the player sleeps until this many seconds before each event, then spins
+OUTPUT_SPIN_TIME = 0.002
+
+
+class OutputSchedule:
+    """
+    Timed sequence of digital (trigger) and analog (DAC) output changes
+
+    Play it during an acquisition with [`ScientISST.play()`][scientisst.scientisst.ScientISST.play].
+
+    Attributes:
+        events (list): `(time, kind, value)` tuples, where `time` is the offset in seconds from the start of the schedule and `kind` is `OUTPUT_DAC` or `OUTPUT_TRIGGER`.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def dac(self, t, voltage):
+        """
+        Sets the analog output at time `t`
+
+        Args:
+            t (float): Offset (s) from the start of the schedule.
+            voltage (float): Analog output value to set (0V-3.3V).
+
+        Returns:
+            schedule (OutputSchedule): This schedule, to chain calls.
+
+        Raises:
+            InvalidParameterError: If the voltage is outside of 0V-3.3V.
+        """
+        # checked here, as ScientISST.dac() would only raise it in the player thread
+        if voltage < 0 or voltage > 3.3:
+            raise InvalidParameterError()
+        self.events.append((t, OUTPUT_DAC, voltage))
+        return self
+
+    def trigger(self, t, digital_output):
+        """
+        Sets the digital outputs at time `t`
+
+        Args:
+            t (float): Offset (s) from the start of the schedule.
+            digital_output (list): Vector of 2 booleans to assign to the digital outputs (O1, O2).
+
+        Returns:
+            schedule (OutputSchedule): This schedule, to chain calls.
+
+        Raises:
+            InvalidParameterError: If the length of `digital_output` is different from 2.
+        """
+        if len(digital_output) != 2:
+            raise InvalidParameterError()
+        self.events.append((t, OUTPUT_TRIGGER, list(digital_output)))
+        return self
+
+    def dac_waveform(self, voltages, rate, start=0):
+        """
+        Plays a sampled waveform on the analog output
+
+        Args:
+            voltages (list): Samples of the waveform (0V-3.3V).
+            rate (float): Samples per second.
+            start (float, optional): Offset (s) of the first sample. Default is 0.
+
+        Returns:
+            schedule (OutputSchedule): This schedule, to chain calls.
+        """
+        for i, voltage in enumerate(voltages):
+            self.dac(start + i / rate, voltage)
+        return self
+
+    def pulse_train(self, count, rate, width, output=0, start=0):
+        """
+        Plays a train of pulses on one digital output (the other output is kept low)
+
+        Args:
+            count (int): Number of pulses.
+            rate (float): Pulses per second.
+            width (float): Pulse width (s). Must be shorter than `1 / rate`.
+            output (int, optional): Digital output index, 0 for O1 or 1 for O2. Default is O1.
+            start (float, optional): Offset (s) of the first rising edge. Default is 0.
+
+        Returns:
+            schedule (OutputSchedule): This schedule, to chain calls.
+        """
+        high = [False, False]
+        high[output] = True
+        for i in range(count):
+            self.trigger(start + i / rate, high)
+            self.trigger(start + i / rate + width, [False, False])
+        return self
+
+    def duration(self):
+        """
+        Returns:
+            duration (float): Offset (s) of the last event.
+        """
+        return max((event[0] for event in self.events), default=0)
+
+
+class OutputPlayer:
+    """
+    Plays an [`OutputSchedule`][scientisst.output_schedule.OutputSchedule] on a timer thread
+
+    Returned by [`ScientISST.play()`][scientisst.scientisst.ScientISST.play]. Events that are due while the previous one is still being sent are sent late, never skipped.
+
+    Attributes:
+        sent (list): `(scheduled, actual)` `time.perf_counter()` pairs of each sent event, to measure the timing error.
+    """
+
+    def __init__(self, scientisst, schedule, repeat=1, period=None):
+        self.sent = []
+        self.__scientisst = scientisst
+        self.__events = sorted(schedule.events, key=lambda event: event[0])
+        self.__repeat = repeat
+        self.__period = period if period else schedule.duration()
+        self.__event = Event()
+        # exception raised while sending an event, raised again by wait() and stop()
+        self.__error = None
+        self.thread = Thread(target=self.__target, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the schedule before its end.
+
+        Raises:
+            Exception: The exception that stopped the schedule, if sending an event failed, e.g. `ContactingDeviceError`.
+        """
+        self.__event.set()
+        self.thread.join()
+        self.__raise_error()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the schedule to end.
+
+        Args:
+            timeout (float, optional): Maximum time (s) to wait.
+
+        Returns:
+            done (bool): True if the schedule ended.
+
+        Raises:
+            Exception: The exception that stopped the schedule, if sending an event failed, e.g. `ContactingDeviceError`.
+        """
+        self.thread.join(timeout)
+        self.__raise_error()
+        return not self.thread.is_alive()
+
+    def __raise_error(self):
+        if self.__error is not None:
+            raise self.__error
+
+    def __target(self):
+        try:
+            self.__play()
+        except Exception as e:
+            self.__error = e
+
+    def __play(self):
+        start = time.perf_counter()
+        for iteration in range(self.__repeat):
+            offset = start + iteration * self.__period
+            for t, kind, value in self.__events:
+                scheduled = offset + t
+                remaining = scheduled - time.perf_counter()
+                if remaining > OUTPUT_SPIN_TIME:
+                    if self.__event.wait(remaining - OUTPUT_SPIN_TIME):
+                        return
+                while time.perf_counter() < scheduled:
+                    pass
+                if self.__event.is_set():
+                    return
+
+                if kind == OUTPUT_DAC:
+                    self.__scientisst.dac(value)
+                else:
+                    self.__scientisst.trigger(value)
+                self.sent.append((scheduled, time.perf_counter()))
+
+
+def measure_loopback_latency(scientisst, output=0, input=2, repeats=10, timeout=1.0):
+    """
+    Measures the time from setting a digital output until the change is seen in the received frames
+
+    Uses [`read_available()`][scientisst.scientisst.ScientISST.read_available] during a running acquisition, so the frames it reads are not returned to the caller.
+
+    Args:
+        scientisst (ScientISST): Device in acquisition mode.
+        output (int, optional): Digital output to toggle, 0 for O1 or 1 for O2. Default is O1.
+        input (int, optional): Index in `Frame.digital` where the change is expected. Default is 2, the O1 state reported by ScientISST 2. Use 0 or 1 when the output is wired to I1 or I2.
+        repeats (int, optional): Number of toggles. Default is 10.
+        timeout (float, optional): Maximum time (s) to wait for each change. Default is 1.
+
+    Returns:
+        latencies (list): Loopback latency (s) of each toggle, or None where the change was not seen within `timeout`.
+    """
+    latencies = []
+    level = False
+    scientisst.trigger([False, False])
+    for _ in range(repeats):
+        # let the previous state settle and drop the frames received meanwhile
+        time.sleep(0.05)
+        scientisst.read_available()
+
+        level = not level
+        digital_output = [False, False]
+        digital_output[output] = level
+
+        sent = time.perf_counter()
+        scientisst.trigger(digital_output)
+        latency = None
+        while time.perf_counter() - sent < timeout:
+            frames = scientisst.read_available(timeout=timeout)
+            if any(frame.digital[input] == level for frame in frames):
+                latency = time.perf_counter() - sent
+                break
+        latencies.append(latency)
+
+    scientisst.trigger([False, False])
+    return latencies
@@ -0,0 +1,361 @@
+import numpy as np
+from scientisst.constants import *
+from scientisst.exceptions import *
+from scientisst.conversion import ax_to_mv
+
+CRC4_TABLE = np.array([0, 3, 6, 5, 12, 15, 10, 9, 11, 8, 13, 14, 7, 4, 1, 2], dtype=np.uint8)
+
+_AX = 0
+_AI_LOW = 1
+_AI_HIGH = 2
+
+# parts of each BITalino channel: (byte from the end of the packet, mask, shift), left shifts positive
+_BITALINO_LAYOUT = (
+    ((2, 0x0F, 6), (3, 0xFC, -2)),
+    ((3, 0x03, 8), (4, 0xFF, 0)),
+    ((5, 0xFF, 2), (6, 0xC0, -6)),
+    ((6, 0x3F, 4), (7, 0xF0, -4)),
+    ((7, 0x0F, 2), (8, 0xC0, -6)),
+    ((8, 0x3F, 0),),
+)
+
+
+class BlockDecoder:
+    """
+    Base of the decoders that write whole blocks of frames into arrays: converts them to mV and builds `Frame` objects from them
+    """
+
+    def __init__(self, channels, adc_chars=None, ai_bits=None):
+        """
+        Args:
+            channels (list): Acquired channels, in acquisition order.
+            adc_chars (EspAdcCalChars, optional): ADC characteristics of the device, to convert AI channels to mV.
+            ai_bits (list, optional): Bits of the raw value of each channel, when the AI channels are sent with less than the 12 bits of the ADC.
+        """
+        self.channels = list(channels)
+        self.__adc_chars = adc_chars
+        self.__ai_table = None
+        # a raw value of fewer bits is the ADC value without its lowest bits
+        self.__ai_steps = [
+            1 << (12 - bits) for bits in (ai_bits or [12] * len(self.channels))]
+
+    def convert(self, raw, mv_out):
+        """
+        Converts the raw values to mV, as `ScientISST.read()` does
+
+        Args:
+            raw (np.array): Raw values of shape (frames, channels), as given by `decode()`.
+            mv_out (np.array): float64 array of the same shape receiving the values in mV.
+
+        Raises:
+            ValueError: If there are AI channels and no ADC characteristics.
+        """
+        for index, ch in enumerate(self.channels):
+            column = mv_out[:, index]
+            if ch == AX1 or ch == AX2:
+                ax_to_mv(raw[:, index], out=column)
+            elif self.__adc_chars is None:
+                raise ValueError(
+                    "ADC characteristics are needed to convert AI{} to mV".format(ch))
+            else:
+                if self.__ai_table is None:
+                    self.__ai_table = self.__adc_chars.raw_to_voltage_table().astype(
+                        np.float64)
+                np.take(
+                    self.__ai_table[:: self.__ai_steps[index]],
+                    raw[:, index],
+                    out=column,
+                    mode="clip",
+                )
+
+    def frames(self, raw, meta, mv=None):
+        """
+        Builds `Frame` objects from decoded arrays
+
+        Args:
+            raw (np.array): Raw values, as given by `decode()`.
+            meta (np.array): Sequence numbers and digital states, as given by `decode()`.
+            mv (np.array, optional): Values in mV, as given by `convert()`.
+
+        Returns:
+            frames (list): The same [`Frame`][scientisst.frame.Frame] objects that `ScientISST.read()` returns for these frames.
+        """
+        from scientisst.frame import Frame
+
+        # Python values, as read() gives them: AI channels are whole mV
+        seqs = meta[:, 0].tolist()
+        digitals = meta[:, 1:].tolist()
+        raws = raw.tolist()
+        if mv is not None:
+            mv_columns = [
+                mv[:, index].tolist()
+                if ch == AX1 or ch == AX2
+                else mv[:, index].astype(np.int64).tolist()
+                for index, ch in enumerate(self.channels)
+            ]
+            mvs = [list(values) for values in zip(*mv_columns)]
+        num_chs = len(self.channels)
+        frames = []
+        for i in range(len(raws)):
+            f = Frame(num_chs)
+            f.seq = seqs[i]
+            f.digital = digitals[i]
+            f.a = raws[i]
+            if mv is not None:
+                f.mv = mvs[i]
+            frames.append(f)
+        return frames
+
+
+class PacketDecoder(BlockDecoder):
+    """
+    Decodes whole blocks of packets with NumPy, into caller-provided arrays
+
+    It gives the same values as `ScientISST.read()`, column by column instead of frame by frame. Intermediate results go to scratch arrays that are reused while the block size does not grow, so decoding a block of the same size again does not allocate memory.
+
+    Attributes:
+        packet_size (int): Size (bytes) of each packet.
+    """
+
+    def __init__(self, api, channels, adc_chars=None):
+        """
+        Args:
+            api (int): API mode of the packets, `API_MODE_SCIENTISST`, `API_MODE_SCIENTISST_V2` or `API_MODE_BITALINO`.
+            channels (list): Acquired channels, in acquisition order.
+            adc_chars (EspAdcCalChars, optional): ADC characteristics of the device, to convert AI channels to mV.
+
+        Raises:
+            NotSupportedError: If the packets of `api` cannot be decoded, or carry fewer channels than `channels` (`API_MODE_BITALINO` carries up to 6 AI channels).
+        """
+        if api == API_MODE_BITALINO:
+            if len(channels) > len(BITALINO_CHANNEL_BITS) or AX1 in channels or AX2 in channels:
+                raise NotSupportedError()
+            self.__initBitalino(channels, adc_chars)
+            return
+        elif api == API_MODE_SCIENTISST:
+            trailer = 3
+        elif api == API_MODE_SCIENTISST_V2:
+            trailer = 6
+        else:
+            raise NotSupportedError()
+        super().__init__(channels, adc_chars)
+        self.api = api
+
+        # walk the channels from last to first, as they are packed
+        self.__layout = [None] * len(channels)
+        byte_it = 0
+        mid_frame_flag = False
+        for index in range(len(channels) - 1, -1, -1):
+            if channels[index] == AX1 or channels[index] == AX2:
+                self.__layout[index] = (byte_it, _AX)
+                byte_it += 3
+            elif not mid_frame_flag:
+                self.__layout[index] = (byte_it, _AI_LOW)
+                byte_it += 1
+                mid_frame_flag = True
+            else:
+                self.__layout[index] = (byte_it, _AI_HIGH)
+                byte_it += 2
+                mid_frame_flag = False
+        # with an odd number of AI channels, the 4 bits left of the last one live in the IO byte
+        self.packet_size = byte_it + trailer
+        self.__io = self.packet_size - trailer
+
+        # nibbles covered by the CRC, in order: all but the CRC nibble itself
+        crc_byte = self.packet_size - (2 if api == API_MODE_SCIENTISST else 5)
+        self.__crc_nibbles = []
+        for i in range(self.packet_size):
+            self.__crc_nibbles.append((i, 4))
+            if i != crc_byte:
+                self.__crc_nibbles.append((i, 0))
+        self.__crc_byte = crc_byte
+
+        self.__size = 0
+        self.__grow(1)
+
+    def __initBitalino(self, channels, adc_chars):
+        bits = BITALINO_CHANNEL_BITS[: len(channels)]
+        super().__init__(channels, adc_chars, bits)
+        self.api = API_MODE_BITALINO
+
+        # 4 bits of CRC, 4 of sequence number and 4 of digital inputs, then the channels from the end of the packet
+        self.packet_size = (12 + sum(bits) + 7) // 8
+        self.__layout = [
+            [(self.packet_size - byte, mask, shift) for byte, mask, shift in parts]
+            for parts in _BITALINO_LAYOUT[: len(channels)]
+        ]
+        self.__io = self.packet_size - 2
+
+        # the CRC nibble is the last one
+        self.__crc_byte = self.packet_size - 1
+        self.__crc_nibbles = []
+        for i in range(self.packet_size):
+            self.__crc_nibbles.append((i, 4))
+            if i != self.__crc_byte:
+                self.__crc_nibbles.append((i, 0))
+
+        self.__size = 0
+        self.__grow(1)
+
+    def check_crc(self, packets):
+        """
+        Args:
+            packets (np.array): uint8 array of shape (frames, packet_size).
+
+        Returns:
+            valid (np.array): Whether the CRC of each packet is valid. The array is reused by the next call.
+        """
+        n = len(packets)
+        self.__grow(n)
+        crc = self.__crc[:n]
+        nibble = self.__nibble[:n]
+        crc[:] = 0
+        for byte, shift in self.__crc_nibbles:
+            np.take(CRC4_TABLE, crc, out=crc, mode="clip")
+            np.right_shift(packets[:, byte], shift, out=nibble)
+            if not shift:
+                np.bitwise_and(nibble, 0x0F, out=nibble)
+            np.bitwise_xor(crc, nibble, out=crc)
+        np.take(CRC4_TABLE, crc, out=crc, mode="clip")
+        np.bitwise_and(packets[:, self.__crc_byte], 0x0F, out=nibble)
+        valid = self.__valid[:n]
+        np.equal(crc, nibble, out=valid)
+        return valid
+
+    def decode(self, packets, raw_out, meta_out=None):
+        """
+        Decodes the raw channel values, and optionally the sequence numbers and digital states
+
+        Args:
+            packets (np.array): uint8 array of shape (frames, packet_size), with valid CRCs.
+            raw_out (np.array): Integer array of shape (frames, channels) receiving the raw values.
+            meta_out (np.array, optional): Integer array of shape (frames, 5) receiving the sequence number (the timestamp in us in `API_MODE_SCIENTISST_V2`, which needs 64-bit integers) and the 4 digital states, as the first 5 columns of `Frame.to_matrix()`.
+        """
+        n = len(packets)
+        self.__grow(n)
+        scratch = self.__scratch[:n]
+        if self.api == API_MODE_BITALINO:
+            self.__decodeBitalino(packets, raw_out, meta_out, scratch)
+            return
+        for index, (byte, kind) in enumerate(self.__layout):
+            column = raw_out[:, index]
+            if kind == _AX:
+                np.left_shift(packets[:, byte + 2], 16, out=column, dtype=column.dtype)
+                np.left_shift(packets[:, byte + 1], 8, out=scratch, dtype=scratch.dtype)
+                np.bitwise_or(column, scratch, out=column)
+                np.bitwise_or(column, packets[:, byte], out=column)
+            else:
+                np.left_shift(packets[:, byte + 1], 8, out=column, dtype=column.dtype)
+                np.bitwise_or(column, packets[:, byte], out=column)
+                if kind == _AI_LOW:
+                    np.bitwise_and(column, 0xFFF, out=column)
+                else:
+                    np.right_shift(column, 4, out=column)
+
+        if meta_out is None:
+            return
+        seq = meta_out[:, 0]
+        size = self.packet_size
+        if self.api == API_MODE_SCIENTISST:
+            np.left_shift(packets[:, size - 1], 4, out=seq, dtype=seq.dtype)
+            np.right_shift(packets[:, size - 2], 4, out=scratch)
+            np.bitwise_or(seq, scratch, out=seq)
+        else:
+            np.left_shift(packets[:, size - 1], 28, out=seq, dtype=seq.dtype)
+            for byte, shift in ((size - 2, 20), (size - 3, 12), (size - 4, 4)):
+                np.left_shift(packets[:, byte], shift, out=scratch, dtype=scratch.dtype)
+                np.bitwise_or(seq, scratch, out=seq)
+            np.right_shift(packets[:, size - 5], 4, out=scratch)
+            np.bitwise_or(seq, scratch, out=seq)
+        for i in range(4):
+            digital = meta_out[:, 1 + i]
+            np.right_shift(packets[:, self.__io], 7 - i, out=digital, dtype=digital.dtype)
+            np.bitwise_and(digital, 1, out=digital)
+
+    def __decodeBitalino(self, packets, raw_out, meta_out, scratch):
+        for index, parts in enumerate(self.__layout):
+            column = raw_out[:, index]
+            for i, (byte, mask, shift) in enumerate(parts):
+                part = scratch if i else column
+                np.bitwise_and(packets[:, byte], mask, out=part, dtype=part.dtype)
+                if shift > 0:
+                    np.left_shift(part, shift, out=part)
+                elif shift < 0:
+                    np.right_shift(part, -shift, out=part)
+                if i:
+                    np.bitwise_or(column, part, out=column)
+
+        if meta_out is None:
+            return
+        seq = meta_out[:, 0]
+        np.right_shift(packets[:, self.packet_size - 1], 4, out=seq, dtype=seq.dtype)
+        for i in range(4):
+            digital = meta_out[:, 1 + i]
+            np.right_shift(packets[:, self.__io], 7 - i, out=digital, dtype=digital.dtype)
+            np.bitwise_and(digital, 1, out=digital)
+
+    def __grow(self, n):
+        if n <= self.__size:
+            return
+        self.__size = n
+        self.__crc = np.empty(n, dtype=np.uint8)
+        self.__nibble = np.empty(n, dtype=np.uint8)
+        self.__valid = np.empty(n, dtype=bool)
+        self.__scratch = np.empty(n, dtype=np.int64)
+
+
+def decode_packets(
+    data, channels, api=API_MODE_SCIENTISST, adc_chars=None, convert=True, matrix=False
+):
+    """
+    Decodes packets returned by `ScientISST.read_raw()`, e.g. saved during the acquisition and decoded later on another computer
+
+    Args:
+        data (bytes): Whole packets, as returned by `read_raw()`.
+        channels (list): Channels of the acquisition, as given to `ScientISST.start()`. All the channels if empty.
+        api (int, optional): API mode of the acquisition. Default is `API_MODE_SCIENTISST`.
+        adc_chars (EspAdcCalChars, optional): ADC characteristics of the device, or their 24-byte `EspAdcCalChars.to_bytes()` blob. Only needed to convert AI channels to mV.
+        convert (bool, optional): Convert from raw to mV.
+        matrix (bool, optional): Return the frames in a `np.array` (matrix) form.
+
+    Returns:
+        frames (list): The same [`Frame`][scientisst.frame.Frame] objects (or matrix) that `ScientISST.read()` returns for these packets.
+
+    Raises:
+        ValueError: If `data` is not made of whole packets with valid CRCs, or there are AI channels to convert and no ADC characteristics.
+        NotSupportedError: If the packets of `api` cannot be decoded.
+    """
+    from scientisst.esp_adc.esp_adc import EspAdcCalChars
+
+    if isinstance(adc_chars, (bytes, bytearray, memoryview)):
+        adc_chars = EspAdcCalChars(adc_chars)
+    if not channels:
+        # all the channels, as in ScientISST.start(): BITalino packets only carry the AI channels
+        channels = list(range(1, (AI6 if api == API_MODE_BITALINO else AX2) + 1))
+    decoder = PacketDecoder(api, channels, adc_chars)
+
+    packets = np.frombuffer(data, dtype=np.uint8)
+    if len(packets) % decoder.packet_size:
+        raise ValueError(
+            "data is not made of whole {}-byte packets".format(decoder.packet_size))
+    packets = packets.reshape(-1, decoder.packet_size)
+    invalid = np.flatnonzero(~decoder.check_crc(packets))
+    if len(invalid):
+        raise ValueError("packet {} has an invalid CRC".format(invalid[0]))
+
+    num_frames = len(packets)
+    num_chs = len(channels)
+    raw = np.empty((num_frames, num_chs), dtype=np.int64)
+    meta = np.empty((num_frames, 5), dtype=np.int64)
+    decoder.decode(packets, raw, meta)
+    mv = None
+    if convert:
+        mv = np.empty((num_frames, num_chs), dtype=np.float64)
+        decoder.convert(raw, mv)
+
+    if matrix:
+        if mv is None:
+            return np.hstack([meta, raw])
+        return np.hstack([meta, np.stack([raw, mv], axis=2).reshape(num_frames, -1)])
+
+    return decoder.frames(raw, meta, mv)
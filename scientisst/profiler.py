@@ -0,0 +1,153 @@
+import sys
+from array import array
+from time import perf_counter_ns
+
+PROFILER_RING_SIZE = 4096
+
+
+class ProfilerStage:
+    """
+    Timing samples of a single profiled stage
+
+    The last `size` samples are kept in a preallocated ring, so recording does not allocate.
+
+    Attributes:
+        name (str): Stage name. Nested stages are separated by `;` (e.g. "read;crc").
+
+        count (int): Total number of recorded samples.
+
+        total (int): Sum of all recorded samples in nanoseconds.
+    """
+
+    def __init__(self, name, size=PROFILER_RING_SIZE):
+        self.name = name
+        self.count = 0
+        self.total = 0
+        self.__samples = array("q", bytes(8 * size))
+        self.__size = size
+
+    def record(self, elapsed_ns):
+        self.__samples[self.count % self.__size] = elapsed_ns
+        self.count += 1
+        self.total += elapsed_ns
+
+    def percentile(self, q):
+        """
+        Percentile of the samples currently in the ring
+
+        Args:
+            q (float): Percentile to compute, between 0 and 100.
+
+        Returns:
+            value (int): Sample value in nanoseconds.
+        """
+        samples = sorted(self.__samples[: min(self.count, self.__size)])
+        if not samples:
+            return 0
+        return samples[min(int(len(samples) * q / 100), len(samples) - 1)]
+
+
+class Profiler:
+    """
+    Per-stage `perf_counter_ns` profiler
+
+    Assign it to `ScientISST.profiler` and to the `sense_src` threads to time each stage of `read()` and each `thread_method`.
+
+    Attributes:
+        size (int): Number of samples kept per stage.
+    """
+
+    def __init__(self, size=PROFILER_RING_SIZE):
+        self.size = size
+        self.__stages = {}
+        self.__start = perf_counter_ns()
+        self.__end = None
+
+    def record(self, name, elapsed_ns):
+        """
+        Records a sample for the stage `name`
+
+        Args:
+            name (str): Stage name. Nested stages are separated by `;`.
+            elapsed_ns (int): Elapsed time in nanoseconds.
+        """
+        stage = self.__stages.get(name)
+        if stage is None:
+            stage = ProfilerStage(name, self.size)
+            self.__stages[name] = stage
+        stage.record(elapsed_ns)
+
+    def start(self):
+        """
+        Restarts the wall time used to compute each stage share.
+        """
+        self.__start = perf_counter_ns()
+        self.__end = None
+
+    def stop(self):
+        """
+        Freezes the wall time used to compute each stage share.
+        """
+        self.__end = perf_counter_ns()
+
+    def wall_time(self):
+        """
+        Returns:
+            wall_time (int): Nanoseconds between `start()` (or the profiler creation) and `stop()` (or now).
+        """
+        end = self.__end if self.__end is not None else perf_counter_ns()
+        return end - self.__start
+
+    def stages(self):
+        """
+        Returns:
+            stages (list): Recorded [`ProfilerStage`][scientisst.profiler.ProfilerStage] objects, sorted by name.
+        """
+        return [self.__stages[name] for name in sorted(self.__stages)]
+
+    def report(self, file=sys.stdout):
+        """
+        Writes a per-stage breakdown: number of samples, p50, p99 and share of wall time
+
+        Args:
+            file (file, optional): Where to write the report. Default is `sys.stdout`.
+        """
+        wall = self.wall_time()
+        file.write(
+            "{:<32}{:>10}{:>12}{:>12}{:>9}\n".format(
+                "Stage", "Count", "p50 (us)", "p99 (us)", "Wall %"
+            )
+        )
+        for stage in self.stages():
+            file.write(
+                "{:<32}{:>10}{:>12.1f}{:>12.1f}{:>9.2f}\n".format(
+                    stage.name,
+                    stage.count,
+                    stage.percentile(50) / 1000,
+                    stage.percentile(99) / 1000,
+                    100 * stage.total / wall if wall else 0,
+                )
+            )
+
+    def dump_collapsed(self, filename):
+        """
+        Writes the stages in the collapsed stack format used by flamegraph tools
+
+        Each line holds a `;` separated stack and its self time in microseconds.
+
+        Args:
+            filename (str): Output file path.
+        """
+        stages = self.stages()
+        with open(filename, "w") as f:
+            for stage in stages:
+                prefix = stage.name + ";"
+                children = sum(
+                    child.total
+                    for child in stages
+                    if child.name.startswith(prefix)
+                    and ";" not in child.name[len(prefix):]
+                )
+                self_time = max(stage.total - children, 0) // 1000
+                if self_time:
+                    f.write("{} {}\n".format(stage.name, self_time))
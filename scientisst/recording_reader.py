@@ -0,0 +1,191 @@
+import io
+import os
+import ast
+from collections import deque
+from contextlib import nullcontext
+from multiprocessing import Pool
+import numpy as np
+
+# bytes of text parsed by each task, about 30 MB of float64 values
+RECORDING_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def read_metadata(path):
+    """
+    Reads the header of a recording written by `sense.py`, without evaluating it as code
+
+    Args:
+        path (str): Recording to read.
+
+    Returns:
+        metadata (dict): Metadata of the first line, e.g. `metadata["Channels"]`.
+        header (list): Labels of the columns.
+        offset (int): Position of the first frame in the file, in bytes.
+
+    Raises:
+        ValueError: If the recording has no valid metadata header.
+    """
+    with open(path, "rb") as f:
+        line = f.readline()
+        header = f.readline()
+        offset = f.tell()
+    if not line.startswith(b"#") or not header.endswith(b"\n"):
+        raise ValueError("{} has no metadata header".format(path))
+    try:
+        metadata = ast.literal_eval(line[1:].decode().strip())
+    except (ValueError, SyntaxError, UnicodeDecodeError):
+        raise ValueError("{} has an invalid metadata header".format(path))
+    if not isinstance(metadata, dict):
+        raise ValueError("{} has an invalid metadata header".format(path))
+    return metadata, header.decode().rstrip("\n").split("\t"), offset
+
+
+def split_recording(path, chunk_size=RECORDING_CHUNK_SIZE):
+    """
+    Splits the frames of a recording into byte ranges of whole lines, that can be parsed independently
+
+    An incomplete last line, as left by a crash during the recording, is not part of any range.
+
+    Args:
+        path (str): Recording to split.
+        chunk_size (int, optional): Approximate size of each range, in bytes. Default is `RECORDING_CHUNK_SIZE`.
+
+    Returns:
+        ranges (list): `(start, end)` positions of each range in the file.
+
+    Raises:
+        ValueError: If the recording has no valid metadata header, or `chunk_size` is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    _, _, start = read_metadata(path)
+    with open(path, "rb") as f:
+        end = _last_line_end(f, start)
+        ranges = []
+        while start < end:
+            f.seek(min(start + chunk_size, end) - 1)
+            # the range ends after the newline at, or following, the approximate end
+            f.readline()
+            stop = min(f.tell(), end)
+            ranges.append((start, stop))
+            start = stop
+    return ranges
+
+
+def read_recording(path, jobs=None, chunk_size=RECORDING_CHUNK_SIZE, dtype=np.float64):
+    """
+    Loads all the frames of a recording written by `sense.py`, parsing its chunks in parallel processes
+
+    Each chunk is read and parsed once, and the parsed blocks are joined into a single array. Comment lines, e.g. the `#Gap` lines written when the connection was lost, are skipped.
+
+    Args:
+        path (str): Recording to read.
+        jobs (int, optional): Number of processes. Default is the number of CPUs.
+        chunk_size (int, optional): Approximate size of the text parsed by each task, in bytes. Default is `RECORDING_CHUNK_SIZE`.
+        dtype (np.dtype, optional): Type of the values. Default is float64, which holds the mV values and the V2 timestamps exactly.
+
+    Returns:
+        metadata (dict): Metadata of the recording.
+        frames (np.array): One row per frame and one column per label of `metadata["Header"]`, as in `Frame.to_matrix()`.
+
+    Raises:
+        ValueError: If the recording has no valid metadata header, or a line cannot be parsed.
+    """
+    metadata, header, _ = read_metadata(path)
+    ranges = split_recording(path, chunk_size)
+    tasks = [(path, start, end, len(header), dtype) for start, end in ranges]
+
+    jobs = _jobs(jobs, len(tasks))
+    # a single process parses in place, without the cost of starting a pool
+    with Pool(jobs) if jobs > 1 else nullcontext() as pool:
+        blocks = list((pool.imap if pool else map)(_parse_lines, tasks))
+    if not blocks:
+        return metadata, np.empty((0, len(header)), dtype=dtype)
+    return metadata, np.concatenate(blocks)
+
+
+def iter_recording(path, jobs=None, chunk_size=RECORDING_CHUNK_SIZE, dtype=np.float64):
+    """
+    Iterates over the frames of a recording written by `sense.py`, in blocks parsed in parallel processes
+
+    At most two blocks per process are parsed ahead, so memory does not grow with the size of the recording.
+
+    Args:
+        path (str): Recording to read.
+        jobs (int, optional): Number of processes. Default is the number of CPUs.
+        chunk_size (int, optional): Approximate size of the text of each block, in bytes. Default is `RECORDING_CHUNK_SIZE`.
+        dtype (np.dtype, optional): Type of the values. Default is float64.
+
+    Returns:
+        blocks (generator): Arrays of consecutive frames, in the order of the recording, with one column per label of the header.
+
+    Raises:
+        ValueError: If the recording has no valid metadata header. Lines that cannot be parsed raise it while iterating.
+    """
+    _, header, _ = read_metadata(path)
+    ranges = split_recording(path, chunk_size)
+    tasks = [(path, start, end, len(header), dtype) for start, end in ranges]
+    return _iter_blocks(tasks, jobs)
+
+
+def _iter_blocks(tasks, jobs):
+    jobs = _jobs(jobs, len(tasks))
+    if jobs == 1:
+        for task in tasks:
+            yield _parse_lines(task)
+        return
+    with Pool(jobs) as pool:
+        tasks = iter(tasks)
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(_parse_lines, (task,)))
+            if len(pending) == 2 * jobs:
+                break
+        while pending:
+            block = pending.popleft().get()
+            task = next(tasks, None)
+            if task:
+                pending.append(pool.apply_async(_parse_lines, (task,)))
+            yield block
+
+
+def _jobs(jobs, tasks):
+    return max(min(jobs or os.cpu_count() or 1, tasks), 1)
+
+
+def _last_line_end(f, start):
+    end = f.seek(0, io.SEEK_END)
+    while end > start:
+        f.seek(max(end - 4096, start))
+        data = f.read(end - f.tell())
+        newline = data.rfind(b"\n")
+        if newline != -1:
+            return end - len(data) + newline + 1
+        end -= len(data)
+    return start
+
+
+def _read(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _parse_lines(task):
+    path, start, end, columns, dtype = task
+    data = _read(path, start, end)
+    try:
+        block = np.loadtxt(
+            io.BytesIO(data), dtype=dtype, delimiter="\t", comments="#", ndmin=2
+        )
+    except ValueError as e:
+        raise ValueError("{}: bytes {} to {}: {}".format(path, start, end, e))
+    if block.size == 0:
+        return np.empty((0, columns), dtype=dtype)
+    if block.shape[1] != columns:
+        raise ValueError(
+            "{}: bytes {} to {}: {} columns instead of {}".format(
+                path, start, end, block.shape[1], columns
+            )
+        )
+    return block
@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class RollingWindow:
+    """
+    Keeps the last samples of each channel in a circular NumPy buffer, for analyses on sliding windows
+
+    Appending a block costs the same whatever the number of samples kept, and memory does not grow. Every sample is stored twice, `capacity` samples apart, so that any window of up to `capacity` samples is a contiguous view of the buffer, even across the end of the circle: windows are never copied.
+
+    The values of each channel are contiguous: windows have one row per channel and one column per sample.
+
+    Attributes:
+        capacity (int): Number of samples kept of each channel.
+
+        channels (int): Number of channels.
+
+        total (int): Number of samples appended since the creation.
+
+        skipped (int): Windows of `windows()` skipped because their samples were overwritten before the call.
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float64):
+        """
+        Args:
+            capacity (int): Number of samples kept of each channel.
+            channels (int): Number of channels.
+            dtype (np.dtype, optional): Type of the values. Default is float64.
+
+        Raises:
+            ValueError: If `capacity` or `channels` is not positive.
+        """
+        if capacity <= 0 or channels <= 0:
+            raise ValueError("capacity and channels must be positive")
+        self.capacity = capacity
+        self.channels = channels
+        self.total = 0
+        self.skipped = 0
+        self.__data = np.zeros((channels, 2 * capacity), dtype=dtype)
+        # next window start of each (size, hop) iterated by windows()
+        self.__window_starts = {}
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, block):
+        """
+        Appends samples, overwriting the oldest ones
+
+        Args:
+            block (np.array): Samples, one row per frame and one column per channel, e.g. the channel columns of `Frame.to_matrix()`.
+
+        Raises:
+            ValueError: If `block` does not have one column per channel.
+        """
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[1] != self.channels:
+            raise ValueError("block must have {} columns".format(self.channels))
+        skipped = max(len(block) - self.capacity, 0)
+        values = block[skipped:].T
+        n = values.shape[1]
+        capacity = self.capacity
+        start = (self.total + skipped) % capacity
+        first = min(n, capacity - start)
+        data = self.__data
+        data[:, start: start + first] = values[:, :first]
+        data[:, capacity + start: capacity + start + first] = values[:, :first]
+        data[:, : n - first] = values[:, first:]
+        data[:, capacity: capacity + n - first] = values[:, first:]
+        self.total += len(block)
+
+    def latest(self, n=None):
+        """
+        Returns the last `n` samples of each channel
+
+        Args:
+            n (int, optional): Number of samples, up to `len(self)`. Default is all the samples kept.
+
+        Returns:
+            window (np.array): View of shape (channels, n), in time order. It stays valid until `capacity - n` more samples are appended: copy it to keep it longer.
+
+        Raises:
+            ValueError: If fewer samples are kept.
+        """
+        if n is None:
+            n = len(self)
+        if not 0 <= n <= len(self):
+            raise ValueError("only {} samples are kept".format(len(self)))
+        return self.__view(self.total - n, n)
+
+    def windows(self, size, hop=None):
+        """
+        Iterates over the windows completed since the previous call with the same `size` and `hop`, e.g. on each `on_read()`
+
+        The first window holds the first `size` samples appended, and each window starts `hop` samples after the previous one. Windows whose samples were already overwritten are skipped, and counted in `skipped`.
+
+        Args:
+            size (int): Samples of each window, up to `capacity`.
+            hop (int, optional): Samples between the starts of consecutive windows. Default is `size` (windows do not overlap).
+
+        Returns:
+            windows (iterator): Views of shape (channels, size), each valid until the next `append()`.
+
+        Raises:
+            ValueError: If `size` is larger than `capacity`, or `size` or `hop` is not positive.
+        """
+        if hop is None:
+            hop = size
+        if not 0 < size <= self.capacity or hop <= 0:
+            raise ValueError(
+                "size must be between 1 and {}, and hop positive".format(self.capacity))
+        return self.__windows(size, hop)
+
+    def __windows(self, size, hop):
+        key = (size, hop)
+        start = self.__window_starts.get(key, 0)
+        oldest = self.total - len(self)
+        if start < oldest:
+            # the first window that still fits, on the hop grid
+            skipped = (oldest - start + hop - 1) // hop
+            self.skipped += skipped
+            start += skipped * hop
+        while start + size <= self.total:
+            yield self.__view(start, size)
+            start += hop
+            self.__window_starts[key] = start
+        self.__window_starts[key] = start
+
+    def __view(self, first, n):
+        """
+        View of `n` samples from the sample `first`, counted since the creation
+        """
+        start = first % self.capacity
+        return self.__data[:, start: start + n]
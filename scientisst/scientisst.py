@@ -1,41 +1,52 @@
 import sys
-
-
-# if sys.platform == "linux":
-import socket
-import select
-
-# else:
-import serial
-
 import time
+from time import perf_counter_ns
+from threading import Lock
 import re
 from math import log2
-import numpy as np
 
 from scientisst.frame import *
 from scientisst.state import *
 from scientisst.exceptions import *
 from scientisst.esp_adc.esp_adc import *
 from scientisst.constants import *
+from scientisst.transport import *
+from scientisst.profiler import *
+from scientisst.wire_trace import WireTrace
+from scientisst.adaptive_read import *
+from scientisst.output_schedule import *
 
 
 class ScientISST:
     """ScientISST Device class
 
     Attributes:
-        address (str): The device serial port address ("/dev/example") or TCP port
+        address (str): The device serial port address ("/dev/example"), TCP or UDP port, or `host:port` of a device running its own access point
 
         serial_speed (int, optional): The serial port bitrate.
+
+        profiler (Profiler, optional): If set, each stage of `read()` is timed into this [`Profiler`][scientisst.profiler.Profiler].
+
+        firmware_version (str): Firmware version reported by the device on the last `version_and_adc_chars()` call.
     """
 
-    __serial = None
-    __socket = None
+    __transport = None
     __num_chs = 0
     __api_mode = 1
     __sample_rate = None
     __chs = [None] * 8
     __log = False
+    __trace = None
+    __read_size = None
+    __rx_buffer = bytearray()
+    __start_args = None
+    __seq_offset = 0
+    __high_rate = False
+    __decoder = None
+    __recv_buffer = None
+    __adc1_chars = None
+    profiler = None
+    firmware_version = None
 
     def __init__(
         self,
@@ -45,6 +56,8 @@ class ScientISST:
         api=API_MODE_SCIENTISST,
         connection_tries=5,
         com_mode=COM_MODE_BT,
+        trace=None,
+        calibration_cache=True,
     ):
         """
         Args:
@@ -52,6 +65,8 @@ class ScientISST:
             serial_speed (int, optional): The serial port bitrate in bit/s
             log (bool, optional): If the bytes sent and received should be showed
             api (int): The desired API mode for the device
+            trace (str, optional): If set, the bytes sent and received are appended to this binary [`WireTrace`][scientisst.wire_trace.WireTrace] file
+            calibration_cache (bool, optional): Reuse the ADC conversion table of this device and firmware from the [`CalibrationCache`][scientisst.calibration_cache.CalibrationCache], instead of building it on every connection
         """
 
         if (
@@ -67,13 +82,24 @@ class ScientISST:
         self.serial_speed = serial_speed
         self.__log = log
 
-        self.__serial = None
-        self.__socket = None
+        self.__transport = None
         self.__num_chs = 0
         self.__api_mode = 1
         self.__sample_rate = None
         self.__chs = [None] * 8
-        self.__log = False
+        self.__rx_buffer = bytearray()
+        self.__start_args = None
+        self.__seq_offset = 0
+        self.__decoder = None
+        self.__packet_buffer = None
+        self.__recv_buffer = None
+        self.__last_seq = -1
+        self.__last_frame_time = None
+        self.__send_lock = Lock()
+        self.__trace = WireTrace(trace) if trace else None
+        self.__calibration_cache = calibration_cache
+        self.__adc1_chars = None
+        self.firmware_version = None
 
         # Setup socket in function of com_mode argument
         self.__setupSocket()
@@ -121,7 +147,24 @@ class ScientISST:
         index = result.index(b"\x00")
         version = result[header_len: index].decode("utf-8")
 
-        self.__adc1_chars = EspAdcCalChars(result[index + 1:])
+        adc_chars = EspAdcCalChars(result[index + 1:])
+        # keep the conversion table of unchanged characteristics
+        if not (
+            self.__adc1_chars
+            and version == self.firmware_version
+            and self.__adc1_chars.to_map() == adc_chars.to_map()
+        ):
+            if self.__calibration_cache:
+                from scientisst.calibration_cache import CalibrationCache
+
+                cache = CalibrationCache()
+                cached = cache.get(self.address, version, adc_chars)
+                if cached:
+                    adc_chars = cached
+                else:
+                    cache.put(self.address, version, adc_chars)
+            self.__adc1_chars = adc_chars
+        self.firmware_version = version
 
         if print:
             sys.stdout.write("ScientISST version: {}\n".format(version))
@@ -136,12 +179,23 @@ class ScientISST:
 
         return version
 
+    def adc_characteristics(self):
+        """
+        Gets the ADC characteristics read from the device by the last `version_and_adc_chars()` call
+
+        Returns:
+            adc_chars (EspAdcCalChars): Calibration used to convert the AI channels to mV.
+        """
+        return self.__adc1_chars
+
     def start(
         self,
         sample_rate,
         channels,
         reads_per_second=5,
         simulated=False,
+        latency=None,
+        throughput=None,
     ):
         """
         Starts a signal acquisition from the device
@@ -149,11 +203,11 @@ class ScientISST:
         Args:
             sample_rate (int): Sampling rate in Hz.
 
-                Accepted values are 1, 10, 100 or 1000 Hz.
+                Usual values are 1, 10, 100 or 1000 Hz. Higher rates (e.g. 4000 to 16000 Hz for EMG) are sustained on fewer channels, as the link must carry every frame: above 1000 Hz, `read()` decodes whole blocks of frames with NumPy to keep up. `benchmarks/high_rate.py` checks the rates a host sustains.
 
             channels (list): Set of channels to acquire.
 
-                Accepted channels are 1...6 for inputs A1...A6.
+                Accepted channels are 1...6 for inputs A1...A6, and 7, 8 for AX1, AX2 except in `API_MODE_BITALINO`.
 
             reads_per_second (int): Number of times to read the data streaming from the device.
 
@@ -164,6 +218,14 @@ class ScientISST:
 
                 Otherwise start in live mode. Default is to start in live mode.
 
+            latency (float): If set, the number of frames of each read is adapted at runtime (see [`AdaptiveReadSize`][scientisst.adaptive_read.AdaptiveReadSize]) instead of using `reads_per_second`.
+
+                Target maximum duration (s) of the data returned by each read, e.g. 0.05.
+
+            throughput (float): Frames per second the host must be able to process in adaptive mode.
+
+                Default is `sample_rate`.
+
         Raises:
             DeviceNotIdleError: If the device is already in acquisition mode.
             InvalidParameterError: If no valid API value is chosen or an incorrect array of channels is provided.
@@ -173,13 +235,23 @@ class ScientISST:
         if self.__num_chs != 0:
             raise DeviceNotIdleError()
 
+        if not 0 < sample_rate <= MAX_SAMPLE_RATE:
+            raise InvalidParameterError()
+
+        # BITalino packets only carry the AI channels
+        max_ch = AI6 if self.__api_mode == API_MODE_BITALINO else AX2
+
+        # channels of a previous acquisition must not count in the packet size
+        self.__chs = [None] * 8
         if not channels:  # channels is empty
-            chMask = 0xFF  # all 8 analog channels
-            self.__num_chs = 8
+            chMask = (1 << max_ch) - 1  # all analog channels
+            self.__num_chs = max_ch
+            self.__chs = list(range(1, max_ch + 1))
         else:
             chMask = 0
             for ch in channels:
-                if ch <= 0 or ch > 8:
+                if ch <= 0 or ch > max_ch:
+                    self.__num_chs = 0
                     raise InvalidParameterError()
                 self.__chs[self.__num_chs] = ch  # Fill chs vector
 
@@ -192,6 +264,14 @@ class ScientISST:
                 self.__num_chs += 1
 
         self.__sample_rate = sample_rate
+        self.__start_args = (
+            sample_rate,
+            channels,
+            reads_per_second,
+            simulated,
+            latency,
+            throughput,
+        )
 
         # Sample rate
         sr = 0b01000011
@@ -209,24 +289,33 @@ class ScientISST:
 
         self.__send(cmd)
 
-        self.__packet_size = self.__getPacketSize()
+        self.__decoder = None
+        if self.__api_mode == API_MODE_JSON:
+            # messages have no fixed size: size the reads for a typical one
+            self.__packet_size = self.__getDecoder().message_size
+        else:
+            self.__packet_size = self.__getPacketSize()
 
-        self.__bytes_to_read = self.__packet_size * max(
-            sample_rate // reads_per_second, 1
+        if latency:
+            self.__read_size = AdaptiveReadSize(
+                sample_rate, latency, throughput)
+            num_frames = self.__read_size.frames
+        else:
+            self.__read_size = None
+            num_frames = max(sample_rate // reads_per_second, 1)
+        self.__last_read_end = None
+        self.__rx_buffer = bytearray()
+        self.__high_rate = sample_rate > HIGH_RATE_SAMPLE_RATE and self.__api_mode in (
+            API_MODE_SCIENTISST,
+            API_MODE_SCIENTISST_V2,
+            API_MODE_BITALINO,
         )
-        if self.__bytes_to_read > MAX_BUFFER_SIZE:
-            self.__bytes_to_read = MAX_BUFFER_SIZE - (
-                MAX_BUFFER_SIZE % self.__packet_size
-            )
 
-        if self.__bytes_to_read % self.__packet_size:
-            self.__num_chs = 0
-            sys.stderr.write(
-                "Error, bytes_to_read needs to be devisible by packet_size\n"
-            )
-            raise InvalidParameterError()
-        else:
-            self.__num_frames = self.__bytes_to_read // self.__packet_size
+        # Hold up to 2 seconds of data in the receive buffer, so that reads are not limited to MAX_BUFFER_SIZE
+        self.__max_read_size = self.__setRecvBufferSize(
+            max(MAX_BUFFER_SIZE, 2 * self.__packet_size * sample_rate)
+        )
+        self.__setReadFrames(num_frames)
 
     def read(self, convert=True, matrix=False):
         """
@@ -244,7 +333,6 @@ class ScientISST:
         Raises:
             ContactingDeviceError: If there is an error contacting the device.
             DeviceNotInAcquisitionError: If the device is not in acquisition mode.
-            NotSupportedError: If the device API is in BITALINO mode
             UnknownError: If the device stopped sending frames for some unknown reason.
         """
 
@@ -253,142 +341,304 @@ class ScientISST:
         if self.__num_chs == 0:
             raise DeviceNotInAcquisitionError()
 
-        result = list(self.__recv(self.__bytes_to_read))
-        start = 0
-        for it in range(self.__num_frames):
-            bf = result[start: start + self.__packet_size]
-            mid_frame_flag = 0
-
-            #  if CRC check failed, try to resynchronize with the next valid frame
-            while not self.__checkCRC4(bf, self.__packet_size):
-                sys.stderr.write("Error checking CRC4\n")
-                #  checking with one new byte at a time
-                result_tmp = list(self.__recv(1))
-                if len(result_tmp) != 1:
-                    raise ContactingDeviceError()
+        profiler = self.profiler
+        if profiler:
+            read_start = tic = perf_counter_ns()
+            crc_time = frame_time = decode_time = convert_time = 0
+
+        read_size = self.__read_size
+        if read_size:
+            recv_start = perf_counter_ns()
+
+        if self.__api_mode == API_MODE_JSON:
+            decoder = self.__getDecoder()
+            self.__recvMessages(self.__num_frames, decoder)
+            if read_size:
+                wait_time = perf_counter_ns() - recv_start
+            if profiler:
+                toc = perf_counter_ns()
+                profiler.record("read;recv", toc - tic)
+            frames = self.__decodeBlock(decoder, self.__num_frames, convert)
+        elif self.__high_rate:
+            # per-frame decoding cannot keep up: decode the whole block with NumPy
+            decoder = self.__getDecoder()
+            packets = self.__recvPackets(self.__num_frames, decoder)
+            if read_size:
+                wait_time = perf_counter_ns() - recv_start
+            if profiler:
+                toc = perf_counter_ns()
+                profiler.record("read;recv", toc - tic)
+            frames = self.__decodeBlock(decoder, self.__num_frames, convert, packets)
+        else:
+            result = list(self.__nextBytes(self.__bytes_to_read))
+            if read_size:
+                wait_time = perf_counter_ns() - recv_start
+            if profiler:
+                toc = perf_counter_ns()
+                profiler.record("read;recv", toc - tic)
+
+            start = 0
+            for it in range(self.__num_frames):
+                if profiler:
+                    tic = perf_counter_ns()
 
-                result += result_tmp
-                start += 1
                 bf = result[start: start + self.__packet_size]
 
-            f = Frame(self.__num_chs)
-            frames.append(f)
-            if self.__api_mode == API_MODE_SCIENTISST:
-                # Get seq number and IO states
-                f.seq = bf[-2] >> 4 | bf[-1] << 4
-                for i in range(4):
-                    f.digital[i] = 0 if (bf[-3] & (0x80 >> i)) == 0 else 1
-
-                # Get channel values
-                byte_it = 0
-                for i in range(self.__num_chs):
-                    index = self.__num_chs - 1 - i
-                    curr_ch = self.__chs[index]
-
-                    # If it's an AX channel
-                    if curr_ch == AX1 or curr_ch == AX2:
-                        f.a[index] = (
-                            int.from_bytes(
-                                bf[byte_it: byte_it + 4], byteorder="little"
-                            )
-                            & 0xFFFFFF
-                        )
-                        byte_it += 3
-                        if convert:
-                            f.mv[index] = (
-                                (f.a[index]) * (3.3*2) / (pow(2, 24) - 1))*1000
-                            f.mv[index] = round(f.mv[index], 3)
+                #  if CRC check failed, try to resynchronize with the next valid frame
+                while not self.__checkCRC4(bf, self.__packet_size):
+                    sys.stderr.write("Error checking CRC4\n")
+                    #  checking with one new byte at a time, after those left over by read_available()
+                    result_tmp = list(self.__nextBytes(1))
+                    if len(result_tmp) != 1:
+                        raise ContactingDeviceError()
 
-                    # If it's an AI channel
-                    else:
-                        if not mid_frame_flag:
-                            f.a[index] = (
-                                int.from_bytes(
-                                    bf[byte_it: byte_it + 2], byteorder="little"
-                                )
-                                & 0xFFF
-                            )
-                            byte_it += 1
-                            mid_frame_flag = 1
-                        else:
-                            f.a[index] = (
-                                int.from_bytes(
-                                    bf[byte_it: byte_it + 2], byteorder="little"
-                                )
-                                >> 4
-                            )
-                            byte_it += 2
-                            mid_frame_flag = 0
-                        if convert:
-                            f.mv[index] = self.__adc1_chars.esp_adc_cal_raw_to_voltage(
-                                f.a[index]
-                            )
-            elif self.__api_mode == API_MODE_SCIENTISST_V2:
-                # Get timestamp (us) and IO states
-                f.seq = (bf[-1] << 28) | (bf[-2] << 20) | (bf[-3] <<
-                                                           12) | (bf[-4] << 4) | ((bf[-5] & 0xF0) >> 4)
-                for i in range(4):
-                    f.digital[i] = 0 if (bf[-6] & (0x80 >> i)) == 0 else 1
-
-                # Get channel values
-                byte_it = 0
-                for i in range(self.__num_chs):
-                    index = self.__num_chs - 1 - i
-                    curr_ch = self.__chs[index]
-
-                    # If it's an AX channel
-                    if curr_ch == AX1 or curr_ch == AX2:
-                        f.a[index] = (
-                            int.from_bytes(
-                                bf[byte_it: byte_it + 4], byteorder="little"
-                            )
-                            & 0xFFFFFF
-                        )
-                        byte_it += 3
-                        if convert:
-                            f.mv[index] = (
-                                (f.a[index]) * (3.3*2) / (pow(2, 24) - 1))*1000
-                            f.mv[index] = round(f.mv[index], 3)
+                    result += result_tmp
+                    start += 1
+                    bf = result[start: start + self.__packet_size]
 
-                    # If it's an AI channel
-                    else:
-                        if not mid_frame_flag:
-                            f.a[index] = (
-                                int.from_bytes(
-                                    bf[byte_it: byte_it + 2], byteorder="little"
-                                )
-                                & 0xFFF
-                            )
-                            byte_it += 1
-                            mid_frame_flag = 1
-                        else:
-                            f.a[index] = (
-                                int.from_bytes(
-                                    bf[byte_it: byte_it + 2], byteorder="little"
-                                )
-                                >> 4
-                            )
-                            byte_it += 2
-                            mid_frame_flag = 0
-                        if convert:
-                            f.mv[index] = self.__adc1_chars.esp_adc_cal_raw_to_voltage(
-                                f.a[index]
-                            )
-            elif self.__api_mode == API_MODE_JSON:
-                print(bf)
-            else:
-                raise NotSupportedError()
+                if profiler:
+                    toc = perf_counter_ns()
+                    crc_time += toc - tic
+                    tic = toc
 
-            start += self.__packet_size
+                f = Frame(self.__num_chs)
+                frames.append(f)
 
-        if len(frames) == self.__num_frames:
-            if not matrix:
-                return frames
-            else:
-                return np.array([frame.to_matrix() for frame in frames])
-        else:
+                if profiler:
+                    toc = perf_counter_ns()
+                    frame_time += toc - tic
+                    tic = toc
+
+                self.__decodeFrame(f, bf)
+
+                if profiler:
+                    toc = perf_counter_ns()
+                    decode_time += toc - tic
+                    tic = toc
+
+                if convert and self.__api_mode != API_MODE_JSON:
+                    self.__convertFrame(f)
+
+                    if profiler:
+                        convert_time += perf_counter_ns() - tic
+
+                start += self.__packet_size
+
+            if profiler:
+                profiler.record("read;crc", crc_time)
+                profiler.record("read;frame", frame_time)
+                profiler.record("read;decode", decode_time)
+                if convert:
+                    profiler.record("read;convert", convert_time)
+
+        if len(frames) != self.__num_frames:
             raise ContactingDeviceError()
 
+        self.__last_seq = frames[-1].seq
+        self.__last_frame_time = time.perf_counter()
+
+        if read_size:
+            self.__updateReadSize(len(frames), wait_time)
+
+        if matrix:
+            if profiler:
+                tic = perf_counter_ns()
+            import numpy as np
+
+            frames = np.array([frame.to_matrix() for frame in frames])
+            if profiler:
+                profiler.record("read;matrix", perf_counter_ns() - tic)
+
+        if profiler:
+            profiler.record("read", perf_counter_ns() - read_start)
+        return frames
+
+    def read_into(self, raw_out, mv_out=None, meta_out=None):
+        """
+        Reads acquisition frames from the device directly into caller-provided arrays, e.g. slices of a larger preallocated buffer.
+
+        It reads `len(raw_out)` frames, with the same values and CRC resynchronization as [`read()`][scientisst.scientisst.ScientISST.read], but decodes them a whole block at a time with NumPy and allocates no `Frame` objects. The receive buffer and decoding scratch arrays are reused, so reading blocks of the same size again does not allocate memory, and keeps garbage collection pauses out of real-time loops.
+
+        Args:
+            raw_out (np.array): Integer array of shape (frames, channels) receiving the raw value of each channel, e.g. `np.empty((100, len(channels)), dtype=np.int32)`.
+            mv_out (np.array, optional): float64 array of the same shape receiving the values in mV.
+            meta_out (np.array, optional): Integer array of shape (frames, 5) receiving the sequence number and the 4 digital states, as the first 5 columns of `Frame.to_matrix()`. In `API_MODE_SCIENTISST_V2` the sequence number is the timestamp in us, which needs 64-bit integers.
+
+        Returns:
+            frames (int): Number of frames written, `len(raw_out)`.
+
+        Raises:
+            ContactingDeviceError: If there is an error contacting the device.
+            DeviceNotInAcquisitionError: If the device is not in acquisition mode.
+            ValueError: If an array does not have the expected shape.
+        """
+        if self.__num_chs == 0:
+            raise DeviceNotInAcquisitionError()
+
+        num_frames = len(raw_out)
+        for name, out, columns in (
+            ("raw_out", raw_out, self.__num_chs),
+            ("mv_out", mv_out, self.__num_chs),
+            ("meta_out", meta_out, 5),
+        ):
+            if out is not None and out.shape != (num_frames, columns):
+                raise ValueError(
+                    "{} must have shape ({}, {})".format(name, num_frames, columns))
+
+        profiler = self.profiler
+        if profiler:
+            read_start = tic = perf_counter_ns()
+
+        decoder = self.__getDecoder()
+        if self.__api_mode == API_MODE_JSON:
+            packets = None
+            self.__recvMessages(num_frames, decoder)
+        else:
+            packets = self.__recvPackets(num_frames, decoder)
+        if profiler:
+            toc = perf_counter_ns()
+            profiler.record("read_into;recv", toc - tic)
+            tic = toc
+
+        if packets is None:
+            decoder.decode(raw_out, meta_out)
+        else:
+            decoder.decode(packets, raw_out, meta_out)
+        if meta_out is not None and self.__seq_offset:
+            seq = meta_out[:, 0]
+            seq += self.__seq_offset
+            seq &= 0xFFF
+        if profiler:
+            toc = perf_counter_ns()
+            profiler.record("read_into;decode", toc - tic)
+            tic = toc
+
+        if mv_out is not None:
+            decoder.convert(raw_out, mv_out)
+            if profiler:
+                profiler.record("read_into;convert", perf_counter_ns() - tic)
+
+        if num_frames:
+            if meta_out is not None:
+                self.__last_seq = int(meta_out[-1, 0])
+            elif self.__api_mode == API_MODE_SCIENTISST:
+                seq = int(packets[-1, -2]) >> 4 | int(packets[-1, -1]) << 4
+                self.__last_seq = (seq + self.__seq_offset) & 0xFFF
+            self.__last_frame_time = time.perf_counter()
+
+        if profiler:
+            profiler.record("read_into", perf_counter_ns() - read_start)
+        return num_frames
+
+    def read_raw(self):
+        """
+        Reads the packets of the next batch of acquisition frames, without decoding them.
+
+        The packets are received and CRC-checked as in [`read()`][scientisst.scientisst.ScientISST.read], including the resynchronization on CRC errors, so they can be saved as they are and decoded later with [`decode_packets()`][scientisst.packet_decoder.decode_packets].
+
+        Returns:
+            data (memoryview): Read-only view of the whole, CRC-valid packets. It is overwritten by the next read: copy it (e.g. `bytes(data)`) to keep it.
+            frames (int): Number of packets in `data`.
+
+        Raises:
+            ContactingDeviceError: If there is an error contacting the device.
+            DeviceNotInAcquisitionError: If the device is not in acquisition mode.
+            NotSupportedError: If the device API is `API_MODE_JSON`.
+        """
+        if self.__num_chs == 0:
+            raise DeviceNotInAcquisitionError()
+        if self.__api_mode == API_MODE_JSON:
+            # messages are decoded as they arrive
+            raise NotSupportedError()
+
+        profiler = self.profiler
+        if profiler:
+            tic = perf_counter_ns()
+        read_size = self.__read_size
+        if read_size:
+            recv_start = perf_counter_ns()
+
+        num_frames = self.__num_frames
+        packets = self.__recvPackets(num_frames, self.__getDecoder())
+
+        if read_size:
+            self.__updateReadSize(num_frames, perf_counter_ns() - recv_start)
+        if self.__api_mode == API_MODE_SCIENTISST:
+            seq = int(packets[-1, -2]) >> 4 | int(packets[-1, -1]) << 4
+            self.__last_seq = (seq + self.__seq_offset) & 0xFFF
+        self.__last_frame_time = time.perf_counter()
+
+        if profiler:
+            profiler.record("read_raw", perf_counter_ns() - tic)
+        return memoryview(packets.reshape(-1)).toreadonly(), num_frames
+
+    def read_available(self, max_frames=None, timeout=0, convert=True, matrix=False):
+        """
+        Reads the acquisition frames already received from the device, without waiting for a full batch.
+
+        Every complete, CRC-valid frame currently buffered is returned. The bytes of an incomplete frame are kept and completed on the next call (to `read_available()` or `read()`).
+
+        Args:
+            max_frames (int): Maximum number of frames to return. Default is all the available frames.
+            timeout (float): Maximum time (s) to wait for at least one frame. Default is 0 (non-blocking).
+            convert (bool): Convert from raw to mV
+            matrix (bool): Return `Frames` in a `np.array` (matrix) form
+
+        Returns:
+            frames (list): List of [`Frame`][scientisst.frame.Frame] objects retrieved from the device, possibly empty. If `matrix` is True, the `frames` corresponds to a `np.array` (matrix).
+
+        Raises:
+            ContactingDeviceError: If there is an error contacting the device.
+            DeviceNotInAcquisitionError: If the device is not in acquisition mode.
+        """
+        if self.__num_chs == 0:
+            raise DeviceNotInAcquisitionError()
+
+        if self.__api_mode == API_MODE_JSON:
+            return self.__readAvailableMessages(max_frames, timeout, convert, matrix)
+
+        frames = []
+        buffer = self.__rx_buffer
+        deadline = time.perf_counter() + timeout
+        wait = 0
+        while True:
+            buffer += self.__recvAvailable(wait)
+
+            start = 0
+            while len(buffer) - start >= self.__packet_size and (
+                max_frames is None or len(frames) < max_frames
+            ):
+                bf = buffer[start: start + self.__packet_size]
+
+                #  if CRC check failed, try to resynchronize on the next byte
+                if not self.__checkCRC4(bf, self.__packet_size):
+                    sys.stderr.write("Error checking CRC4\n")
+                    start += 1
+                    continue
+
+                f = Frame(self.__num_chs)
+                frames.append(f)
+                self.__decodeFrame(f, bf)
+                if convert and self.__api_mode != API_MODE_JSON:
+                    self.__convertFrame(f)
+
+                start += self.__packet_size
+            del buffer[:start]
+
+            wait = deadline - time.perf_counter()
+            if frames or wait <= 0:
+                break
+
+        if frames:
+            self.__last_seq = frames[-1].seq
+            self.__last_frame_time = time.perf_counter()
+
+        if matrix:
+            import numpy as np
+
+            return np.array([frame.to_matrix() for frame in frames])
+        return frames
+
     def stop(self):
         """
         Stops a signal acquisition.
@@ -404,10 +654,70 @@ class ScientISST:
 
         self.__num_chs = 0
         self.__sample_rate = 0
+        self.__start_args = None
+        self.__seq_offset = 0
+        self.__high_rate = False
 
         # Cleanup existing data in bluetooth socket
         self.__clear()
 
+    def reconnect(self, tries=RECONNECT_TRIES, timeout=RECONNECT_TIMEOUT_IN_SECONDS):
+        """
+        Reconnects to the device after the connection was lost, and resumes the acquisition if one was running.
+
+        The connection is set up again as in the constructor, retrying with an exponential backoff. In `API_MODE_SCIENTISST`, the sequence numbers of the resumed acquisition continue from those before the connection was lost, skipping the frames that were lost meanwhile.
+
+        Args:
+            tries (int): Maximum number of connection attempts.
+            timeout (float): Maximum time (s) each attempt waits for the device, e.g. for it to connect back in `COM_MODE_TCP_SERVER`.
+
+        Returns:
+            lost_frames (int): Estimated number of frames sampled by the device while it was disconnected, 0 if no acquisition was running.
+
+        Raises:
+            ContactingDeviceError: If the device could not be reached.
+        """
+        acquisition = self.__start_args
+        self.__num_chs = 0
+        if self.__transport:
+            try:
+                self.__transport.close()
+            except OSError:
+                pass
+            self.__transport = None
+
+        backoff = RECONNECT_BACKOFF_IN_SECONDS
+        for attempt in range(1, tries + 1):
+            try:
+                self.__setupSocket(timeout)
+                # nothing to wait for on a new connection
+                self.__changeAPI(self.__api_mode, delay=0)
+                break
+            except (OSError, ContactingDeviceError):
+                if self.__transport:
+                    self.__transport.close()
+                    self.__transport = None
+                if attempt == tries:
+                    raise ContactingDeviceError()
+                time.sleep(backoff)
+                backoff = min(2 * backoff, RECONNECT_MAX_BACKOFF_IN_SECONDS)
+
+        if not acquisition:
+            return 0
+
+        last_seq = self.__last_seq
+        last_frame_time = self.__last_frame_time
+        self.start(*acquisition)
+        lost_frames = 0
+        if last_frame_time is not None:
+            # the first frame of the new acquisition is sampled about now
+            lost_frames = max(
+                round((time.perf_counter() - last_frame_time) * self.__sample_rate) - 1, 0
+            )
+        if self.__api_mode == API_MODE_SCIENTISST and last_seq >= 0:
+            self.__seq_offset = (last_seq + 1 + lost_frames) & 0xFFF
+        return lost_frames
+
     def battery(self, value=0):
         """
         Sets the battery voltage threshold for the low-battery LED.
@@ -439,6 +749,8 @@ class ScientISST:
         """
         Assigns the digital outputs states.
 
+        The command is sent immediately, so it can be used during an acquisition.
+
         Args:
             digital_output (list): Vector of booleans to assign to digital outputs, starting at first output (O1).
 
@@ -456,12 +768,14 @@ class ScientISST:
             if digital_output[i]:
                 cmd |= 0b100 << i
 
-        self.__send(cmd)
+        self.__send(cmd, delay=0)
 
     def dac(self, voltage):
         """
         Assigns the analog (DAC) output value (ScientISST 2 only).
 
+        The command is sent immediately, so it can be used during an acquisition.
+
         Args:
             voltage (float): Analog output value to set (0V-3.3V).
 
@@ -477,7 +791,25 @@ class ScientISST:
         raw = int(voltage * 255 / 3.3)
 
         cmd |= raw << 8
-        self.__send(cmd, nrOfBytes=2)
+        self.__send(cmd, nrOfBytes=2, delay=0)
+
+    def play(self, schedule, repeat=1, period=None):
+        """
+        Plays a schedule of digital and analog output changes on a timer thread.
+
+        It can be used during an acquisition, e.g. to output a DAC waveform or a trigger pulse train while reading.
+
+        Args:
+            schedule (OutputSchedule): The [`OutputSchedule`][scientisst.output_schedule.OutputSchedule] to play.
+            repeat (int, optional): Number of times to play the schedule. Default is 1.
+            period (float, optional): Time (s) between repetitions. Default is the schedule duration.
+
+        Returns:
+            player (OutputPlayer): The running [`OutputPlayer`][scientisst.output_schedule.OutputPlayer], to wait for or stop the schedule.
+        """
+        player = OutputPlayer(self, schedule, repeat, period)
+        player.start()
+        return player
 
     # TODO: test with ScientISST Sense v2
     def state(self):
@@ -524,18 +856,17 @@ class ScientISST:
         """
         if self.__num_chs != 0:
             self.stop()
-        if self.__socket:
-            self.__socket.shutdown(socket.SHUT_RDWR)
-            self.__socket.close()
-            self.__socket = None
-        elif self.__serial:
-            self.__serial.close()
-            self.__serial = None
+        if self.__transport:
+            self.__transport.close()
+            self.__transport = None
+        if self.__trace:
+            self.__trace.close()
+            self.__trace = None
         sys.stdout.write("Disconnected\n")
 
-    def __setupSocket(self):
+    def __setupSocket(self, timeout=None):
         """
-        Create a socket in function of the comunication mode desired
+        Create a socket in function of the comunication mode desired, waiting at most `timeout` seconds for the device (forever if None)
         """
         if self.com_mode == COM_MODE_BT:
             sys.stdout.write("Connecting to {}...\n".format(self.address))
@@ -548,50 +879,86 @@ class ScientISST:
                 ):
                     raise InvalidAddressError()
 
-                self.__socket = socket.socket(
-                    socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM
-                )
-                self.__socket.connect((self.address, 1))
-                self.__socket.settimeout(TIMEOUT_IN_SECONDS)
+                self.__transport = RfcommTransport(self.address, timeout)
             else:
-                self.__serial = serial.Serial(
-                    self.address, self.serial_speed, timeout=TIMEOUT_IN_SECONDS
-                )
+                self.__transport = SerialTransport(
+                    self.address, self.serial_speed)
         elif self.com_mode == COM_MODE_SERIAL:
-            self.__serial = serial.Serial(
-                self.address, self.serial_speed, timeout=TIMEOUT_IN_SECONDS
-            )
+            self.__transport = SerialTransport(self.address, self.serial_speed)
         elif self.com_mode == COM_MODE_TCP_SERVER:
-            if not self.address.isdigit():
-                raise InvalidAddressError()
-
-            port = int(self.address)
+            self.__transport = TcpServerTransport(self.__getPort(), timeout)
+        elif self.com_mode == COM_MODE_TCP_AP:
+            self.__transport = self.__connectTcpAp(timeout)
+        elif self.com_mode == COM_MODE_UDP:
+            self.__transport = UdpTransport(self.__getPort(), timeout)
+        else:
+            raise InvalidParameterError
 
-            with socket.socket() as s:
-                s.bind(("", port))
-                print("Binded port %d on all interfaces" % (port))
+    def __connectTcpAp(self, timeout=None):
+        """
+        Connect to the device access point, at `host:port` or at `port` of its mDNS hostname
+        """
+        if isinstance(self.address, str) and ":" in self.address:
+            host, _, port = self.address.rpartition(":")
+            if not port.isdigit():
+                raise InvalidAddressError()
+            return TcpApTransport(int(port), host, timeout)
 
-                s.listen(5)
-                print("TCP Server created. Waiting for ScientISST to connect...")
+        port = self.__getPort()
+        from scientisst.discovery import DiscoveryCache, resolve_host
 
-                self.__socket, addr = s.accept()
-                print("ScientISST with address", addr, " connected")
+        # mDNS resolution is slow: reuse the last address of the device
+        cache = DiscoveryCache()
+        ip = cache.get_host(TCP_AP_HOSTNAME)
+        if ip:
+            try:
+                return TcpApTransport(port, ip, timeout)
+            except OSError:
+                cache.forget_host(TCP_AP_HOSTNAME)
+        return TcpApTransport(port, resolve_host(TCP_AP_HOSTNAME, cache), timeout)
 
-        elif self.com_mode == COM_MODE_TCP_AP:
-            if isinstance(self.address, str):
-                if not self.address.isdigit():
-                    raise InvalidAddressError()
-                port = int(self.address)
-            elif isinstance(self.address, int):
-                port = self.address
-            else:
+    def __getPort(self):
+        """
+        Port number of the network communication modes
+        """
+        if isinstance(self.address, str):
+            if not self.address.isdigit():
                 raise InvalidAddressError()
+            return int(self.address)
+        elif isinstance(self.address, int):
+            return self.address
+        else:
+            raise InvalidAddressError()
 
-            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.__socket.connect(("scientisst.local", port))
+    def __setRecvBufferSize(self, size):
+        """
+        Request a receive buffer of `size` bytes and return the largest read it can hold
+        """
+        if not self.__transport:
+            raise InvalidParameterError()
+        return self.__transport.set_recv_buffer_size(size)
 
-        else:
-            raise InvalidParameterError
+    def __setReadFrames(self, num_frames):
+        """
+        Set the number of frames of each read, limited by the receive buffer size
+        """
+        max_frames = max(self.__max_read_size // self.__packet_size, 1)
+        self.__num_frames = min(num_frames, max_frames)
+        self.__bytes_to_read = self.__num_frames * self.__packet_size
+
+    def __updateReadSize(self, num_frames, wait_time):
+        """
+        Feed the last read timings to the adaptive read size
+        """
+        now = perf_counter_ns()
+        if self.__last_read_end:
+            self.__setReadFrames(
+                self.__read_size.update(
+                    num_frames, wait_time / 1e9, (now -
+                                                  self.__last_read_end) / 1e9
+                )
+            )
+        self.__last_read_end = now
 
     def __getPacketSize(self):
         packet_size = 0
@@ -646,12 +1013,145 @@ class ScientISST:
                 ) / 8  # -4 because 4 bits can go in the I/0 byte
             # for the I/Os and seq+crc bytes
             packet_size += 6
+        elif self.__api_mode == API_MODE_BITALINO:
+            # 4 bits of CRC, 4 of seq and 4 of digital inputs
+            num_bits = 12
+            # 10bit channels first, then 6bit channels
+            num_bits += sum(BITALINO_CHANNEL_BITS[: self.__num_chs])
+            packet_size = (num_bits + 7) // 8
         else:
             raise NotSupportedError()
 
         return int(packet_size)
 
-    def __changeAPI(self, api):
+    def __decodeFrame(self, f, bf):
+        """
+        Fill the seq number, IO states and raw channel values of `f` from the packet `bf`
+        """
+        if self.__api_mode == API_MODE_SCIENTISST:
+            # Get seq number and IO states
+            f.seq = bf[-2] >> 4 | bf[-1] << 4
+            if self.__seq_offset:
+                f.seq = (f.seq + self.__seq_offset) & 0xFFF
+            for i in range(4):
+                f.digital[i] = 0 if (bf[-3] & (0x80 >> i)) == 0 else 1
+        elif self.__api_mode == API_MODE_SCIENTISST_V2:
+            # Get timestamp (us) and IO states
+            f.seq = (bf[-1] << 28) | (bf[-2] << 20) | (bf[-3] <<
+                                                       12) | (bf[-4] << 4) | ((bf[-5] & 0xF0) >> 4)
+            for i in range(4):
+                f.digital[i] = 0 if (bf[-6] & (0x80 >> i)) == 0 else 1
+        elif self.__api_mode == API_MODE_BITALINO:
+            # Get seq number and IO states
+            f.seq = bf[-1] >> 4
+            for i in range(4):
+                f.digital[i] = 0 if (bf[-2] & (0x80 >> i)) == 0 else 1
+
+            # Get channel values, packed from the end of the packet
+            f.a[0] = ((bf[-2] & 0x0F) << 6) | (bf[-3] >> 2)
+            if self.__num_chs > 1:
+                f.a[1] = ((bf[-3] & 0x03) << 8) | bf[-4]
+            if self.__num_chs > 2:
+                f.a[2] = (bf[-5] << 2) | (bf[-6] >> 6)
+            if self.__num_chs > 3:
+                f.a[3] = ((bf[-6] & 0x3F) << 4) | (bf[-7] >> 4)
+            if self.__num_chs > 4:
+                f.a[4] = ((bf[-7] & 0x0F) << 2) | (bf[-8] >> 6)
+            if self.__num_chs > 5:
+                f.a[5] = bf[-8] & 0x3F
+            return
+        else:
+            raise NotSupportedError()
+
+        # Get channel values
+        byte_it = 0
+        mid_frame_flag = 0
+        for i in range(self.__num_chs):
+            index = self.__num_chs - 1 - i
+            curr_ch = self.__chs[index]
+
+            # If it's an AX channel
+            if curr_ch == AX1 or curr_ch == AX2:
+                f.a[index] = (
+                    int.from_bytes(
+                        bf[byte_it: byte_it + 4], byteorder="little"
+                    )
+                    & 0xFFFFFF
+                )
+                byte_it += 3
+
+            # If it's an AI channel
+            else:
+                if not mid_frame_flag:
+                    f.a[index] = (
+                        int.from_bytes(
+                            bf[byte_it: byte_it + 2], byteorder="little"
+                        )
+                        & 0xFFF
+                    )
+                    byte_it += 1
+                    mid_frame_flag = 1
+                else:
+                    f.a[index] = (
+                        int.from_bytes(
+                            bf[byte_it: byte_it + 2], byteorder="little"
+                        )
+                        >> 4
+                    )
+                    byte_it += 2
+                    mid_frame_flag = 0
+
+    def __decodeBlock(self, decoder, num_frames, convert, packets=None):
+        """
+        Decode a block of packets, or of the JSON frames already parsed by `decoder`, into `Frame` objects, with the same values as `__decodeFrame()` and `__convertFrame()`
+        """
+        import numpy as np
+
+        profiler = self.profiler
+        if profiler:
+            tic = perf_counter_ns()
+        raw = np.empty((num_frames, self.__num_chs), dtype=np.int64)
+        meta = np.empty((num_frames, 5), dtype=np.int64)
+        if packets is None:
+            decoder.decode(raw, meta)
+        else:
+            decoder.decode(packets, raw, meta)
+        if self.__seq_offset:
+            seq = meta[:, 0]
+            seq += self.__seq_offset
+            seq &= 0xFFF
+        mv = None
+        if convert:
+            mv = np.empty((num_frames, self.__num_chs), dtype=np.float64)
+            decoder.convert(raw, mv)
+        if profiler:
+            toc = perf_counter_ns()
+            profiler.record("read;decode", toc - tic)
+            tic = toc
+
+        frames = decoder.frames(raw, meta, mv)
+        if profiler:
+            profiler.record("read;frame", perf_counter_ns() - tic)
+        return frames
+
+    def __convertFrame(self, f):
+        """
+        Fill the mV values of `f` from its raw channel values
+        """
+        for index in range(self.__num_chs):
+            curr_ch = self.__chs[index]
+            if curr_ch == AX1 or curr_ch == AX2:
+                f.mv[index] = (
+                    (f.a[index]) * (3.3*2) / (pow(2, 24) - 1))*1000
+                f.mv[index] = round(f.mv[index], 3)
+            elif self.__api_mode == API_MODE_BITALINO:
+                # 10bit and 6bit values are the 12bit ADC value without its lowest bits
+                f.mv[index] = self.__adc1_chars.raw_to_voltage_list()[
+                    f.a[index] << (12 - BITALINO_CHANNEL_BITS[index])]
+            else:
+                f.mv[index] = self.__adc1_chars.raw_to_voltage_list()[f.a[index]]
+
+    def __changeAPI(self, api, delay=COMMAND_DELAY_IN_SECONDS):
         if self.__num_chs and self.__num_chs != 0:
             raise DeviceNotIdleError()
 
@@ -663,7 +1163,7 @@ class ScientISST:
         api <<= 4
         api |= 0b11
 
-        self.__send(api)
+        self.__send(api, delay=delay)
 
     def __checkCRC4(self, data, length):
         CRC4tab = [0, 3, 6, 5, 12, 15, 10, 9, 11, 8, 13, 14, 7, 4, 1, 2]
@@ -687,6 +1187,18 @@ class ScientISST:
 
             return crc == (data[-5] & 0x0F)
 
+        elif self.__api_mode == API_MODE_BITALINO:
+            for i in range(length - 1):
+                b = data[i]
+                crc = CRC4tab[crc] ^ (b >> 4)
+                crc = CRC4tab[crc] ^ (b & 0x0F)
+            # CRC for seq
+            crc = CRC4tab[crc] ^ (data[-1] >> 4)
+
+            crc = CRC4tab[crc]
+
+            return crc == (data[-1] & 0x0F)
+
         else:
             for i in range(length - 2):
                 b = data[i]
@@ -703,9 +1215,9 @@ class ScientISST:
 
             return crc == (data[-2] & 0x0F)
 
-    def __send(self, command, nrOfBytes=0):
+    def __send(self, command, nrOfBytes=0, delay=COMMAND_DELAY_IN_SECONDS):
         """
-        Send data
+        Send data, `delay` seconds after the call
         """
 
         if nrOfBytes <= 4:
@@ -724,19 +1236,21 @@ class ScientISST:
             for _ in range(nrOfBytes - len(command)):
                 command += b"\x00"
         # if self.__serial:
-        time.sleep(0.250)
-        if self.__log:
-            sys.stdout.write(
-                "{} bytes sent: {}\n".format(
-                    len(command), " ".join("{:02x}".format(c) for c in command)
+        if delay:
+            time.sleep(delay)
+        # commands may be sent from other threads (e.g. OutputPlayer) during an acquisition
+        with self.__send_lock:
+            if self.__trace:
+                self.__trace.tx(command)
+            if self.__log:
+                sys.stdout.write(
+                    "{} bytes sent: {}\n".format(
+                        len(command), " ".join("{:02x}".format(c) for c in command)
+                    )
                 )
-            )
-        if self.__socket:
-            self.__socket.send(command)
-        elif self.__serial:
-            self.__serial.write(command)
-        else:
-            raise InvalidParameterError()
+            if not self.__transport:
+                raise InvalidParameterError()
+            self.__transport.send(command)
         # else:
         # raise ContactingDeviceError()
 
@@ -744,27 +1258,22 @@ class ScientISST:
         """
         Receive data
         """
-        result = b""
-        if self.__socket:
-            # We have to use a select here with a single socket because we can't apply a timeout in any other way
-            ready = select.select([self.__socket], [],
-                                  [], 5)  # 10 seconds timeout
-            if ready[0]:
-                if waitall_flag:
-                    remaining = nrOfBytes
-                    while remaining > 0:
-                        ready = select.select([self.__socket], [], [], 10)
-                        if not ready[0]:
-                            raise ContactingDeviceError()
-                        temp = self.__socket.recv(remaining)
-                        result += temp
-                        remaining = nrOfBytes - len(result)
-                else:
-                    result = self.__socket.recv(nrOfBytes)
-        elif self.__serial:
-            result = self.__serial.read(nrOfBytes)
-        else:
+        if not self.__transport:
             raise InvalidParameterError()
+        buffer = bytearray(nrOfBytes)
+        view = memoryview(buffer)
+        size = self.__transport.recv_into(view, TIMEOUT_IN_SECONDS)
+        if size and waitall_flag:
+            while size < nrOfBytes:
+                received = self.__transport.recv_into(view[size:], 10)
+                if not received:
+                    raise ContactingDeviceError()
+                size += received
+        view.release()
+        del buffer[size:]
+        result = bytes(buffer)
+        if self.__trace:
+            self.__trace.rx(result)
         if self.__log:
             if nrOfBytes > 1:
                 sys.stdout.write(
@@ -777,26 +1286,167 @@ class ScientISST:
                     "{} bytes received: {}\n".format(1, result.hex()))
         return result
 
-    def __clear(self):
+    def __recvPackets(self, num_frames, decoder):
         """
-        Clear the device buffer
+        Receive `num_frames` CRC-valid packets into the reusable packet buffer, as a (frames, packet_size) array
         """
-        if self.__socket:
-            self.__socket.setblocking(False)
-        elif self.__serial:
-            self.__serial.timeout = 0
-        else:
-            raise InvalidParameterError()
+        import numpy as np
 
-        try:
-            while self.__recv(1):
-                pass
-        except BlockingIOError:
-            pass
+        packet_size = self.__packet_size
+        size = num_frames * packet_size
+        if self.__packet_buffer is None or len(self.__packet_buffer) < size:
+            self.__packet_buffer = np.empty(size, dtype=np.uint8)
+        buffer = self.__packet_buffer[:size]
 
-        if self.__socket:
-            self.__socket.setblocking(True)
-        elif self.__serial:
-            self.__serial.timeout = TIMEOUT_IN_SECONDS
-        else:
+        self.__recvInto(buffer, 0)
+
+        packets = buffer.reshape(num_frames, packet_size)
+        first = 0
+        while num_frames:
+            invalid = np.flatnonzero(~decoder.check_crc(packets[first:]))
+            if not len(invalid):
+                break
+            sys.stderr.write("Error checking CRC4\n")
+            #  resynchronize with the next valid frame, checking with one new byte at a time
+            first += invalid[0]
+            start = first * packet_size
+            buffer[start: size - 1] = buffer[start + 1: size]
+            self.__recvInto(buffer, size - 1)
+        return packets
+
+    def __recvInto(self, buffer, start):
+        """
+        Receive into `buffer` from index `start` until it is full, starting with the bytes left over by read_available()
+        """
+        view = memoryview(buffer)
+        size = start
+        carried = min(len(self.__rx_buffer), len(buffer) - size)
+        if carried:
+            view[size: size + carried] = self.__rx_buffer[:carried]
+            del self.__rx_buffer[:carried]
+            size += carried
+        timeout = TIMEOUT_IN_SECONDS
+        while size < len(buffer):
+            received = self.__transport.recv_into(view[size:], timeout)
+            if not received:
+                raise ContactingDeviceError()
+            if self.__trace:
+                self.__trace.rx(bytes(view[size: size + received]))
+            if self.__log:
+                sys.stdout.write(
+                    "{} bytes received: {}\n".format(
+                        received, view[size: size + received].hex()))
+            size += received
+            timeout = 10
+        view.release()
+
+    def __getDecoder(self):
+        """
+        Block decoder of the current acquisition, created on first use as it imports NumPy
+        """
+        if self.__decoder is None and self.__api_mode == API_MODE_JSON:
+            from scientisst.json_stream import JsonStreamDecoder
+
+            self.__decoder = JsonStreamDecoder(
+                self.__chs[: self.__num_chs], self.__adc1_chars)
+        elif self.__decoder is None:
+            from scientisst.packet_decoder import PacketDecoder
+
+            self.__decoder = PacketDecoder(
+                self.__api_mode,
+                self.__chs[: self.__num_chs],
+                self.__adc1_chars,
+            )
+        return self.__decoder
+
+    def __recvMessages(self, num_frames, decoder):
+        """
+        Receive and feed the JSON stream to `decoder` until it holds `num_frames` frames
+        """
+        timeout = TIMEOUT_IN_SECONDS
+        while decoder.pending < num_frames:
+            data = self.__recvAvailable(timeout)
+            if not data:
+                raise ContactingDeviceError()
+            decoder.feed(data)
+            timeout = 10
+
+    def __readAvailableMessages(self, max_frames, timeout, convert, matrix):
+        """
+        `read_available()` of the JSON stream
+        """
+        decoder = self.__getDecoder()
+        deadline = time.perf_counter() + timeout
+        wait = 0
+        while True:
+            decoder.feed(self.__recvAvailable(wait))
+            wait = deadline - time.perf_counter()
+            if decoder.pending or wait <= 0:
+                break
+
+        num_frames = decoder.pending
+        if max_frames is not None:
+            num_frames = min(num_frames, max_frames)
+        frames = self.__decodeBlock(decoder, num_frames, convert)
+        if frames:
+            self.__last_seq = frames[-1].seq
+            self.__last_frame_time = time.perf_counter()
+
+        if matrix:
+            import numpy as np
+
+            return np.array([frame.to_matrix() for frame in frames])
+        return frames
+
+    def __nextBytes(self, nrOfBytes):
+        """
+        Receive the next bytes of the stream: those left over by read_available() first, then new ones
+        """
+        carried = self.__rx_buffer
+        if not carried:
+            return self.__recv(nrOfBytes)
+
+        result = bytes(carried[:nrOfBytes])
+        del carried[:nrOfBytes]
+        if len(result) < nrOfBytes:
+            result += self.__recv(nrOfBytes - len(result))
+        return result
+
+    def __recvAvailable(self, timeout):
+        """
+        Receive the bytes already available, waiting up to `timeout` seconds for the first ones
+        """
+        if not self.__transport:
+            raise InvalidParameterError()
+        # reused: allocating the largest read on every call costs more than the read
+        if self.__recv_buffer is None or len(self.__recv_buffer) != self.__max_read_size:
+            self.__recv_buffer = bytearray(self.__max_read_size)
+        size = self.__transport.recv_into(self.__recv_buffer, timeout)
+        result = bytes(self.__recv_buffer[:size])
+        if self.__trace:
+            self.__trace.rx(result)
+        if self.__log:
+            sys.stdout.write(
+                "{} bytes received: {}\n".format(len(result), result.hex()))
+        return result
+
+    def __clear(self):
+        """
+        Clear the device buffer
+        """
+        if not self.__transport:
             raise InvalidParameterError()
+        # discard until the line is quiet, instead of waiting for a full receive timeout
+        discarded = self.__transport.drain()
+        buffer = bytearray(MAX_BUFFER_SIZE)
+        while True:
+            size = self.__transport.recv_into(buffer, CLEAR_QUIET_IN_SECONDS)
+            if not size:
+                break
+            discarded += buffer[:size] + self.__transport.drain()
+        discarded = bytes(discarded)
+        if self.__trace:
+            self.__trace.rx(discarded)
+        if self.__log:
+            sys.stdout.write(
+                "{} bytes discarded: {}\n".format(len(discarded), discarded.hex()))
@@ -0,0 +1,245 @@
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+SHARED_RING_MAGIC = 0x53535452494E47  # "SSTRING"
+SHARED_RING_VERSION = 1
+# the readers poll the ring this often (s) while waiting for new samples
+SHARED_RING_POLL_INTERVAL = 0.001
+
+# int64 header fields, followed by the channels and the float64 samples
+_MAGIC = 0
+_VERSION = 1
+_CAPACITY = 2
+_COLUMNS = 3
+_SAMPLE_RATE = 4
+_CONVERT = 5
+_NUM_CHANNELS = 6
+_RESERVED = 7
+_CURSOR = 8
+_CHANNELS = 9
+_HEADER_FIELDS = _CHANNELS + 8
+
+
+class SharedRingWriter:
+    """
+    Publishes acquired samples into a named shared memory ring that any number of local processes can read with [`SharedRingReader`][scientisst.shared_ring.SharedRingReader]
+
+    Each row of the ring is a frame in the `Frame.to_matrix()` layout: sequence number, 4 digital states and the raw (and mV) values of each channel.
+
+    The ring uses a sequence lock on the total number of written samples: before a block is written, the writer publishes the sample count it will reach (`reserved`), and only after the block is written it publishes the new count (`cursor`). Readers never lock nor write to the ring, so adding a reader costs nothing to the writer.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+
+        capacity (int): Number of samples kept in the ring.
+
+        columns (int): Number of values per sample.
+    """
+
+    def __init__(self, name, capacity, channels, sample_rate, convert=True):
+        """
+        Args:
+            name (str): Name of the shared memory block, used by the readers to attach.
+            capacity (int): Number of samples kept in the ring.
+            channels (list): Acquired channels.
+            sample_rate (int): Sampling rate in Hz.
+            convert (bool, optional): If the samples hold mV values. Default is True.
+
+        Raises:
+            FileExistsError: If a shared memory block with this name already exists.
+        """
+        self.name = name
+        self.capacity = capacity
+        self.columns = 5 + len(channels) * (2 if convert else 1)
+
+        header_size = _HEADER_FIELDS * 8
+        self.__shm = shared_memory.SharedMemory(
+            name=name, create=True, size=header_size + capacity * self.columns * 8
+        )
+        self.__header = np.ndarray(
+            (_HEADER_FIELDS,), dtype=np.int64, buffer=self.__shm.buf
+        )
+        self.__data = np.ndarray(
+            (capacity, self.columns),
+            dtype=np.float64,
+            buffer=self.__shm.buf,
+            offset=header_size,
+        )
+
+        self.__header[:] = 0
+        self.__header[_CHANNELS:] = -1
+        self.__header[_CHANNELS: _CHANNELS + len(channels)] = channels
+        self.__header[_CAPACITY] = capacity
+        self.__header[_COLUMNS] = self.columns
+        self.__header[_SAMPLE_RATE] = sample_rate
+        self.__header[_CONVERT] = int(convert)
+        self.__header[_NUM_CHANNELS] = len(channels)
+        self.__header[_VERSION] = SHARED_RING_VERSION
+        # the magic number is written last, so readers never see a partial header
+        self.__header[_MAGIC] = SHARED_RING_MAGIC
+
+    def write(self, block):
+        """
+        Appends samples to the ring, overwriting the oldest ones
+
+        Args:
+            block (np.array): Samples, one row per frame and `columns` columns.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        cursor = int(self.__header[_CURSOR])
+        # the cursor counts every sample, even those of a block larger than the ring, so that readers see them as lost
+        end = cursor + len(block)
+        if len(block) > self.capacity:
+            block = block[-self.capacity:]
+
+        self.__header[_RESERVED] = end
+        start = (end - len(block)) % self.capacity
+        first = min(len(block), self.capacity - start)
+        self.__data[start: start + first] = block[:first]
+        self.__data[: len(block) - first] = block[first:]
+        self.__header[_CURSOR] = end
+
+    def close(self):
+        """
+        Removes the ring. Attached readers keep their mapping, but see no new samples.
+        """
+        del self.__header
+        del self.__data
+        self.__shm.close()
+        self.__shm.unlink()
+
+
+class SharedRingReader:
+    """
+    Reads the samples published by a [`SharedRingWriter`][scientisst.shared_ring.SharedRingWriter] in another process
+
+    Samples are returned as read-only NumPy views of the shared memory, without copies. A view stays valid until the writer wraps around the ring and overwrites it, which [`intact()`][scientisst.shared_ring.SharedRingReader.intact] detects.
+
+    Attributes:
+        cursor (int): Index of the next sample to read, counted from the first sample ever written.
+
+        lost (int): Number of samples overwritten before this reader could read them.
+
+        capacity (int): Number of samples kept in the ring.
+
+        columns (int): Number of values per sample, in the `Frame.to_matrix()` layout.
+
+        channels (list): Acquired channels.
+
+        sample_rate (int): Sampling rate in Hz.
+
+        convert (bool): If the samples hold mV values.
+    """
+
+    def __init__(self, name, from_start=False):
+        """
+        Args:
+            name (str): Name of the shared memory block given to the writer.
+            from_start (bool, optional): Start reading from the oldest sample still in the ring instead of the newest one. Default is False.
+
+        Raises:
+            FileNotFoundError: If there is no ring with this name.
+            ValueError: If the shared memory block is not a ring.
+        """
+        self.__shm = _attach(name)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=self.__shm.buf)
+        if (
+            header[_MAGIC] != SHARED_RING_MAGIC
+            or header[_VERSION] != SHARED_RING_VERSION
+        ):
+            self.__shm.close()
+            raise ValueError("{} is not a ScientISST shared ring".format(name))
+        self.__header = header
+
+        self.capacity = int(header[_CAPACITY])
+        self.columns = int(header[_COLUMNS])
+        self.sample_rate = int(header[_SAMPLE_RATE])
+        self.convert = bool(header[_CONVERT])
+        self.channels = header[_CHANNELS: _CHANNELS + header[_NUM_CHANNELS]].tolist()
+        self.__data = np.ndarray(
+            (self.capacity, self.columns),
+            dtype=np.float64,
+            buffer=self.__shm.buf,
+            offset=_HEADER_FIELDS * 8,
+        )
+        self.__data.flags.writeable = False
+
+        self.lost = 0
+        cursor = int(header[_CURSOR])
+        self.cursor = max(cursor - self.capacity, 0) if from_start else cursor
+        self.__view_start = self.cursor
+
+    def read(self, max_samples=None, timeout=0):
+        """
+        Reads the samples written since the previous read
+
+        If the reader fell more than `capacity` samples behind, the overwritten samples are skipped and added to `lost`. A read never wraps around the end of the ring, so a read may return fewer samples than available; the next read returns the rest.
+
+        Args:
+            max_samples (int, optional): Maximum number of samples to return. Default is no limit.
+            timeout (float, optional): Maximum time (s) to wait for new samples. Default is 0 (do not wait).
+
+        Returns:
+            samples (np.array): Read-only view of the new samples, one row per frame. It can be empty.
+        """
+        deadline = time.perf_counter() + timeout
+        cursor = int(self.__header[_CURSOR])
+        while cursor == self.cursor and time.perf_counter() < deadline:
+            time.sleep(SHARED_RING_POLL_INTERVAL)
+            cursor = int(self.__header[_CURSOR])
+
+        # samples the writer may be overwriting right now are lost
+        oldest = int(self.__header[_RESERVED]) - self.capacity
+        if self.cursor < oldest:
+            self.lost += oldest - self.cursor
+            self.cursor = oldest
+
+        # a block larger than the ring may have been reserved after the cursor was read
+        # above, so it is read again after the overrun check
+        cursor = int(self.__header[_CURSOR])
+        start = self.cursor % self.capacity
+        n = max(min(cursor - self.cursor, self.capacity - start), 0)
+        if max_samples is not None:
+            n = min(n, max_samples)
+
+        self.__view_start = self.cursor
+        self.cursor += n
+        return self.__data[start: start + n]
+
+    def intact(self):
+        """
+        Checks if the samples returned by the last read have not been overwritten meanwhile. Call it after processing a view to validate the result, or copy the view first if the processing is slow.
+
+        Returns:
+            intact (bool): True if the view returned by the last read still holds the samples that were read.
+        """
+        return int(self.__header[_RESERVED]) - self.capacity <= self.__view_start
+
+    def available(self):
+        """
+        Returns:
+            available (int): Number of samples written and not read yet, including the ones that will be lost.
+        """
+        return int(self.__header[_CURSOR]) - self.cursor
+
+    def close(self):
+        """
+        Detaches from the ring. Views returned by `read()` must not be used afterwards.
+        """
+        del self.__header
+        del self.__data
+        self.__shm.close()
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13, attaching registers the block with the resource
+        # tracker of this process, which would remove it when this process exits
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
@@ -0,0 +1,125 @@
+import json
+import socket
+import struct
+import numpy as np
+
+# each message is a little-endian uint32 length followed by the body
+STREAM_LENGTH = struct.Struct("<I")
+STREAM_SEQUENCE_TYPE = "<i8"
+STREAM_DIGITAL_TYPE = "|u1"
+STREAM_RAW_TYPE = "<i4"
+STREAM_MV_TYPE = "<f8"
+
+
+class StreamClient:
+    """
+    Receives the frames served by `sense.py --serve`
+
+    The stream starts with a handshake holding the recording metadata (the same content as the header of the files written by `sense.py`, plus the `"Column types"` of the columns). It is followed by blocks of frames, sent column by column: a uint32 number of frames and then each column of the `"Header"`, encoded with its column type.
+
+    Attributes:
+        metadata (dict): Metadata of the stream.
+
+        header (list): Label of each column.
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        Args:
+            address (str): `host:port` of a TCP server, or `unix:path` of a Unix domain socket server.
+            timeout (float, optional): Socket timeout (s). Default is to block.
+
+        Raises:
+            ConnectionError: If the server closes the connection before the handshake.
+        """
+        family, address = parse_stream_address(address)
+        self.__socket = socket.socket(family, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        self.__socket.connect(address)
+        self.__file = self.__socket.makefile("rb")
+
+        handshake = self.__recv_message()
+        if handshake is None:
+            raise ConnectionError("The server closed the connection.")
+        self.metadata = json.loads(handshake.decode("utf-8"))
+        self.header = self.metadata["Header"]
+        self.__types = [np.dtype(t) for t in self.metadata["Column types"]]
+
+    def read(self):
+        """
+        Receives the next block of frames
+
+        Returns:
+            columns (list): One array per column of `header`, or None if the server closed the stream.
+        """
+        body = self.__recv_message()
+        if body is None:
+            return None
+        (num_frames,) = STREAM_LENGTH.unpack_from(body)
+        columns = []
+        offset = STREAM_LENGTH.size
+        for dtype in self.__types:
+            columns.append(np.frombuffer(body, dtype, num_frames, offset))
+            offset += num_frames * dtype.itemsize
+        return columns
+
+    def close(self):
+        self.__file.close()
+        self.__socket.close()
+
+    def __recv_message(self):
+        length = self.__file.read(STREAM_LENGTH.size)
+        if len(length) < STREAM_LENGTH.size:
+            return None
+        (length,) = STREAM_LENGTH.unpack(length)
+        body = self.__file.read(length)
+        if len(body) < length:
+            return None
+        return body
+
+
+def parse_stream_address(address):
+    """
+    Args:
+        address (str): `[host:]port` for TCP, or `unix:path` for a Unix domain socket.
+
+    Returns:
+        family (int): Socket address family.
+        address: Socket address, `(host, port)` for TCP or the path for a Unix domain socket.
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host, int(port))
+
+
+def get_stream_column_types(num_channels, mv):
+    """
+    Returns:
+        column_types (list): NumPy type of each column of the stream, in the `Frame.to_matrix()` layout.
+    """
+    channel_types = [STREAM_RAW_TYPE, STREAM_MV_TYPE] if mv else [STREAM_RAW_TYPE]
+    return (
+        [STREAM_SEQUENCE_TYPE]
+        + [STREAM_DIGITAL_TYPE] * 4
+        + channel_types * num_channels
+    )
+
+
+def encode_stream_message(body):
+    return STREAM_LENGTH.pack(len(body)) + body
+
+
+def encode_stream_block(matrix, column_types):
+    """
+    Args:
+        matrix (np.array): Frames, one row per frame in the `Frame.to_matrix()` layout.
+        column_types (list): NumPy type of each column.
+
+    Returns:
+        message (bytes): Length-prefixed block of frames, column by column.
+    """
+    parts = [STREAM_LENGTH.pack(len(matrix))]
+    for column, dtype in zip(matrix.T, column_types):
+        parts.append(column.astype(dtype).tobytes())
+    return encode_stream_message(b"".join(parts))
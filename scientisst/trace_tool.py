@@ -0,0 +1,76 @@
+import sys
+from argparse import ArgumentParser, ArgumentTypeError
+from scientisst.wire_trace import read_trace, WIRE_TRACE_TX, WIRE_TRACE_RX
+
+
+def hex_bytes(value):
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        raise ArgumentTypeError("invalid hex bytes: {}".format(value))
+
+
+def main():
+    parser = ArgumentParser(description="Pretty-print a ScientISST wire trace.")
+    parser.add_argument("trace", help="trace file written with sense.py --trace")
+    parser.add_argument(
+        "--direction",
+        choices=["tx", "rx"],
+        default=None,
+        help="only show sent (tx) or received (rx) records",
+    )
+    parser.add_argument(
+        "--contains",
+        type=hex_bytes,
+        default=None,
+        help="only show records containing these hex bytes, e.g. 07 or ff00",
+    )
+    parser.add_argument(
+        "--min-length",
+        type=int,
+        default=0,
+        help="only show records with at least this number of bytes",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=0,
+        help="stop after this number of records, default: unlimited",
+    )
+    args = parser.parse_args()
+
+    direction = None
+    if args.direction:
+        direction = WIRE_TRACE_TX if args.direction == "tx" else WIRE_TRACE_RX
+    contains = args.contains
+
+    first = None
+    shown = 0
+    try:
+        for timestamp, record_direction, data in read_trace(args.trace):
+            if first is None:
+                first = timestamp
+            if direction is not None and record_direction != direction:
+                continue
+            if len(data) < args.min_length:
+                continue
+            if contains and contains not in data:
+                continue
+            sys.stdout.write(
+                "{:>12.3f} ms  {}  {:>6}  {}\n".format(
+                    (timestamp - first) / 1e6,
+                    "tx" if record_direction == WIRE_TRACE_TX else "rx",
+                    len(data),
+                    " ".join("{:02x}".format(c) for c in data),
+                )
+            )
+            shown += 1
+            if args.limit and shown >= args.limit:
+                break
+    except ValueError as e:
+        sys.stderr.write("error: {}\n".format(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
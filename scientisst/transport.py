@@ -0,0 +1,291 @@
+import socket
+import select
+from abc import ABC, abstractmethod
+from scientisst.constants import *
+from scientisst.exceptions import *
+
+
+class Transport(ABC):
+    """
+    Byte stream to and from a device
+
+    `ScientISST` only talks to the device through this interface, so that each communication mode is a subclass. A subclass that does not implement all the abstract methods cannot be created.
+    """
+
+    @abstractmethod
+    def send(self, data):
+        """
+        Sends all the bytes of `data`.
+        """
+
+    @abstractmethod
+    def recv_into(self, buffer, timeout):
+        """
+        Receives up to `len(buffer)` bytes into `buffer`
+
+        Args:
+            buffer (bytearray): Writable buffer, e.g. a `bytearray` or a `memoryview` slice of one.
+            timeout (float): Maximum time (s) to wait for the first byte.
+
+        Returns:
+            size (int): Number of bytes received, 0 if none arrived within `timeout`.
+
+        Raises:
+            ContactingDeviceError: If the connection was closed.
+        """
+
+    @abstractmethod
+    def drain(self):
+        """
+        Discards the bytes already received, without waiting
+
+        Returns:
+            data (bytes): The discarded bytes.
+        """
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    @abstractmethod
+    def fileno(self):
+        """
+        Returns:
+            fd (int): File descriptor to wait on with `select`.
+        """
+
+    def set_recv_buffer_size(self, size):
+        """
+        Requests a receive buffer of `size` bytes
+
+        Returns:
+            size (int): The largest read the receive buffer can hold.
+        """
+        return size
+
+
+class SocketTransport(Transport):
+    """
+    Transport over a connected stream socket
+    """
+
+    def __init__(self, sock):
+        self.socket = sock
+
+    def send(self, data):
+        self.socket.sendall(data)
+
+    def recv_into(self, buffer, timeout):
+        # select is the only way to apply a timeout without changing the socket mode
+        ready = select.select([self.socket], [], [], max(timeout, 0))
+        if not ready[0]:
+            return 0
+        size = self.socket.recv_into(buffer)
+        if not size:
+            raise ContactingDeviceError()
+        return size
+
+    def drain(self):
+        discarded = b""
+        timeout = self.socket.gettimeout()
+        self.socket.setblocking(False)
+        try:
+            while True:
+                data = self.socket.recv(MAX_BUFFER_SIZE)
+                if not data:
+                    break
+                discarded += data
+        except BlockingIOError:
+            pass
+        finally:
+            self.socket.settimeout(timeout)
+        return discarded
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # already disconnected
+            pass
+        self.socket.close()
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def set_recv_buffer_size(self, size):
+        return _set_socket_recv_buffer_size(self.socket, size)
+
+
+class RfcommTransport(SocketTransport):
+    """
+    Bluetooth RFCOMM socket (Linux)
+    """
+
+    def __init__(self, address, timeout=None):
+        sock = socket.socket(
+            socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM
+        )
+        sock.settimeout(timeout)
+        sock.connect((address, 1))
+        sock.settimeout(TIMEOUT_IN_SECONDS)
+        super().__init__(sock)
+
+
+class TcpServerTransport(SocketTransport):
+    """
+    TCP server the device connects to
+    """
+
+    def __init__(self, port, timeout=None):
+        with socket.socket() as s:
+            # the port may still hold the connection closed by a reconnection
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind(("", port))
+            print("Binded port %d on all interfaces" % (port))
+
+            s.listen(5)
+            print("TCP Server created. Waiting for ScientISST to connect...")
+
+            s.settimeout(timeout)
+            sock, addr = s.accept()
+            sock.settimeout(None)
+            print("ScientISST with address", addr, " connected")
+        super().__init__(sock)
+
+
+class TcpApTransport(SocketTransport):
+    """
+    TCP client of the device, when it runs its own access point
+    """
+
+    def __init__(self, port, host=TCP_AP_HOSTNAME, timeout=None):
+        sock = socket.create_connection((host, port), timeout)
+        sock.settimeout(None)
+        super().__init__(sock)
+
+
+class UdpTransport(Transport):
+    """
+    UDP socket the device sends its datagrams to
+
+    The device announces itself by sending a datagram to the port before any command, and commands are sent back to the address it came from. The payload of this first datagram is kept as the start of the byte stream: the device may announce itself with an empty datagram, or already with frames if it was streaming. Each datagram holds whole packets, so they are joined in arrival order into the byte stream: a lost datagram only drops whole frames (seen as a gap in the sequence numbers) instead of stalling the stream like a lost TCP segment does.
+    """
+
+    def __init__(self, port, timeout=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("", port))
+        print("Binded UDP port %d on all interfaces" % (port))
+        print("UDP Server created. Waiting for ScientISST to send a datagram...")
+
+        # bytes of the last datagram that did not fit in the caller's buffer
+        self.__pending = bytearray()
+        self.__datagram = bytearray(UDP_MAX_DATAGRAM_SIZE)
+
+        # the first datagram announces the device, its bytes (if any) are part of the stream
+        self.socket.settimeout(timeout)
+        try:
+            received, self.device_address = self.socket.recvfrom_into(self.__datagram)
+        except OSError:
+            self.socket.close()
+            raise
+        self.socket.settimeout(None)
+        self.__pending += self.__datagram[:received]
+        print("ScientISST with address", self.device_address, " connected")
+
+    def send(self, data):
+        self.socket.sendto(data, self.device_address)
+
+    def recv_into(self, buffer, timeout):
+        size = 0
+        if self.__pending:
+            size = min(len(buffer), len(self.__pending))
+            buffer[:size] = self.__pending[:size]
+            del self.__pending[:size]
+            if size == len(buffer):
+                return size
+            timeout = 0
+
+        ready = select.select([self.socket], [], [], max(timeout, 0))
+        while ready[0] and size < len(buffer):
+            received, address = self.socket.recvfrom_into(self.__datagram)
+            if address == self.device_address:
+                datagram = memoryview(self.__datagram)[:received]
+                n = min(len(buffer) - size, received)
+                buffer[size: size + n] = datagram[:n]
+                self.__pending += datagram[n:]
+                size += n
+            ready = select.select([self.socket], [], [], 0)
+        return size
+
+    def drain(self):
+        discarded = bytes(self.__pending)
+        self.__pending = bytearray()
+        ready = select.select([self.socket], [], [], 0)
+        while ready[0]:
+            received, address = self.socket.recvfrom_into(self.__datagram)
+            if address == self.device_address:
+                discarded += self.__datagram[:received]
+            ready = select.select([self.socket], [], [], 0)
+        return discarded
+
+    def close(self):
+        self.socket.close()
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def set_recv_buffer_size(self, size):
+        return _set_socket_recv_buffer_size(self.socket, size)
+
+
+class SerialTransport(Transport):
+    """
+    Serial port, also used for Bluetooth on Mac and Windows
+    """
+
+    def __init__(self, address, speed):
+        import serial
+
+        self.serial = serial.Serial(address, speed, timeout=TIMEOUT_IN_SECONDS)
+
+    def send(self, data):
+        self.serial.write(data)
+
+    def recv_into(self, buffer, timeout):
+        result = b""
+        if not self.serial.in_waiting:
+            self.serial.timeout = timeout
+            result = self.serial.read(1)
+            self.serial.timeout = TIMEOUT_IN_SECONDS
+        available = min(self.serial.in_waiting, len(buffer) - len(result))
+        if available:
+            result += self.serial.read(available)
+        buffer[: len(result)] = result
+        return len(result)
+
+    def drain(self):
+        discarded = b""
+        while self.serial.in_waiting:
+            discarded += self.serial.read(self.serial.in_waiting)
+        return discarded
+
+    def close(self):
+        self.serial.close()
+
+    def fileno(self):
+        return self.serial.fileno()
+
+    def set_recv_buffer_size(self, size):
+        # Only the Windows serial driver exposes its buffer size
+        if hasattr(self.serial, "set_buffer_size"):
+            self.serial.set_buffer_size(rx_size=size)
+        return size
+
+
+def _set_socket_recv_buffer_size(sock, size):
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+        # Linux reports twice the requested size (bookkeeping overhead)
+        return min(size, sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+    except OSError:
+        return MAX_BUFFER_SIZE
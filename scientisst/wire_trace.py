@@ -0,0 +1,116 @@
+import struct
+import time
+from collections import deque
+from threading import Thread, Event
+from time import perf_counter_ns
+
+WIRE_TRACE_TX = 0
+WIRE_TRACE_RX = 1
+WIRE_TRACE_MAGIC = b"SSTTRACE"
+WIRE_TRACE_VERSION = 1
+
+# magic, version, wall clock (ns since epoch) and perf_counter_ns at the same instant
+_FILE_HEADER = struct.Struct("<8sHqq")
+# perf_counter_ns, direction, length
+_RECORD_HEADER = struct.Struct("<qBI")
+
+
+class WireTrace:
+    """
+    Binary trace of the bytes sent to and received from the device
+
+    `tx()` and `rx()` only queue a reference to the bytes; a background thread appends the timestamped records to the trace file.
+
+    Use `python -m scientisst.trace_tool <file>` to pretty-print a trace.
+
+    Attributes:
+        filename (str): Trace file path.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.__file = open(filename, "wb")
+        self.__file.write(
+            _FILE_HEADER.pack(
+                WIRE_TRACE_MAGIC, WIRE_TRACE_VERSION, time.time_ns(), perf_counter_ns()
+            )
+        )
+        self.__records = deque()
+        self.__event = Event()
+        self.__thread = Thread(target=self.__target, daemon=True)
+        self.__thread.start()
+
+    def tx(self, data):
+        """
+        Records bytes sent to the device
+
+        Args:
+            data (bytes): Sent bytes.
+        """
+        self.__records.append((perf_counter_ns(), WIRE_TRACE_TX, bytes(data)))
+
+    def rx(self, data):
+        """
+        Records bytes received from the device
+
+        Args:
+            data (bytes): Received bytes.
+        """
+        self.__records.append((perf_counter_ns(), WIRE_TRACE_RX, bytes(data)))
+
+    def close(self):
+        """
+        Writes the pending records and closes the trace file.
+        """
+        if self.__file.closed:
+            return
+        self.__event.set()
+        self.__thread.join()
+        self.__flush()
+        self.__file.close()
+
+    def __target(self):
+        while not self.__event.wait(0.1):
+            self.__flush()
+
+    def __flush(self):
+        records = self.__records
+        write = self.__file.write
+        while records:
+            timestamp, direction, data = records.popleft()
+            write(_RECORD_HEADER.pack(timestamp, direction, len(data)))
+            write(data)
+        self.__file.flush()
+
+
+def read_trace(filename):
+    """
+    Iterates over the records of a trace file written by [`WireTrace`][scientisst.wire_trace.WireTrace]
+
+    Args:
+        filename (str): Trace file path.
+
+    Returns:
+        records (generator): `(timestamp, direction, data)` tuples, where `timestamp` is the wall clock time in nanoseconds since the epoch and `direction` is `WIRE_TRACE_TX` or `WIRE_TRACE_RX`.
+
+    Raises:
+        ValueError: If the file is not a wire trace.
+    """
+    with open(filename, "rb") as f:
+        header = f.read(_FILE_HEADER.size)
+        if len(header) != _FILE_HEADER.size:
+            raise ValueError("{} is not a wire trace".format(filename))
+        magic, version, wall_origin, perf_origin = _FILE_HEADER.unpack(header)
+        if magic != WIRE_TRACE_MAGIC or version != WIRE_TRACE_VERSION:
+            raise ValueError("{} is not a wire trace".format(filename))
+
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) != _RECORD_HEADER.size:
+                # end of file or a record truncated by a crash
+                return
+            timestamp, direction, length = _RECORD_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) != length:
+                return
+            yield wall_origin + timestamp - perf_origin, direction, data
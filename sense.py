@@ -5,13 +5,13 @@ sense.py
 """
 
 import sys
+import time
 from scientisst import *
 from scientisst import __version__
 from threading import Timer
 from threading import Event
 from sense_src.arg_parser import ArgParser
 from sense_src.custom_script import get_custom_script, CustomScript
-from sense_src.device_picker import DevicePicker
 from sense_src.file_writer import *
 
 
@@ -36,7 +36,9 @@ def main():
         address = args.address
     else:
         if args.mode == COM_MODE_BT:
-            address = DevicePicker().select_device()
+            from sense_src.device_picker import DevicePicker
+
+            address = DevicePicker(args.rescan).select_device()
             if not address:
                 arg_parser.error("No paired device found")
         else:
@@ -44,46 +46,150 @@ def main():
 
     args.channels = sorted(map(int, args.channels.split(",")))
 
+    iir_filter = None
+    if args.notch or args.bandpass:
+        from sense_src.iir_filter import get_iir_filter
+
+        try:
+            iir_filter = get_iir_filter(
+                args.fs, len(args.channels), args.notch, args.bandpass)
+        except (ValueError, ImportError) as e:
+            arg_parser.error(str(e))
+
+    # each output can be resampled to its own rate
+    rates = ("output_fs", "lsl_fs", "script_fs")
+    for rate in rates:
+        if getattr(args, rate) is None:
+            setattr(args, rate, args.fs)
+        elif getattr(args, rate) <= 0:
+            arg_parser.error("output sampling frequencies must be positive")
+    resampler = None
+    if any(getattr(args, rate) != args.fs for rate in rates):
+        from sense_src.resampler import MultiRateResampler
+
+        resampler = MultiRateResampler(args.fs, args.convert)
+        for rate in rates:
+            resampler.add_rate(getattr(args, rate))
+
+    segment_duration = segment_size = None
+    if args.segment:
+        if not args.output:
+            arg_parser.error("--segment requires an output file")
+        try:
+            segment_duration, segment_size = parse_segment(args.segment)
+        except ValueError as e:
+            arg_parser.error(str(e))
+
     api_mode = API_MODE_DICT[args.api]
 
     scientisst = ScientISST(address, com_mode=args.mode,
-                            log=args.log, api=api_mode)
+                            log=args.log, api=api_mode, trace=args.trace)
 
     try:
+        if args.output or args.serve:
+            # already read by the constructor
+            firmware_version = scientisst.firmware_version
         if args.output:
-            firmware_version = scientisst.version_and_adc_chars(print=False)
             file_writer = FileWriter(
                 args.output,
                 address,
-                args.fs,
+                args.output_fs,
                 args.channels,
                 args.convert,
                 __version__,
                 firmware_version,
-                args.api
+                args.api,
+                scientisst.adc_characteristics(),
+                segment_duration,
+                segment_size,
+                args.fs if args.events else None,
             )
         if args.stream:
             from sense_src.stream_lsl import StreamLSL
 
             lsl = StreamLSL(
                 args.channels,
-                args.fs,
+                args.lsl_fs,
                 address,
+                args.fs if args.events else None,
             )
+        if args.events:
+            from scientisst.edge_detector import EdgeDetector
+
+            edge_detector = EdgeDetector()
         if args.script:
-            script = get_custom_script(args.script)
+            if args.script_workers > 0:
+                from sense_src.script_workers import ScriptWorkers
+
+                script = ScriptWorkers(
+                    args.script,
+                    args.script_workers,
+                    args.channels,
+                    args.convert,
+                    args.script_fs,
+                )
+            else:
+                script = get_custom_script(args.script)
+        if args.publish:
+            from sense_src.shared_ring_publisher import SharedRingPublisher
+
+            publisher = SharedRingPublisher(
+                args.publish, args.channels, args.fs, args.convert)
+        if args.serve:
+            from sense_src.stream_server import StreamServer
+
+            server = StreamServer(
+                args.serve,
+                get_metadata(
+                    address,
+                    args.fs,
+                    args.channels,
+                    args.convert,
+                    __version__,
+                    firmware_version,
+                    args.api,
+                    scientisst.adc_characteristics(),
+                ),
+            )
+
+        profiler = None
+        if args.profile:
+            profiler = Profiler()
+            scientisst.profiler = profiler
+            if iir_filter:
+                iir_filter.profiler = profiler
+            if resampler:
+                resampler.profiler = profiler
+            if args.output:
+                file_writer.profiler = profiler
+            if args.stream:
+                lsl.profiler = profiler
+            if args.script:
+                script.profiler = profiler
+            if args.publish:
+                publisher.profiler = profiler
+            if args.serve:
+                server.profiler = profiler
 
         stop_event = Event()
 
-        scientisst.start(args.fs, args.channels)
+        scientisst.start(args.fs, args.channels,
+                         latency=args.latency, throughput=args.throughput)
         sys.stdout.write("Start acquisition\n")
 
+        if profiler:
+            profiler.start()
+
         if args.output:
             file_writer.start()
         if args.stream:
             lsl.start()
         if args.script:
             script.start()
+        if args.publish:
+            publisher.start()
+        if args.serve:
+            server.start()
 
         timer = None
         if args.duration > 0:
@@ -94,13 +200,56 @@ def main():
                     args.channels, args.convert, args.api)) + "\n"
                 sys.stdout.write(header)
             while not stop_event.is_set():
-                frames = scientisst.read(convert=args.convert)
+                try:
+                    frames = scientisst.read(convert=args.convert)
+                except (ContactingDeviceError, OSError):
+                    if not args.reconnect:
+                        raise
+                    sys.stderr.write("Connection lost, reconnecting...\n")
+                    lost_since = time.perf_counter()
+                    lost_frames = scientisst.reconnect()
+                    sys.stderr.write(
+                        "Reconnected after {:.2f} s, {} frames lost\n".format(
+                            time.perf_counter() - lost_since, lost_frames
+                        )
+                    )
+                    if args.output:
+                        file_writer.gap(
+                            round(lost_frames * args.output_fs / args.fs))
+                    if args.stream:
+                        lsl.gap(round(lost_frames * args.lsl_fs / args.fs))
+                    if args.script:
+                        script.gap(
+                            round(lost_frames * args.script_fs / args.fs))
+                    if args.events:
+                        edge_detector.gap(lost_frames)
+                    continue
+                if iir_filter:
+                    iir_filter.filter_frames(frames, args.convert)
+                if resampler:
+                    blocks = resampler.resample_frames(frames)
+                else:
+                    blocks = {args.fs: frames}
                 if args.output:
-                    file_writer.put(frames)
+                    file_writer.put(blocks[args.output_fs])
                 if args.stream:
-                    lsl.put(frames)
+                    lsl.put(blocks[args.lsl_fs])
                 if args.script:
-                    script.put(frames)
+                    script.put(blocks[args.script_fs])
+                if args.publish:
+                    publisher.put(frames)
+                if args.serve:
+                    server.put(frames)
+                if args.events:
+                    # after the frames, so that the sinks have the samples the events refer to
+                    events = edge_detector.detect_frames(frames)
+                    if len(events):
+                        if args.output:
+                            file_writer.events(events, edge_detector.samples)
+                        if args.stream:
+                            lsl.events(events, edge_detector.samples)
+                        if args.script:
+                            script.events(events, edge_detector.samples)
                 if args.verbose:
                     sys.stdout.write("{}\n".format(frames[0]))
         except KeyboardInterrupt:
@@ -108,6 +257,9 @@ def main():
                 timer.cancel()
             pass
 
+        if profiler:
+            profiler.stop()
+
         scientisst.stop()
         # let the acquisition stop before stoping other threads
         time.sleep(0.25)
@@ -119,6 +271,17 @@ def main():
             lsl.stop()
         if args.script:
             script.stop()
+        if args.publish:
+            publisher.stop()
+        if args.serve:
+            server.stop()
+
+        if profiler:
+            profiler.report()
+            if args.profile_stacks:
+                profiler.dump_collapsed(args.profile_stacks)
+                sys.stdout.write(
+                    "Collapsed stacks saved to {}\n".format(args.profile_stacks))
 
     finally:
         scientisst.disconnect()
@@ -21,7 +21,7 @@ class ArgParser:
             "address",
             nargs="?",
             type=str,
-            help="For BTH communication:\n\tLinux: BTH MAC address\n\tMac: serial port address\n\tWindows: BTH serial COM port\nFor TCP/UDP communication:\n\tAll plataforms: server port.",
+            help="For BTH communication:\n\tLinux: BTH MAC address\n\tMac: serial port address\n\tWindows: BTH serial COM port\nFor TCP/UDP communication:\n\tAll plataforms: server port.\nFor TCP AP communication:\n\tAll plataforms: device port, or host:port.",
         )
         self.parser.add_argument(
             "-f",
@@ -47,6 +47,20 @@ class ArgParser:
             type=int,
             default=0,
         )
+        self.parser.add_argument(
+            "--latency",
+            dest="latency",
+            help="adapt the frames per read at runtime to this latency target in seconds (e.g. 0.05), default: 5 reads per second",
+            type=float,
+            default=None,
+        )
+        self.parser.add_argument(
+            "--throughput",
+            dest="throughput",
+            help="with --latency, frames per second the host must keep up with, default: sampling frequency",
+            type=float,
+            default=None,
+        )
         self.parser.add_argument(
             "-o",
             "--output",
@@ -55,6 +69,20 @@ class ArgParser:
             type=str,
             default=None,
         )
+        self.parser.add_argument(
+            "--segment",
+            dest="segment",
+            help="split the output file into segments of this duration (e.g. 15m, 1h) or size (e.g. 500MB). Each segment is written as OUTPUT.part and renamed to OUTPUT once complete. Use strftime fields in the output file name to name them, e.g. run_%%Y%%m%%d_%%H%%M.csv, default: a single file",
+            type=str,
+            default=None,
+        )
+        self.parser.add_argument(
+            "--output-frequency",
+            dest="output_fs",
+            help="resample the data written to the output file to this frequency, default: sampling frequency",
+            type=int,
+            default=None,
+        )
         self.parser.add_argument(
             "-r",
             "--raw",
@@ -71,6 +99,13 @@ class ArgParser:
             default=False,
             help="stream data using Lab Streaming Layer protocol. Use `python -m pylsl.examples.ReceiveAndPlot` to view stream",
         )
+        self.parser.add_argument(
+            "--lsl-frequency",
+            dest="lsl_fs",
+            help="resample the LSL stream to this frequency, default: sampling frequency",
+            type=int,
+            default=None,
+        )
         self.parser.add_argument(
             "--script",
             dest="script",
@@ -78,6 +113,69 @@ class ArgParser:
             type=str,
             default=None,
         )
+        self.parser.add_argument(
+            "--script-frequency",
+            dest="script_fs",
+            help="resample the frames sent to the script to this frequency, default: sampling frequency",
+            type=int,
+            default=None,
+        )
+        self.parser.add_argument(
+            "--script-workers",
+            dest="script_workers",
+            help="run the script in this many worker processes instead of a thread of the acquisition process, default: 0 (thread)",
+            type=int,
+            default=0,
+        )
+        self.parser.add_argument(
+            "--publish",
+            dest="publish",
+            help="publish the received frames to a shared memory ring with this name, for other local processes to read",
+            type=str,
+            default=None,
+        )
+        self.parser.add_argument(
+            "--serve",
+            dest="serve",
+            help="serve the received frames to any number of clients on this address, [host:]port for TCP or unix:path for a Unix domain socket",
+            type=str,
+            default=None,
+        )
+        self.parser.add_argument(
+            "--notch",
+            dest="notch",
+            type=str,
+            default=None,
+            help="remove these frequencies (Hz, comma separated) before sending the frames to the outputs, e.g. 50 or 50,100",
+        )
+        self.parser.add_argument(
+            "--bandpass",
+            dest="bandpass",
+            type=str,
+            default=None,
+            help="band-pass filter (low,high cutoffs in Hz) applied before sending the frames to the outputs, e.g. 0.5,40",
+        )
+        self.parser.add_argument(
+            "--events",
+            dest="events",
+            action="store_true",
+            default=False,
+            help="find the rising and falling edges of the digital channels, and write them next to the output file (OUTPUT.events), to a LSL marker stream and to the script on_events()",
+        )
+        self.parser.add_argument(
+            "--reconnect",
+            dest="reconnect",
+            action="store_true",
+            default=False,
+            help="if the connection is lost, reconnect and resume the acquisition instead of exiting. The lost frames are marked in the outputs",
+        )
+        self.parser.add_argument(
+            "--rescan",
+            dest="rescan",
+            action="store_true",
+            default=False,
+            help="without an address, search for devices again instead of listing the devices found recently",
+        )
         self.parser.add_argument(
             "-q",
             "--quiet",
@@ -101,6 +199,27 @@ class ArgParser:
             default=False,
             help="log sent/received bytes",
         )
+        self.parser.add_argument(
+            "--trace",
+            dest="trace",
+            type=str,
+            default=None,
+            help="append sent/received bytes to a binary trace file. Use `python -m scientisst.trace_tool` to view it",
+        )
+        self.parser.add_argument(
+            "--profile",
+            dest="profile",
+            action="store_true",
+            default=False,
+            help="print a per-stage timing breakdown on exit",
+        )
+        self.parser.add_argument(
+            "--profile-stacks",
+            dest="profile_stacks",
+            type=str,
+            default=None,
+            help="with --profile, write the stage timings as collapsed stacks (flamegraph format) to this file",
+        )
         self.parser.add_argument(
             "-m",
             "--mode",
@@ -0,0 +1,231 @@
+"""
+scientisst-convert
+"""
+
+import os
+import sys
+import ast
+import glob
+import time
+import argparse
+from itertools import islice
+from multiprocessing import Pool
+import numpy as np
+from scientisst.constants import AX1, AX2
+from scientisst.conversion import raw_to_mv
+from scientisst.esp_adc.esp_adc import EspAdcCalChars
+from scientisst.recording_reader import read_metadata
+from sense_src.file_writer import get_channel_indexes, get_channel_labels
+
+# lines parsed and written at once, so memory does not grow with the file size
+CONVERT_CHUNK_LINES = 50000
+CONVERT_DELIMITERS = {"tsv": "\t", "csv": ","}
+
+
+def convert_recording(
+    input_path, output_path, channels=None, mv=None, adc_chars=None, format="tsv"
+):
+    """
+    Converts a recording written by `sense.py`, chunk by chunk
+
+    Args:
+        input_path (str): Recording to convert.
+        output_path (str): File to write.
+        channels (list, optional): Channels to keep. Default is all the recorded channels.
+        mv (bool, optional): True to add the mV values of a recording saved with raw values only, False to drop the mV values. Default is to keep the recorded values.
+        adc_chars (EspAdcCalChars, optional): ADC characteristics to convert AI channels to mV, if the recording does not include them.
+        format (str, optional): "tsv" (the `sense.py` format) or "csv". Default is "tsv".
+
+    Returns:
+        frames (int): Number of converted frames.
+
+    Raises:
+        ValueError: If the recording has no metadata header, or cannot be converted as requested.
+    """
+    metadata, header, offset = read_metadata(input_path)
+    with open(input_path) as f:
+        f.seek(offset)
+
+        recorded_channels = metadata["Channels"]
+        recorded_mv = "Channels indexes mV" in metadata
+        if channels is None:
+            channels = recorded_channels
+        for ch in channels:
+            if ch not in recorded_channels:
+                raise ValueError("channel {} was not recorded".format(ch))
+        if mv is None:
+            mv = recorded_mv
+
+        if mv and not recorded_mv:
+            if adc_chars is None and "ADC characteristics" in metadata:
+                adc_chars = EspAdcCalChars.from_map(
+                    metadata["ADC characteristics"])
+            if adc_chars is None and any(ch != AX1 and ch != AX2 for ch in channels):
+                raise ValueError(
+                    "{} has no ADC characteristics to convert AI channels to mV, use --adc-chars".format(
+                        input_path
+                    )
+                )
+
+        # columns of the recording holding the raw and mV values of each kept channel
+        width = 2 if recorded_mv else 1
+        raw_columns = [
+            5 + recorded_channels.index(ch) * width for ch in channels]
+        mv_columns = [column + 1 for column in raw_columns]
+        # bits of each kept channel, fewer than 12 in the BITALINO API
+        resolutions = [
+            metadata["Resolution (bits)"][5 + recorded_channels.index(ch)] for ch in channels]
+
+        metadata = dict(metadata)
+        for key in ("Channels indexes", "Channels indexes raw", "Channels indexes mV"):
+            metadata.pop(key, None)
+        metadata["Channels"] = channels
+        metadata["Channels labels"] = get_channel_labels(channels, mv)
+        metadata["Header"] = header[:5] + metadata["Channels labels"]
+        metadata["Resolution (bits)"] = metadata["Resolution (bits)"][:5] + resolutions
+        metadata.update(get_channel_indexes(channels, mv))
+        metadata = {key: metadata[key] for key in sorted(metadata)}
+
+        delimiter = CONVERT_DELIMITERS[format]
+        fmt = ["%d"] * 5
+        for ch in channels:
+            fmt.append("%d")
+            if mv:
+                fmt.append("%.3f" if ch == AX1 or ch == AX2 else "%d")
+
+        frames = 0
+        with open(output_path, "w") as out:
+            out.write("#{}\n".format(metadata))
+            out.write("{}\n".format(delimiter.join(metadata["Header"])))
+            while True:
+                lines = list(islice(f, CONVERT_CHUNK_LINES))
+                if not lines:
+                    break
+                block = np.loadtxt(lines, ndmin=2)
+                raw = block[:, raw_columns]
+                columns = [block[:, :5]]
+                if mv:
+                    if recorded_mv:
+                        values = block[:, mv_columns]
+                    else:
+                        values = raw_to_mv(raw, channels, adc_chars, resolutions)
+                    # interleave the raw and mV values of each channel
+                    columns.append(
+                        np.stack([raw, values], axis=2).reshape(len(block), -1))
+                else:
+                    columns.append(raw)
+                np.savetxt(out, np.hstack(columns), fmt=fmt, delimiter=delimiter)
+                frames += len(block)
+    return frames
+
+
+def _convert_job(job):
+    input_path, output_path, options = job
+    start = time.perf_counter()
+    try:
+        frames = convert_recording(input_path, output_path, **options)
+    except (OSError, ValueError, SyntaxError, KeyError) as e:
+        return input_path, None, str(e), 0
+    return input_path, frames, None, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="scientisst-convert",
+        description="Converts recordings written by sense.py in parallel: adds or drops the mV values, keeps a subset of the channels and changes the delimiter.",
+    )
+    parser.add_argument(
+        "recordings", nargs="+", help="recordings or glob patterns, e.g. 'data/**/*.csv'"
+    )
+    parser.add_argument(
+        "-o", "--output-dir", dest="output_dir", required=True,
+        help="directory of the converted recordings, which keep their file names",
+    )
+    parser.add_argument(
+        "-c", "--channels", dest="channels", type=str, default=None,
+        help="keep only these channels, e.g. 1,2 (AX1 and AX2 are 7 and 8), default: all",
+    )
+    values = parser.add_mutually_exclusive_group()
+    values.add_argument(
+        "--mv", dest="mv", action="store_const", const=True, default=None,
+        help="add the mV values to recordings saved with raw values only",
+    )
+    values.add_argument(
+        "--raw", dest="mv", action="store_const", const=False,
+        help="drop the mV values",
+    )
+    parser.add_argument(
+        "--adc-chars", dest="adc_chars", type=str, default=None,
+        help="ADC characteristics for recordings that do not include them, as written in the metadata of newer recordings, e.g. \"{'adc_num': 1, 'atten': 3, 'bit_width': 3, 'coeff_a': 53000, 'coeff_b': 142, 'vref': 1100}\"",
+    )
+    parser.add_argument(
+        "--format", dest="format", choices=sorted(CONVERT_DELIMITERS), default="tsv",
+        help="output format, default: tsv (the sense.py format)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", dest="jobs", type=int, default=os.cpu_count(),
+        help="number of parallel processes, default: number of CPUs",
+    )
+    args = parser.parse_args()
+
+    paths = []
+    for pattern in args.recordings:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            sys.stderr.write("No recordings match {}\n".format(pattern))
+        paths += [path for path in matches if os.path.isfile(path)]
+    if not paths:
+        parser.error("no recordings to convert")
+
+    options = {"mv": args.mv, "format": args.format}
+    if args.channels:
+        options["channels"] = [int(ch) for ch in args.channels.split(",")]
+    if args.adc_chars:
+        try:
+            options["adc_chars"] = EspAdcCalChars.from_map(
+                ast.literal_eval(args.adc_chars))
+        except (ValueError, SyntaxError, KeyError):
+            parser.error("invalid --adc-chars")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = []
+    for path in paths:
+        output_path = os.path.join(args.output_dir, os.path.basename(path))
+        if os.path.abspath(output_path) == os.path.abspath(path):
+            parser.error("the output directory would overwrite {}".format(path))
+        jobs.append((path, output_path, options))
+
+    start = time.perf_counter()
+    total_frames = 0
+    total_bytes = 0
+    failed = 0
+    with Pool(max(args.jobs, 1)) as pool:
+        for done, (path, frames, error, elapsed) in enumerate(
+            pool.imap_unordered(_convert_job, jobs), 1
+        ):
+            if error:
+                failed += 1
+                sys.stderr.write("[{}/{}] {}: {}\n".format(done, len(jobs), path, error))
+                continue
+            size = os.path.getsize(path)
+            total_frames += frames
+            total_bytes += size
+            sys.stdout.write(
+                "[{}/{}] {}: {} frames, {:.1f} MB/s\n".format(
+                    done, len(jobs), path, frames, size / max(elapsed, 1e-9) / 1e6
+                )
+            )
+
+    elapsed = time.perf_counter() - start
+    sys.stdout.write(
+        "Converted {} recordings ({} frames, {:.1f} MB) in {:.1f} s: {:.1f} MB/s\n".format(
+            len(jobs) - failed, total_frames, total_bytes / 1e6, elapsed,
+            total_bytes / max(elapsed, 1e-9) / 1e6,
+        )
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,13 @@ from sense_src.thread_builder import ThreadBuilder
 
 
 class CustomScript(ThreadBuilder):
+    # RollingWindow filled with the frames before each on_read(), see keep_window()
+    window = None
+
     def __init__(self):
         super().__init__()
+        self.__window_capacity = None
+        self.__window_mv = None
         self.on_init()
 
     def start(self):
@@ -17,9 +22,40 @@ class CustomScript(ThreadBuilder):
         super().stop()
         self.on_stop()
 
+    def keep_window(self, capacity, mv=None):
+        """
+        Keeps the last samples of each channel in `self.window`, a [`RollingWindow`][scientisst.rolling_window.RollingWindow] filled with the frames before each `on_read()`
+
+        Args:
+            capacity (int): Number of samples kept of each channel.
+            mv (bool, optional): True for the mV values, False for the raw values. Default is the mV values, unless the acquisition does not convert them (`-r`).
+        """
+        self.__window_capacity = capacity
+        self.__window_mv = mv
+        self.window = None
+
     def thread_method(self, frames):
+        if self.__window_capacity and frames:
+            self.__fillWindow(frames)
         self.on_read(frames)
 
+    def __fillWindow(self, frames):
+        mv = self.__window_mv
+        if mv is None:
+            # Frame.mv holds -1 when the values are not converted
+            mv = frames[0].mv[0] != -1
+        if self.window is None:
+            from scientisst.rolling_window import RollingWindow
+
+            self.window = RollingWindow(self.__window_capacity, len(frames[0].a))
+        self.window.append([frame.mv if mv else frame.a for frame in frames])
+
+    def thread_gap(self, num_frames):
+        self.on_gap(num_frames)
+
+    def thread_events(self, events, end):
+        self.on_events(events)
+
     def on_init(self):
         pass
 
@@ -32,6 +68,12 @@ class CustomScript(ThreadBuilder):
     def on_read(self, frames):
         pass
 
+    def on_gap(self, num_frames):
+        pass
+
+    def on_events(self, events):
+        pass
+
 
 def get_custom_script(file_path):
     module_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -1,7 +1,12 @@
 import sys
+from scientisst.constants import COM_MODE_BT
+from scientisst.discovery import DiscoveryCache, discover_devices, get_candidates
 
 
 class DevicePicker:
+    def __init__(self, rescan=False):
+        self.__rescan = rescan
+
     def select_device(self):
         options, labels = self.__get_device_options()
         if len(options) > 0:
@@ -23,50 +28,21 @@ class DevicePicker:
             return options[selected_index - 1]
 
     def __get_device_options(self):
-        if sys.platform == "linux":
-            options = self.__get_linux_bth_devices()
-            return list(map(lambda option: option["addr"], options)), list(
-                map(
-                    lambda option: "{} - {}".format(
-                        option["name"] if "name" in option else "unnamed",
-                        option["addr"],
-                    ),
-                    options,
-                )
-            )
+        devices = [] if self.__rescan else DiscoveryCache().devices(COM_MODE_BT)
+        if devices:
+            sys.stdout.write("Devices found recently, use --rescan to search again\n")
         else:
-            import serial.tools.list_ports
-
-            ports = serial.tools.list_ports.comports()
-            options = []
-            labels = []
-            for port, desc, hwid in sorted(ports):
-                if "scientisst" in port.lower():
-                    options += [port]
-                    label = ""
-                    if desc != "n/a":
-                        label += "{} - ".format(desc)
-                    labels += [label + port]
-            return options, labels
-
-    def __get_linux_bth_devices(self):
-
-        import pydbus
-
-        bt_devices = {}
-
-        bus = pydbus.SystemBus()
-        mngr = bus.get("org.bluez", "/")
-
-        mngd_objs = mngr.GetManagedObjects()
-        for path in mngd_objs:
-            addr = mngd_objs[path].get("org.bluez.Device1", {}).get("Address")
-            name = mngd_objs[path].get("org.bluez.Device1", {}).get("Name")
-
-            if name and "scientisst" in name.lower() and addr not in bt_devices:
-                bt_devices[addr] = {
-                    "name": name,
-                    "addr": addr,
-                }
-
-        return bt_devices.values()
+            candidates = get_candidates()
+            if candidates:
+                sys.stdout.write("Searching {} paired devices...\n".format(len(candidates)))
+            devices = discover_devices(candidates)
+            if not devices:
+                # none answered: they may still be starting up
+                return [address for address, _, _ in candidates], [
+                    "{} - {} (not responding)".format(name or "unnamed", address)
+                    for address, _, name in candidates
+                ]
+        return [device.address for device in devices], [
+            "{} ({}) - {}".format(device.name or "unnamed", device.firmware, device.address)
+            for device in devices
+        ]
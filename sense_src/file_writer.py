@@ -1,120 +1,418 @@
+import os
 import sys
 from scientisst.scientisst import AX1, AX2
 from scientisst.constants import *
 from sense_src.thread_builder import ThreadBuilder
 from datetime import datetime
+from threading import Thread
+from queue import Queue
+
+# suffix of the segment being written, removed once it is complete
+SEGMENT_PART_SUFFIX = ".part"
+# checked in this order, so that "MB" is not read as minutes
+SEGMENT_SIZE_UNITS = (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024), ("B", 1))
+SEGMENT_DURATION_UNITS = (("H", 3600), ("M", 60), ("S", 1))
 
 
 class FileWriter(ThreadBuilder):
     def __init__(
-        self, filename, address, fs, channels, mv, api_version, firmware_version, api_com_version
+        self, filename, address, fs, channels, mv, api_version, firmware_version, api_com_version, adc_chars=None,
+        segment_duration=None, segment_size=None, events_fs=None,
     ):
         super().__init__()
+        # when segmented, may hold strftime fields, e.g. run_%Y%m%d_%H%M.csv, filled when each segment is opened
         self.filename = filename
+        self.address = address
+        self.fs = fs
         self.mv = mv
         self.channels = channels
-        self.metadata = self.__get_metadata(
-            address, fs, channels, api_version, firmware_version, api_com_version
+        self.api_com_version = api_com_version
+        self.metadata = get_metadata(
+            address, fs, channels, mv, api_version, firmware_version, api_com_version, adc_chars
         )
+        self.f = None
+        self.segmented = bool(segment_duration or segment_size)
+        # frames per segment, so that segments hold the same duration even if frames are lost
+        self.segment_frames = round(segment_duration * fs) if segment_duration else None
+        self.segment_size = segment_size
+        self.segment = 0
+        # frames written (or lost) since the start, and since the start of the segment
+        self.samples = 0
+        self.segment_start = 0
+        # sampling rate of the digital edges written to a sidecar of each file, None not to write them
+        self.events_fs = events_fs
+        self.__filename = None
+        self.__filenames = set()
+        self.__finalizer = None
+        # (first sample, EventWriter) of the files that can still receive events
+        self.__event_writers = []
+        # (file, final name) of the complete segments and their sidecars, waiting for the events of their last block
+        self.__complete = []
 
     def start(self):
+        if self.segmented:
+            self.__finalizer = SegmentFinalizer()
+            self.__finalizer.start()
         self.__init_file()
         super().start()
 
     def stop(self):
         super().stop()
-        if self.f:
-            self.f.close()
+        if self.segmented:
+            self.thread.join()
+            if self.f:
+                self.__complete_segment()
+            self.__finalize_segments()
+            self.__finalizer.stop()
+        else:
+            if self.f:
+                self.f.close()
+            for _, event_writer in self.__event_writers:
+                event_writer.f.close()
 
     def thread_method(self, frames):
-        self.f.write("\n".join(map(str, frames)) + "\n")
+        if self.segmented:
+            self.__finalize_segments()
+        while frames:
+            if not self.f:
+                self.__init_file()
+            block = frames
+            if self.segment_frames:
+                block = frames[: self.segment_start + self.segment_frames - self.samples]
+            if block:
+                self.f.write("\n".join(map(str, block)) + "\n")
+                self.samples += len(block)
+                frames = frames[len(block):]
+            if self.segmented:
+                self.__check_segment()
+        if self.f and self.segmented:
+            # nothing written is lost if sense.py crashes
+            self.f.flush()
+
+    def thread_gap(self, num_frames):
+        if self.segmented:
+            self.__finalize_segments()
+        if not self.f:
+            self.__init_file()
+        # a comment line, skipped by readers of the frames
+        self.f.write("#Gap: {} frames\n".format(num_frames))
+        self.samples += num_frames
+        if self.segmented:
+            self.__check_segment()
+
+    def thread_events(self, events, end):
+        import numpy as np
+        from scientisst.edge_detector import EVENT_SAMPLE
+
+        # the events follow the frames of their block: each one goes to the sidecar of the file holding its frame
+        samples = events[:, EVENT_SAMPLE] * self.fs // self.events_fs
+        firsts = [first for first, _ in self.__event_writers]
+        owners = np.maximum(np.searchsorted(firsts, samples, side="right") - 1, 0)
+        for index, (_, event_writer) in enumerate(self.__event_writers):
+            selected = events[owners == index]
+            if len(selected):
+                event_writer.write(selected)
+        if self.segmented:
+            self.__finalize_segments()
+
+    def __check_segment(self):
+        if (
+            self.segment_frames and self.samples - self.segment_start >= self.segment_frames
+        ) or (self.segment_size and self.f.tell() >= self.segment_size):
+            # the next frames open a new segment
+            self.__complete_segment()
+            self.segment += 1
+
+    def __complete_segment(self):
+        self.__complete.append((self.f, self.__filename))
+        if self.__event_writers:
+            event_writer = self.__event_writers[-1][1]
+            self.__complete.append((event_writer.f, event_writer.filename))
+        self.f = None
+
+    def __finalize_segments(self):
+        for f, filename in self.__complete:
+            self.__finalizer.put(f, filename)
+        self.__complete = []
+        # only the sidecar of the open segment receives new events
+        self.__event_writers = self.__event_writers[-1:] if self.f else []
 
     def __init_file(
         self,
     ):
-        self.f = open(self.filename, "w")
-        sys.stdout.write("Saving data to {}\n".format(self.filename))
+        timestamp = datetime.now()
+        filename = self.__get_filename(timestamp)
+        metadata = self.metadata
+        segment = {}
+        if self.segmented:
+            segment = {
+                "Segment": self.segment,
+                "Segment first sample": self.samples,
+                "Segment ISO 8601": timestamp.isoformat(),
+            }
+            metadata = dict(metadata, **segment)
+            metadata = {key: metadata[key] for key in sorted(metadata)}
+            self.segment_start = self.samples
+            # renamed to filename once complete
+            self.f = open(filename + SEGMENT_PART_SUFFIX, "w")
+            self.__filename = filename
+        else:
+            self.f = open(filename, "w")
+        sys.stdout.write("Saving data to {}\n".format(filename))
 
-        header = "\t".join(self.metadata["Header"])
+        header = "\t".join(metadata["Header"])
 
-        self.f.write("#{}\n".format(self.metadata))
+        self.f.write("#{}\n".format(metadata))
         self.f.write("{}\n".format(header))
 
-    def __get_metadata(self, address, fs, channels, api_version, firmware_version, api_com_version):
+        if self.events_fs:
+            self.__event_writers.append(
+                (
+                    self.samples,
+                    EventWriter(
+                        filename,
+                        self.address,
+                        self.events_fs,
+                        self.api_com_version,
+                        segment,
+                        SEGMENT_PART_SUFFIX if self.segmented else "",
+                    ),
+                )
+            )
+
+    def __get_filename(self, timestamp):
+        # a single file keeps its name as given, e.g. run_100%.csv
+        if not self.segmented:
+            return self.filename
+        filename = timestamp.strftime(self.filename)
+        if filename in self.__filenames:
+            # the strftime fields do not change as often as the segments
+            root, ext = os.path.splitext(filename)
+            filename = "{}_{:04d}{}".format(root, self.segment, ext)
+        self.__filenames.add(filename)
+        return filename
+
+
+class SegmentFinalizer(Thread):
+    """
+    Closes the complete segments of a recording in the background: each one is synced to disk and only then renamed to its final name, so tools watching the directory never pick up a partial segment
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.buffer = Queue()
+
+    def put(self, f, filename):
+        """
+        Args:
+            f (file): Segment open for writing.
+            filename (str): Name the segment is renamed to.
+        """
+        self.buffer.put((f, filename))
+
+    def stop(self):
+        # unlike ThreadBuilder, every queued segment is finalized before returning
+        self.buffer.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            segment = self.buffer.get()
+            if segment is None:
+                break
+            f, filename = segment
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+            os.replace(f.name, filename)
+            _sync_directory(filename)
+
+
+def _sync_directory(filename):
+    # makes the rename itself durable, where directories can be opened
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def parse_segment(value):
+    """
+    Parses the length of the segments of a recording, e.g. "15m", "1h", "90s" or "500MB"
+
+    Returns:
+        duration (float): Duration of each segment in seconds, or None.
+        size (int): Size of each segment in bytes, or None.
+
+    Raises:
+        ValueError: If the value is not a positive duration or size.
+    """
+    text = value.strip().upper()
+    for suffix, factor in SEGMENT_SIZE_UNITS:
+        if text.endswith(suffix):
+            number = _positive(text[: -len(suffix)], value)
+            return None, int(number * factor)
+    for suffix, factor in SEGMENT_DURATION_UNITS:
+        if text.endswith(suffix):
+            return _positive(text[: -len(suffix)], value) * factor, None
+    raise ValueError(
+        "invalid segment {}, use a duration (e.g. 90s, 15m, 1h) or a size (e.g. 500MB, 1GB)".format(value)
+    )
+
+
+def _positive(number, value):
+    try:
+        number = float(number)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise ValueError("invalid segment {}, must be positive".format(value))
+    return number
+
+
+class EventWriter:
+    """
+    Writes the digital edges found during the acquisition to the sidecar file of a recording, or of a segment of it, one line per event
+    """
+
+    def __init__(self, recording, address, fs, api_com_version, segment=None, suffix=""):
+        """
+        Args:
+            recording (str): Path of the recording or segment, as opened by `FileWriter`, see `get_events_filename()`.
+            address (str): Address of the device.
+            fs (int): Sampling rate of the acquisition (Hz), which the sample indexes count.
+            api_com_version (str): API mode of the acquisition, e.g. "SCIENTISST".
+            segment (dict, optional): Segment metadata of the recording, copied to the sidecar.
+            suffix (str, optional): Appended to the file name while it is written, e.g. ".part".
+        """
         timestamp = datetime.now()
-        metadata = None
+        # the final name, once the suffix is removed
+        self.filename = get_events_filename(recording)
         if API_MODE_DICT[api_com_version] == API_MODE_SCIENTISST_V2:
-            metadata = {
-                "API version": api_version,
-                "Channels": channels,
-                "Channels labels": get_channel_labels(channels, self.mv),
-                "Device": address,
-                "Firmware version": firmware_version,
-                "Header": get_header(channels, self.mv, api_com_version),
-                "Resolution (bits)": [36, 1, 1, 1, 1] + self.__get_channel_resolutions(),
-                "Sampling rate (Hz)": fs,
-                "Timestamp": timestamp.timestamp(),
-                "ISO 8601": timestamp.isoformat(),
-            }
-        if API_MODE_DICT[api_com_version] == API_MODE_SCIENTISST:
-            metadata = {
-                "API version": api_version,
-                "Channels": channels,
-                "Channels labels": get_channel_labels(channels, self.mv),
-                "Device": address,
-                "Firmware version": firmware_version,
-                "Header": get_header(channels, self.mv, api_com_version),
-                "Resolution (bits)": [12, 1, 1, 1, 1] + self.__get_channel_resolutions(),
-                "Sampling rate (Hz)": fs,
-                "Timestamp": timestamp.timestamp(),
-                "ISO 8601": timestamp.isoformat(),
-            }
-        else:
-            metadata = {
-                "API version": api_version,
-                "Channels": channels,
-                "Channels labels": get_channel_labels(channels, self.mv),
-                "Device": address,
-                "Firmware version": firmware_version,
-                "Header": get_header(channels, self.mv, api_com_version),
-                "Resolution (bits)": [4, 1, 1, 1, 1] + self.__get_channel_resolutions(),
-                "Sampling rate (Hz)": fs,
-                "Timestamp": timestamp.timestamp(),
-                "ISO 8601": timestamp.isoformat(),
-            }
-        if self.mv:
-            metadata["Channels indexes raw"] = list(
-                map(lambda x: (x - 1) * 2 + 5, channels)
-            )
-            metadata["Channels indexes mV"] = list(
-                map(lambda x: (x - 1) * 2 + 6, channels)
-            )
+            header = ["#NSample", "Timestamp(us)", "Channel", "Edge"]
         else:
-            metadata["Channels indexes"] = list(map(lambda x: x + 5, channels))
+            header = ["#NSample", "NSeq", "Channel", "Edge"]
+        metadata = {
+            "Device": address,
+            "Header": header,
+            "ISO 8601": timestamp.isoformat(),
+            "Recording": os.path.basename(recording),
+            "Sampling rate (Hz)": fs,
+            "Timestamp": timestamp.timestamp(),
+        }
+        metadata.update(segment or {})
+        self.metadata = {key: metadata[key] for key in sorted(metadata)}
 
-        sorted_metadata = {}
-        for key in sorted(metadata):
-            sorted_metadata[key] = metadata[key]
+        self.f = open(self.filename + suffix, "w")
+        sys.stdout.write("Saving events to {}\n".format(self.filename))
+        self.f.write("#{}\n".format(self.metadata))
+        self.f.write("{}\n".format("\t".join(self.metadata["Header"])))
 
-        return sorted_metadata
+    def write(self, events):
+        from scientisst.edge_detector import format_events
 
-    def __get_channel_resolutions(self):
-        channel_resolutions = []
-        for ch in self.channels:
-            if ch == AX1 or ch == AX2:
-                channel_resolutions += [24]
-            else:
-                channel_resolutions += [12]
-        return channel_resolutions
+        self.f.write("\n".join(format_events(events)) + "\n")
+        # events are few: they are on disk as soon as they are found
+        self.f.flush()
 
-    def __get_channel_resolutions_mv(self):
-        channel_resolutions = []
-        for ch in self.channels:
-            if ch == AX1 or ch == AX2:
-                channel_resolutions += [0.4]
-            else:
-                channel_resolutions += [0.8]
-        return channel_resolutions
+
+def get_events_filename(filename):
+    """
+    Returns:
+        filename (str): Path of the events sidecar of a recording, e.g. output.events.csv for output.csv
+    """
+    root, ext = os.path.splitext(filename)
+    return "{}.events{}".format(root, ext)
+
+
+def get_metadata(address, fs, channels, mv, api_version, firmware_version, api_com_version, adc_chars=None):
+    timestamp = datetime.now()
+    metadata = None
+    if API_MODE_DICT[api_com_version] == API_MODE_SCIENTISST_V2:
+        metadata = {
+            "API version": api_version,
+            "Channels": channels,
+            "Channels labels": get_channel_labels(channels, mv),
+            "Device": address,
+            "Firmware version": firmware_version,
+            "Header": get_header(channels, mv, api_com_version),
+            "Resolution (bits)": [36, 1, 1, 1, 1] + get_channel_resolutions(channels),
+            "Sampling rate (Hz)": fs,
+            "Timestamp": timestamp.timestamp(),
+            "ISO 8601": timestamp.isoformat(),
+        }
+    elif API_MODE_DICT[api_com_version] == API_MODE_SCIENTISST:
+        metadata = {
+            "API version": api_version,
+            "Channels": channels,
+            "Channels labels": get_channel_labels(channels, mv),
+            "Device": address,
+            "Firmware version": firmware_version,
+            "Header": get_header(channels, mv, api_com_version),
+            "Resolution (bits)": [12, 1, 1, 1, 1] + get_channel_resolutions(channels),
+            "Sampling rate (Hz)": fs,
+            "Timestamp": timestamp.timestamp(),
+            "ISO 8601": timestamp.isoformat(),
+        }
+    else:
+        metadata = {
+            "API version": api_version,
+            "Channels": channels,
+            "Channels labels": get_channel_labels(channels, mv),
+            "Device": address,
+            "Firmware version": firmware_version,
+            "Header": get_header(channels, mv, api_com_version),
+            "Resolution (bits)": [4, 1, 1, 1, 1] + get_channel_resolutions(channels, api_com_version),
+            "Sampling rate (Hz)": fs,
+            "Timestamp": timestamp.timestamp(),
+            "ISO 8601": timestamp.isoformat(),
+        }
+    metadata.update(get_channel_indexes(channels, mv))
+    if adc_chars:
+        metadata["ADC characteristics"] = adc_chars.to_map()
+
+    sorted_metadata = {}
+    for key in sorted(metadata):
+        sorted_metadata[key] = metadata[key]
+
+    return sorted_metadata
+
+
+def get_channel_indexes(channels, mv):
+    if mv:
+        return {
+            "Channels indexes raw": list(map(lambda x: (x - 1) * 2 + 5, channels)),
+            "Channels indexes mV": list(map(lambda x: (x - 1) * 2 + 6, channels)),
+        }
+    return {"Channels indexes": list(map(lambda x: x + 5, channels))}
+
+
+def get_channel_resolutions(channels, api_version=None):
+    if api_version and API_MODE_DICT[api_version] == API_MODE_BITALINO:
+        return list(BITALINO_CHANNEL_BITS[: len(channels)])
+    channel_resolutions = []
+    for ch in channels:
+        if ch == AX1 or ch == AX2:
+            channel_resolutions += [24]
+        else:
+            channel_resolutions += [12]
+    return channel_resolutions
+
+
+def get_channel_resolutions_mv(channels):
+    channel_resolutions = []
+    for ch in channels:
+        if ch == AX1 or ch == AX2:
+            channel_resolutions += [0.4]
+        else:
+            channel_resolutions += [0.8]
+    return channel_resolutions
 
 
 def get_channel_labels(channels, mv):
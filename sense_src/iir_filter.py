@@ -0,0 +1,183 @@
+from math import pi, sin, cos
+from time import perf_counter_ns
+import numpy as np
+
+try:
+    from scipy.signal import sosfilt
+except ImportError:
+    sosfilt = None
+
+
+def design_notch(frequency, fs, q=30):
+    """
+    Second-order notch filter (RBJ audio EQ cookbook), as a (1, 6) array of second-order sections
+    """
+    w0 = 2 * pi * _check_frequency(frequency, fs) / fs
+    alpha = sin(w0) / (2 * q)
+    b = [1, -2 * cos(w0), 1]
+    a = [1 + alpha, -2 * cos(w0), 1 - alpha]
+    return _normalize([b + a])
+
+
+def design_bandpass(low, high, fs, order=2):
+    """
+    Butterworth band-pass filter, built from a high-pass and a low-pass filter of the given (even) order, as second-order sections
+    """
+    if low >= high:
+        raise ValueError("band-pass low cutoff must be below the high cutoff")
+    if order < 2 or order % 2:
+        raise ValueError("band-pass order must be an even number")
+    sections = []
+    for k in range(order // 2):
+        # Q of each pole pair of a Butterworth filter of this order
+        q = 1 / (2 * cos(pi * (2 * k + 1) / (2 * order)))
+        sections.append(_highpass_section(low, fs, q))
+        sections.append(_lowpass_section(high, fs, q))
+    return _normalize(sections)
+
+
+def _highpass_section(frequency, fs, q):
+    w0 = 2 * pi * _check_frequency(frequency, fs) / fs
+    alpha = sin(w0) / (2 * q)
+    b = [(1 + cos(w0)) / 2, -(1 + cos(w0)), (1 + cos(w0)) / 2]
+    a = [1 + alpha, -2 * cos(w0), 1 - alpha]
+    return b + a
+
+
+def _lowpass_section(frequency, fs, q):
+    w0 = 2 * pi * _check_frequency(frequency, fs) / fs
+    alpha = sin(w0) / (2 * q)
+    b = [(1 - cos(w0)) / 2, 1 - cos(w0), (1 - cos(w0)) / 2]
+    a = [1 + alpha, -2 * cos(w0), 1 - alpha]
+    return b + a
+
+
+def _check_frequency(frequency, fs):
+    if not 0 < frequency < fs / 2:
+        raise ValueError(
+            "filter frequency {} Hz must be between 0 and {} Hz (half the sampling frequency)".format(
+                frequency, fs / 2
+            )
+        )
+    return frequency
+
+
+def _normalize(sections):
+    sos = np.array(sections, dtype=float)
+    sos /= sos[:, 3:4]
+    return sos
+
+
+class IIRFilter:
+    """
+    Cascade of second-order sections applied to all channels of each block, keeping the filter state between blocks
+
+    Attributes:
+        sos (np.array): Second-order sections, one `[b0, b1, b2, 1, a1, a2]` row per section.
+    """
+
+    def __init__(self, sos, num_channels):
+        """
+        Args:
+            sos (np.array): Second-order sections, one `[b0, b1, b2, 1, a1, a2]` row per section.
+            num_channels (int): Number of filtered channels.
+
+        Raises:
+            ImportError: If scipy is not installed.
+        """
+        if sosfilt is None:
+            raise ImportError(
+                "the IIR filters need scipy, install it with: pip install scientisst-sense[filters]"
+            )
+        self.sos = np.asarray(sos, dtype=float)
+        self.num_channels = num_channels
+        # Direct form II transposed state, one pair per section and channel
+        self.zi = None
+        self.profiler = None
+
+    def apply(self, x):
+        """
+        Filters a block of samples, continuing from the previous block
+
+        Args:
+            x (np.array): Samples, one row per frame and one column per channel.
+
+        Returns:
+            y (np.array): Filtered samples, with the same shape as `x`.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.zi is None:
+            self.zi = self.__steady_state(x[0])
+
+        y, self.zi = sosfilt(self.sos, x, axis=0, zi=self.zi)
+        return y
+
+    def filter_frames(self, frames, convert=True):
+        """
+        Filters the mV values (or the raw values if `convert` is False) of a list of frames in place
+
+        Args:
+            frames (list): List of [`Frame`][scientisst.frame.Frame] objects returned by `read()`.
+            convert (bool): If the frames were converted to mV.
+        """
+        if not frames:
+            return
+        if self.profiler:
+            start = perf_counter_ns()
+
+        if convert:
+            # + 0.0 turns -0.0 into 0.0
+            y = np.round(self.apply([frame.mv for frame in frames]), 3) + 0.0
+            for frame, row in zip(frames, y.tolist()):
+                frame.mv = row
+        else:
+            y = np.rint(self.apply([frame.a for frame in frames])).astype(int)
+            for frame, row in zip(frames, y.tolist()):
+                frame.a = row
+
+        if self.profiler:
+            self.profiler.record("IIRFilter;filter", perf_counter_ns() - start)
+
+    def __steady_state(self, x0):
+        """
+        State of each section after an infinitely long constant input `x0`, to avoid a start-up transient
+        """
+        zi = np.zeros((len(self.sos), 2, self.num_channels))
+        u = np.asarray(x0, dtype=float)
+        for section, (b0, b1, b2, _, a1, a2) in enumerate(self.sos):
+            y = u * (b0 + b1 + b2) / (1 + a1 + a2)
+            zi[section, 1] = b2 * u - a2 * y
+            zi[section, 0] = b1 * u - a1 * y + zi[section, 1]
+            u = y
+        return zi
+
+
+def get_iir_filter(fs, num_channels, notch=None, bandpass=None):
+    """
+    Builds the IIRFilter for the sense.py `--notch` and `--bandpass` options
+
+    Args:
+        fs (int): Sampling frequency in Hz.
+        num_channels (int): Number of acquired channels.
+        notch (str): Comma separated notch frequencies in Hz, e.g. "50" or "50,100".
+        bandpass (str): Comma separated band-pass cutoff frequencies in Hz, e.g. "0.5,40".
+
+    Returns:
+        iir_filter (IIRFilter): The filter, or None if no filter was requested.
+
+    Raises:
+        ValueError: If the frequencies are invalid.
+        ImportError: If scipy is not installed.
+    """
+    sections = []
+    if notch:
+        for frequency in notch.split(","):
+            sections.append(design_notch(float(frequency), fs))
+    if bandpass:
+        cutoffs = [float(frequency) for frequency in bandpass.split(",")]
+        if len(cutoffs) != 2:
+            raise ValueError("band-pass needs two cutoff frequencies, e.g. 0.5,40")
+        sections.append(design_bandpass(cutoffs[0], cutoffs[1], fs))
+    if not sections:
+        return None
+    return IIRFilter(np.vstack(sections), num_channels)
@@ -0,0 +1,164 @@
+from math import gcd, ceil
+from time import perf_counter_ns
+import numpy as np
+from scientisst.frame import Frame
+
+# anti-aliasing filter length, in taps per side per unit of max(up, down)
+RESAMPLER_HALF_LENGTH = 10
+RESAMPLER_KAISER_BETA = 8.0
+
+
+class Resampler:
+    """
+    Streaming polyphase resampler from `fs` to `rate` Hz, with an anti-aliasing filter and state kept between blocks
+
+    Only the output samples are computed: the input is never upsampled nor filtered at full rate. The filter is linear phase and centered on each output sample, so the outputs are delayed by `lookback` input samples.
+
+    Attributes:
+        up (int): Interpolation factor.
+
+        down (int): Decimation factor.
+
+        lookback (int): How many input samples before the current block an output sample can be aligned with.
+    """
+
+    def __init__(self, fs, rate):
+        g = gcd(int(fs), int(rate))
+        self.up = int(rate) // g
+        self.down = int(fs) // g
+
+        # Windowed-sinc low-pass just below the lowest of the input and output Nyquist frequencies
+        factor = max(self.up, self.down)
+        half_length = RESAMPLER_HALF_LENGTH * factor
+        n = np.arange(-half_length, half_length + 1)
+        cutoff = 0.45 / factor
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n)
+        taps *= np.kaiser(len(taps), RESAMPLER_KAISER_BETA)
+        taps *= self.up / taps.sum()
+
+        # phases[p, t] = taps[p + t * up]
+        self.__taps_per_phase = ceil(len(taps) / self.up)
+        taps = np.concatenate(
+            [taps, np.zeros(self.__taps_per_phase * self.up - len(taps))]
+        )
+        self.__phases = taps.reshape(self.__taps_per_phase, self.up).T
+        # the filter is centered: output k is aligned with input k * down / up
+        self.__delay = half_length
+        self.lookback = half_length // self.up + 1
+
+        self.__history = None
+        self.__consumed = 0
+        self.__next_output = 0
+
+    def apply(self, x):
+        """
+        Resamples a block of samples, continuing from the previous block
+
+        Args:
+            x (np.array): Samples, one row per frame and one column per channel.
+
+        Returns:
+            y (np.array): Resampled samples, one row per output frame.
+            index (np.array): Index in `x` of the input frame each output frame is aligned with. It is negative (down to `-lookback`) for input frames of previous blocks.
+        """
+        x = np.asarray(x, dtype=float)
+        history_length = self.__taps_per_phase - 1
+        if self.__history is None:
+            # start as if the first sample had always been there
+            self.__history = np.repeat(x[:1], history_length, axis=0)
+        buffer = np.concatenate([self.__history, x])
+
+        # global upsampled index (before the filter delay) of the last input sample
+        last = (self.__consumed + len(x) - 1) * self.up
+        end = max((last - self.__delay) // self.down + 1, self.__next_output)
+        outputs = np.arange(self.__next_output, end)
+
+        upsampled = outputs * self.down + self.__delay
+        newest = upsampled // self.up
+        phase = upsampled % self.up
+        # buffer position of the newest input sample of each output
+        position = newest - self.__consumed + history_length
+        windows = buffer[position[:, None] - np.arange(self.__taps_per_phase)]
+        y = np.einsum("kt,ktc->kc", self.__phases[phase], windows)
+
+        self.__next_output = end
+        self.__consumed += len(x)
+        self.__history = buffer[len(buffer) - history_length:]
+
+        return y, outputs * self.down // self.up - (self.__consumed - len(x))
+
+
+class MultiRateResampler:
+    """
+    Resamples each block once per distinct output rate, so that outputs sharing a rate share the work
+
+    Attributes:
+        fs (int): Acquisition sampling rate in Hz.
+    """
+
+    def __init__(self, fs, convert=True):
+        self.fs = fs
+        self.convert = convert
+        self.profiler = None
+        self.__resamplers = {}
+        self.__previous = []
+
+    def add_rate(self, rate):
+        """
+        Registers an output rate.
+
+        Args:
+            rate (int): Output sampling rate in Hz.
+        """
+        if rate != self.fs and rate not in self.__resamplers:
+            self.__resamplers[rate] = Resampler(self.fs, rate)
+
+    def resample_frames(self, frames):
+        """
+        Args:
+            frames (list): List of [`Frame`][scientisst.frame.Frame] objects at `fs`.
+
+        Returns:
+            blocks (dict): Output rate to list of [`Frame`][scientisst.frame.Frame] objects. The `fs` entry holds `frames` unchanged.
+        """
+        blocks = {self.fs: frames}
+        if not self.__resamplers or not frames:
+            return blocks
+        if self.profiler:
+            start = perf_counter_ns()
+
+        # frames of the previous blocks that outputs may still be aligned with
+        lookback = max(r.lookback for r in self.__resamplers.values())
+        sources = self.__previous + frames
+        offset = len(self.__previous)
+        self.__previous = sources[-lookback:]
+
+        num_channels = len(frames[0].a)
+        if self.convert:
+            x = [frame.a + frame.mv for frame in frames]
+        else:
+            x = [frame.a for frame in frames]
+
+        for rate, resampler in self.__resamplers.items():
+            y, index = resampler.apply(x)
+            raw = np.rint(y[:, :num_channels]).astype(int).tolist()
+            if self.convert:
+                mv = (np.round(y[:, num_channels:], 3) + 0.0).tolist()
+
+            block = []
+            for i in range(len(y)):
+                # seq and digital states come from the aligned input frame
+                source = sources[max(index[i] + offset, 0)]
+                f = Frame(num_channels)
+                f.seq = source.seq
+                f.digital = source.digital
+                f.a = raw[i]
+                if self.convert:
+                    f.mv = mv[i]
+                block.append(f)
+            blocks[rate] = block
+
+        if self.profiler:
+            self.profiler.record(
+                "MultiRateResampler;resample", perf_counter_ns() - start)
+        return blocks
@@ -0,0 +1,228 @@
+import sys
+import multiprocessing
+from multiprocessing import shared_memory
+from queue import Empty
+from time import perf_counter_ns
+import numpy as np
+from scientisst.frame import Frame
+from scientisst.constants import AX1, AX2
+
+# blocks in flight per worker before new blocks are dropped
+SCRIPT_WORKER_SLOTS = 8
+SCRIPT_WORKER_STOP_TIMEOUT = 5
+# slot indexes of the inbox messages carrying digital edges or lost frames instead of frames
+_EVENTS = -1
+_GAP = -2
+
+
+class ScriptWorkers:
+    """
+    Runs a CustomScript in worker processes, so that it does not compete with the acquisition for the GIL
+
+    Each block of frames is copied into a shared memory slot of the next worker (round-robin) and only the slot index is sent through a queue. The worker rebuilds the `Frame` objects and calls `on_read`, so `on_init/on_start/on_read/on_stop` keep their semantics. With more than one worker, each instance of the script receives a subset of the blocks.
+
+    A worker that falls behind or crashes never blocks the acquisition: its blocks are dropped and reported.
+    """
+
+    def __init__(self, file_path, num_workers, channels, convert, frames_per_slot):
+        """
+        Args:
+            file_path (str): Path of the script, as given to `get_custom_script`.
+            num_workers (int): Number of worker processes.
+            channels (list): Acquired channels.
+            convert (bool): If the frames hold mV values.
+            frames_per_slot (int): Frames per shared memory slot. Larger blocks are split.
+        """
+        self.profiler = None
+        self.dropped = 0
+        self.__columns = 5 + len(channels) * (2 if convert else 1)
+        self.__frames_per_slot = max(frames_per_slot, 1)
+        self.__next_worker = 0
+
+        context = multiprocessing.get_context("spawn")
+        self.__workers = [
+            _Worker(
+                context,
+                file_path,
+                self.__frames_per_slot,
+                self.__columns,
+                channels,
+                convert,
+            )
+            for _ in range(num_workers)
+        ]
+
+    def start(self):
+        for worker in self.__workers:
+            worker.process.start()
+
+    def put(self, frames):
+        if self.profiler:
+            start = perf_counter_ns()
+
+        block = np.array([frame.to_matrix() for frame in frames], dtype=np.float64)
+        for first in range(0, len(block), self.__frames_per_slot):
+            self.__send(block[first: first + self.__frames_per_slot])
+
+        if self.profiler:
+            self.profiler.record("ScriptWorkers;put", perf_counter_ns() - start)
+
+    def gap(self, num_frames):
+        # every worker is told, so that on_gap() fires as with a script in a thread
+        for worker in self.__workers:
+            if worker.alive:
+                worker.inbox.put((_GAP, num_frames))
+
+    def events(self, events, end):
+        # events are few: every worker receives all of them
+        for worker in self.__workers:
+            if worker.alive:
+                worker.inbox.put((_EVENTS, events))
+
+    def stop(self):
+        for worker in self.__workers:
+            if worker.alive:
+                worker.inbox.put(None)
+        for worker in self.__workers:
+            worker.close()
+        if self.dropped:
+            sys.stderr.write(
+                "Script workers dropped {} blocks\n".format(self.dropped))
+
+    def __send(self, block):
+        worker = self.__workers[self.__next_worker]
+        self.__next_worker = (self.__next_worker + 1) % len(self.__workers)
+
+        if not worker.send(block):
+            self.dropped += 1
+
+
+class _Worker:
+    def __init__(self, context, file_path, frames_per_slot, columns, channels, convert):
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=SCRIPT_WORKER_SLOTS * frames_per_slot * columns * 8
+        )
+        self.slots = np.ndarray(
+            (SCRIPT_WORKER_SLOTS, frames_per_slot, columns),
+            dtype=np.float64,
+            buffer=self.shm.buf,
+        )
+        self.free = list(range(SCRIPT_WORKER_SLOTS))
+        self.inbox = context.Queue()
+        self.done = context.Queue()
+        self.alive = True
+        self.process = context.Process(
+            target=_worker_main,
+            args=(
+                file_path,
+                self.shm.name,
+                frames_per_slot,
+                columns,
+                channels,
+                convert,
+                self.inbox,
+                self.done,
+            ),
+            daemon=True,
+        )
+
+    def send(self, block):
+        """
+        Copy the block into a free slot and notify the worker, returns False if the block was dropped
+        """
+        if self.alive and not self.process.is_alive():
+            self.alive = False
+            sys.stderr.write(
+                "Script worker exited with code {}, its blocks will be dropped\n".format(
+                    self.process.exitcode
+                )
+            )
+        if not self.alive:
+            return False
+
+        # reclaim the slots the worker is done with
+        try:
+            while True:
+                self.free.append(self.done.get_nowait())
+        except Empty:
+            pass
+
+        if not self.free:
+            return False
+
+        slot = self.free.pop()
+        self.slots[slot, : len(block)] = block
+        self.inbox.put((slot, len(block)))
+        return True
+
+    def close(self):
+        self.process.join(SCRIPT_WORKER_STOP_TIMEOUT)
+        if self.process.is_alive():
+            sys.stderr.write("Script worker did not stop, terminating it\n")
+            self.process.terminate()
+            self.process.join()
+        del self.slots
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _worker_main(
+    file_path, shm_name, frames_per_slot, columns, channels, convert, inbox, done
+):
+    from sense_src.custom_script import get_custom_script
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray(
+        (SCRIPT_WORKER_SLOTS, frames_per_slot, columns), dtype=np.float64, buffer=shm.buf
+    )
+    try:
+        script = get_custom_script(file_path)
+        script.on_start()
+        while True:
+            message = inbox.get()
+            if message is None:
+                break
+            if message[0] == _EVENTS:
+                script.thread_events(message[1], None)
+                continue
+            if message[0] == _GAP:
+                script.thread_gap(message[1])
+                continue
+            slot, num_frames = message
+            frames = _to_frames(slots[slot, :num_frames], channels, convert)
+            # the frames are copies, so the slot can be reused right away
+            done.put(slot)
+            script.thread_method(frames)
+        script.on_stop()
+    finally:
+        del slots
+        shm.close()
+
+
+def _to_frames(block, channels, convert):
+    # Python values of the types read() gives them: ints, and float mV for AX channels
+    seqs = block[:, 0].astype(np.int64).tolist()
+    digitals = block[:, 1:5].astype(np.int64).tolist()
+    if convert:
+        raws = block[:, 5::2].astype(np.int64).tolist()
+        mv_columns = []
+        for index, ch in enumerate(channels):
+            column = block[:, 6 + 2 * index]
+            # AI channels are whole mV, unless the frames were filtered or resampled
+            if ch != AX1 and ch != AX2 and np.array_equal(column, np.rint(column)):
+                column = column.astype(np.int64)
+            mv_columns.append(column.tolist())
+        mvs = [list(values) for values in zip(*mv_columns)]
+    else:
+        raws = block[:, 5:].astype(np.int64).tolist()
+
+    frames = []
+    for i in range(len(raws)):
+        f = Frame(len(channels))
+        f.seq = seqs[i]
+        f.digital = digitals[i]
+        f.a = raws[i]
+        if convert:
+            f.mv = mvs[i]
+        frames.append(f)
+    return frames
@@ -0,0 +1,47 @@
+import sys
+from time import perf_counter_ns
+import numpy as np
+from scientisst.shared_ring import SharedRingWriter
+
+# seconds of data kept in the ring for slow readers
+SHARED_RING_SECONDS = 10
+
+
+class SharedRingPublisher:
+    """
+    Publishes the frames into a shared memory ring, read by other local processes with `scientisst.SharedRingReader`
+
+    The frames are written from the acquisition loop: it is a single copy into shared memory, and readers never block it.
+    """
+
+    def __init__(self, name, channels, fs, convert=True):
+        self.profiler = None
+        self.__name = name
+        self.__channels = channels
+        self.__fs = fs
+        self.__convert = convert
+        self.__writer = None
+
+    def start(self):
+        self.__writer = SharedRingWriter(
+            self.__name,
+            SHARED_RING_SECONDS * self.__fs,
+            self.__channels,
+            self.__fs,
+            self.__convert,
+        )
+        sys.stdout.write("Publishing frames to shared memory '{}'\n".format(self.__name))
+
+    def put(self, frames):
+        if self.profiler:
+            start = perf_counter_ns()
+
+        self.__writer.write(
+            np.array([frame.to_matrix() for frame in frames], dtype=np.float64)
+        )
+
+        if self.profiler:
+            self.profiler.record("SharedRingPublisher;put", perf_counter_ns() - start)
+
+    def stop(self):
+        self.__writer.close()
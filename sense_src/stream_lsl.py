@@ -6,7 +6,7 @@ from sense_src.thread_builder import ThreadBuilder
 
 
 class StreamLSL(ThreadBuilder):
-    def __init__(self, channels, fs, address):
+    def __init__(self, channels, fs, address, events_fs=None):
         super().__init__()
         self.info = StreamInfo(
             "ScientISST Sense",
@@ -16,13 +16,29 @@ class StreamLSL(ThreadBuilder):
             "int32",
             address,
         )
+        # digital edges go to an irregular marker stream, e.g. "I1 rising"
+        self.events_fs = events_fs
+        self.events_info = None
+        if events_fs:
+            self.events_info = StreamInfo(
+                "ScientISST Sense Events",
+                "Markers",
+                1,
+                0,
+                "string",
+                address + "-events",
+            )
 
     def start(self):
         # make outlet
         self.outlet = StreamOutlet(self.info)
+        if self.events_info:
+            self.events_outlet = StreamOutlet(self.events_info)
 
         self.timestamp = local_clock()
         self.previous_index = -1
+        # the timestamps after a gap follow from it, not from the sequence numbers
+        self.after_gap = False
         self.dt = 1 / self.info.nominal_srate()
 
         sys.stdout.write("Start LSL stream\n")
@@ -36,10 +52,35 @@ class StreamLSL(ThreadBuilder):
         current_index = frames[-1].seq
         lost_frames = current_index - ((self.previous_index + num_frames) & 15)
 
-        if lost_frames > 0:
+        if lost_frames > 0 and not self.after_gap:
             self.timestamp = local_clock()
         else:
             self.timestamp += num_frames * self.dt
 
         self.previous_index = current_index
+        self.after_gap = False
         self.outlet.push_chunk(chunk, self.timestamp)
+
+    def thread_gap(self, num_frames):
+        # the lost frames keep their place in time, whatever the width of the sequence numbers
+        self.timestamp += num_frames * self.dt
+        self.after_gap = True
+        if self.events_info:
+            self.events_outlet.push_sample(
+                ["Gap {} frames".format(num_frames)], self.timestamp
+            )
+
+    def thread_events(self, events, end):
+        from scientisst.edge_detector import DIGITAL_LABELS, EDGE_RISING
+
+        # the events come after the frames of their block: the last chunk ends with frame `end - 1`
+        for sample, _, channel, polarity in events.tolist():
+            self.events_outlet.push_sample(
+                [
+                    "{} {}".format(
+                        DIGITAL_LABELS[channel],
+                        "rising" if polarity == EDGE_RISING else "falling",
+                    )
+                ],
+                self.timestamp - (end - 1 - sample) / self.events_fs,
+            )
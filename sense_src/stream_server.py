@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import socket
+import asyncio
+from threading import Thread, Event
+from time import perf_counter_ns
+import numpy as np
+from scientisst.stream_client import *
+
+# blocks queued per client before the client is considered too slow and dropped
+STREAM_SERVER_CLIENT_BLOCKS = 64
+STREAM_SERVER_STOP_TIMEOUT = 5
+
+
+class StreamServer:
+    """
+    Serves the frames to any number of clients over TCP or a Unix domain socket, read with `scientisst.StreamClient`
+
+    Each block is encoded once and queued to every client. A client whose queue is full is dropped, so slow clients never delay the acquisition nor the other clients.
+
+    Attributes:
+        address (str): Address the server listens on, with the actual port if port 0 was requested.
+
+        clients (int): Number of connected clients.
+
+        dropped_clients (int): Number of clients dropped for being too slow.
+    """
+
+    def __init__(self, address, metadata):
+        self.profiler = None
+        self.address = address
+        self.clients = 0
+        self.dropped_clients = 0
+
+        num_channels = len(metadata["Channels"])
+        mv = "Channels indexes mV" in metadata
+        self.__column_types = get_stream_column_types(num_channels, mv)
+        handshake = dict(metadata)
+        handshake["Column types"] = self.__column_types
+        self.__handshake = encode_stream_message(json.dumps(handshake).encode("utf-8"))
+
+        self.__queues = {}
+        self.__tasks = set()
+        self.__loop = None
+        self.__stopping = None
+        self.__error = None
+        self.__ready = Event()
+        self.thread = Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.__ready.wait()
+        if self.__error:
+            raise self.__error
+        sys.stdout.write("Serving frames on {}\n".format(self.address))
+
+    def put(self, frames):
+        if not frames:
+            return
+        if self.profiler:
+            start = perf_counter_ns()
+
+        matrix = np.array([frame.to_matrix() for frame in frames])
+        message = encode_stream_block(matrix, self.__column_types)
+        self.__loop.call_soon_threadsafe(self.__broadcast, message)
+
+        if self.profiler:
+            self.profiler.record("StreamServer;put", perf_counter_ns() - start)
+
+    def stop(self):
+        if self.__loop:
+            self.__loop.call_soon_threadsafe(self.__stopping.set)
+        self.thread.join()
+        if self.dropped_clients:
+            sys.stderr.write(
+                "Dropped {} slow clients\n".format(self.dropped_clients))
+
+    def __run(self):
+        asyncio.run(self.__serve())
+
+    async def __serve(self):
+        self.__stopping = asyncio.Event()
+        family, address = parse_stream_address(self.address)
+        try:
+            if family == socket.AF_UNIX:
+                server = await asyncio.start_unix_server(self.__handle, address)
+            else:
+                server = await asyncio.start_server(self.__handle, *address)
+                if address[1] == 0:
+                    self.address = "{}:{}".format(
+                        address[0], server.sockets[0].getsockname()[1])
+        except OSError as e:
+            self.__error = e
+            self.__ready.set()
+            return
+        self.__loop = asyncio.get_running_loop()
+        self.__ready.set()
+
+        await self.__stopping.wait()
+        server.close()
+        # let the clients receive the queued blocks before closing: a full queue is waited for, not dropped
+        sentinels = [
+            asyncio.ensure_future(queue.put(None)) for queue in self.__queues.values()
+        ]
+        if self.__tasks:
+            await asyncio.wait(self.__tasks, timeout=STREAM_SERVER_STOP_TIMEOUT)
+        # clients still receiving when the timeout expires are disconnected
+        for writer in list(self.__queues):
+            writer.transport.abort()
+        if self.__tasks:
+            await asyncio.wait(self.__tasks, timeout=STREAM_SERVER_STOP_TIMEOUT)
+        for sentinel in sentinels:
+            sentinel.cancel()
+        if family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+
+    async def __handle(self, reader, writer):
+        self.__tasks.add(asyncio.current_task())
+        queue = asyncio.Queue(STREAM_SERVER_CLIENT_BLOCKS)
+        self.__queues[writer] = queue
+        self.clients += 1
+        try:
+            writer.write(self.__handshake)
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.__queues.pop(writer, None)
+            self.__tasks.discard(asyncio.current_task())
+            self.clients -= 1
+            writer.close()
+
+    def __broadcast(self, message):
+        for writer in list(self.__queues):
+            self.__send(writer, message)
+
+    def __send(self, writer, message):
+        queue = self.__queues[writer]
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # too slow: drop the client, waking up its handler if it is waiting
+            del self.__queues[writer]
+            self.dropped_clients += 1
+            writer.transport.abort()
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
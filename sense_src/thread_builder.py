@@ -1,13 +1,35 @@
 from threading import Thread, Event
 from queue import Queue
+from time import perf_counter_ns
 import time
 
 
+class Gap:
+    """
+    Marks frames lost between two blocks, e.g. while reconnecting
+    """
+
+    def __init__(self, num_frames):
+        self.num_frames = num_frames
+
+
+class Events:
+    """
+    Marks digital edges found in the frames put before, see EdgeDetector
+    """
+
+    def __init__(self, events, end):
+        self.events = events
+        # number of frames acquired until the end of the block holding the events
+        self.end = end
+
+
 class ThreadBuilder:
     def __init__(self):
         self.buffer = Queue()
         self.event = Event()
         self.thread = Thread(target=self.target)
+        self.profiler = None
 
     def start(self):
         self.thread.start()
@@ -15,18 +37,40 @@ class ThreadBuilder:
     def put(self, frames):
         self.buffer.put(frames)
 
+    def gap(self, num_frames):
+        self.buffer.put(Gap(num_frames))
+
+    def events(self, events, end):
+        self.buffer.put(Events(events, end))
+
     def stop(self):
         # let the thread method finish before stop
         time.sleep(0.25)
         self.event.set()
 
     def target(self):
+        stage = "{};thread_method".format(type(self).__name__)
         while not self.event.is_set():
             if not self.buffer.empty():
                 frames = self.buffer.get()
-                self.thread_method(frames)
+                if isinstance(frames, Gap):
+                    self.thread_gap(frames.num_frames)
+                elif isinstance(frames, Events):
+                    self.thread_events(frames.events, frames.end)
+                elif self.profiler:
+                    start = perf_counter_ns()
+                    self.thread_method(frames)
+                    self.profiler.record(stage, perf_counter_ns() - start)
+                else:
+                    self.thread_method(frames)
             else:
                 time.sleep(0.1)
 
     def thread_method(self, frames):
         pass
+
+    def thread_gap(self, num_frames):
+        pass
+
+    def thread_events(self, events, end):
+        pass
@@ -0,0 +1,38 @@
+import uuid
+import numpy as np
+from multiprocessing import shared_memory
+from scientisst.shared_ring import SharedRingWriter, SharedRingReader, _RESERVED, _HEADER_FIELDS
+
+
+def _block(first, n, columns):
+    return np.arange(first, first + n, dtype=np.float64)[:, np.newaxis].repeat(columns, axis=1)
+
+
+def test_block_larger_than_ring_written_during_a_read():
+    name = "test-ring-{}".format(uuid.uuid4().hex[:8])
+    writer = SharedRingWriter(name, capacity=8, channels=[1], sample_rate=100, convert=False)
+    reader = SharedRingReader(name)
+    shm = shared_memory.SharedMemory(name=name)
+    header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+    try:
+        writer.write(_block(0, 3, writer.columns))
+        assert reader.read()[:, 0].tolist() == [0, 1, 2]
+
+        # the writer reserved a block of 20 samples, but has not published it yet
+        header[_RESERVED] = 23
+        assert len(reader.read()) == 0
+        assert reader.cursor == 15
+        assert reader.lost == 12
+
+        header[_RESERVED] = 3
+        writer.write(_block(3, 20, writer.columns))
+        # the view stops at the end of the ring
+        assert reader.read()[:, 0].tolist() == [15]
+        assert reader.read()[:, 0].tolist() == list(range(16, 23))
+        assert reader.cursor == 23
+        assert reader.lost == 12
+    finally:
+        del header
+        shm.close()
+        reader.close()
+        writer.close()